@@ -0,0 +1,122 @@
+"""
+Retrieval-quality benchmark for the chunking strategies.
+
+Samples sentences from a PDF, queries each collection with a fragment of the
+sentence and counts a hit when a retrieved chunk contains the whole sentence
+(i.e. the answer came back intact, not cut across two chunks). Reports
+recall@k for each chunker so a smaller top_k can be chosen with confidence.
+
+Usage:
+    python benchmarks/bench_chunking_recall.py --queries 200 --top-k 1 3 5
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import fitz  # PyMuPDF
+
+from common import HashingEmbeddingFunction
+from emissions_agent.tools.chunking import get_chunker
+from emissions_agent.tools.knowledge_manifest import KnowledgeManifest
+from emissions_agent.tools.vector_manager import VectorManager
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def normalize(text: str) -> str:
+    return ' '.join(text.split())
+
+
+def sample_queries(pdf_path: Path, count: int, seed: int) -> list:
+    """Pick (fragment, sentence) pairs from paragraphs of the PDF."""
+    sentences = []
+    doc = fitz.open(pdf_path)
+    try:
+        for page in doc:
+            for block in page.get_text("blocks"):
+                if block[6] != 0:
+                    continue
+                for sentence in _SENTENCE_END.split(normalize(block[4])):
+                    if 15 <= len(sentence.split()) <= 40:
+                        sentences.append(sentence)
+    finally:
+        doc.close()
+
+    rng = random.Random(seed)
+    picked = rng.sample(sentences, min(count, len(sentences)))
+    queries = []
+    for sentence in picked:
+        words = sentence.split()
+        start = rng.randint(0, max(0, len(words) - 10))
+        queries.append({'query': ' '.join(words[start:start + 10]), 'sentence': sentence})
+    return queries
+
+
+def evaluate(pdf_path: Path, chunking: str, options: dict, queries: list, top_ks: list, workdir: Path) -> dict:
+    manifest = KnowledgeManifest(workdir / f"manifest-{chunking}", chunker=get_chunker(chunking, **options))
+    chunks, _ = manifest.load_pdf(pdf_path)
+
+    vector_manager = VectorManager(
+        str(workdir / f"chroma-{chunking}"),
+        embedding_function=HashingEmbeddingFunction(),
+        embedding_store_path=None,
+    )
+    vector_manager.upsert_documents("bench", chunks)
+
+    max_k = max(top_ks)
+    results = vector_manager.batch_query([q['query'] for q in queries], ["bench"], max_k, use_cache=False)
+    hits = {k: 0 for k in top_ks}
+    context_chars = {k: 0 for k in top_ks}
+    for query, result in zip(queries, results):
+        retrieved = result['results']["bench"]
+        for k in top_ks:
+            texts = [normalize(r['text']) for r in retrieved[:k]]
+            context_chars[k] += sum(len(t) for t in texts)
+            if any(query['sentence'] in text for text in texts):
+                hits[k] += 1
+
+    lengths = [len(c['text']) for c in chunks]
+    return {
+        'chunking': chunking,
+        'options': options,
+        'chunks': len(chunks),
+        'mean_chunk_chars': round(sum(lengths) / len(lengths), 1),
+        'recall_at_k': {k: round(hits[k] / len(queries), 4) for k in top_ks},
+        'mean_context_chars_at_k': {k: round(context_chars[k] / len(queries), 1) for k in top_ks},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark retrieval recall per chunking strategy')
+    parser.add_argument('--source', type=Path, default=Path('data/ghg-protocol-revised.pdf'))
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--top-k', type=int, nargs='+', default=[1, 3, 5])
+    parser.add_argument('--max-tokens', type=int, default=256)
+    parser.add_argument('--overlap-tokens', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    queries = sample_queries(args.source, args.queries, args.seed)
+    strategies = [
+        ('fixed', {}),
+        ('structured', {'max_tokens': args.max_tokens, 'overlap_tokens': args.overlap_tokens}),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        report = {
+            'source': str(args.source),
+            'queries': len(queries),
+            'results': [evaluate(args.source, name, options, queries, args.top_k, Path(tmp))
+                        for name, options in strategies],
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
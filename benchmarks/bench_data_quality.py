@@ -0,0 +1,53 @@
+"""
+Scaling benchmark for the data-quality engine.
+
+Resamples each scope CSV to increasing row counts and times
+``data_quality.validate``. Time per row should stay roughly flat as the
+inventory grows (linear scaling).
+
+Usage:
+    python benchmarks/bench_data_quality.py --rows 10000 100000 1000000 10000000
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pandas as pd
+
+from common import scale_inventory
+from emissions_agent.tools.data_quality import validate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the data-quality engine')
+    parser.add_argument('--data-directory', type=Path, default=Path('data'))
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--scopes', nargs='+', default=['scope1', 'scope2', 'scope3'])
+    args = parser.parse_args()
+
+    report = {'runs': []}
+    for scope in args.scopes:
+        source = pd.read_csv(args.data_directory / f"{scope}.csv")
+        for rows in args.rows:
+            df = scale_inventory(source, rows)
+            start = time.perf_counter()
+            result = validate(df)
+            seconds = time.perf_counter() - start
+            report['runs'].append({
+                'scope': scope,
+                'rows': rows,
+                'seconds': round(seconds, 4),
+                'ns_per_row': round(seconds / rows * 1e9, 1),
+                'rows_with_issues': result['rows_with_issues'],
+            })
+            del df
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
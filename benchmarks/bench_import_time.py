@@ -0,0 +1,67 @@
+"""
+Import-time budget for the CLI entry points.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter for
+each entry point, reports the cumulative import time (best of ``--repeat``)
+and which heavy dependencies were pulled in. Exits non-zero when a module
+goes over ``--budget-ms`` or imports a heavy dependency eagerly, so startup
+regressions are caught.
+
+Usage:
+    python benchmarks/bench_import_time.py --budget-ms 150
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+ENTRY_POINTS = ['emissions_agent.main', 'emissions_agent.server']
+# Only the commands that need these may import them
+HEAVY_MODULES = ['crewai', 'chromadb', 'litellm', 'pandas', 'numpy', 'fitz']
+
+
+def _import_profile(module: str) -> tuple:
+    """Cumulative import time of ``module`` in microseconds and the top-level packages imported."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, check=True)
+    cumulative = None
+    packages = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        packages.add(name.split('.')[0])
+        if name == module:
+            cumulative = int(cumulative_us)
+    return cumulative, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the import time of the CLI entry points')
+    parser.add_argument('--modules', nargs='+', default=ENTRY_POINTS)
+    parser.add_argument('--budget-ms', type=float, default=150.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    report = {'budget_ms': args.budget_ms, 'modules': {}}
+    failed = False
+    for module in args.modules:
+        profiles = [_import_profile(module) for _ in range(args.repeat)]
+        best_ms = min(cumulative for cumulative, _ in profiles) / 1000
+        heavy = sorted(set(HEAVY_MODULES) & profiles[0][1])
+        over_budget = best_ms > args.budget_ms
+        failed = failed or over_budget or bool(heavy)
+        report['modules'][module] = {
+            'import_ms': round(best_ms, 1),
+            'heavy_imports': heavy,
+            'ok': not over_budget and not heavy,
+        }
+
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
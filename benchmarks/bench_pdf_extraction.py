@@ -0,0 +1,70 @@
+"""
+Benchmark serial vs process-pool PDF text extraction.
+
+Copies a source PDF into a temporary corpus and extracts every page with
+``KnowledgeManifest.load_pdfs`` (cache reuse disabled) at each worker count,
+checking that the parallel chunks match the serial ones exactly.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py --copies 12 --workers 1 2 4 8
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from emissions_agent.tools.knowledge_manifest import KnowledgeManifest
+
+
+def run(source: Path, copies: int, worker_counts: list, repeats: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = Path(tmp)
+        file_paths = []
+        for i in range(copies):
+            file_path = corpus_dir / f"peer{i + 1}_emissions_report.pdf"
+            shutil.copy(source, file_path)
+            file_paths.append(file_path)
+
+        manifest = KnowledgeManifest(corpus_dir / "manifest")
+        baseline = None
+        results = {'source': str(source), 'copies': copies, 'runs': []}
+        for workers in worker_counts:
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                loaded = manifest.load_pdfs(file_paths, reuse=False, workers=workers)
+                timings.append(time.perf_counter() - start)
+
+            chunks = {name: result[0] for name, result in loaded.items()}
+            if baseline is None:
+                baseline = chunks
+            results['runs'].append({
+                'workers': workers,
+                'best_seconds': round(min(timings), 4),
+                'pages': sum(result[1]['pages'] for result in loaded.values()),
+                'chunks': sum(len(c) for c in chunks.values()),
+                'matches_serial': chunks == baseline,
+            })
+
+    serial = results['runs'][0]['best_seconds']
+    for entry in results['runs']:
+        entry['speedup'] = round(serial / entry['best_seconds'], 2) if entry['best_seconds'] else None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PDF text extraction')
+    parser.add_argument('--source', type=Path, default=Path('data/ghg-protocol-revised.pdf'))
+    parser.add_argument('--copies', type=int, default=8, help='Number of PDF copies in the corpus')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Worker counts to compare (first is the baseline)')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.source, args.copies, args.workers, args.repeats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
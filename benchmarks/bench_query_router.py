@@ -0,0 +1,81 @@
+"""
+Routing table and timing for the quantitative-question fast path.
+
+Checks ``classify_question`` against questions that must be answered from the
+data and near misses that must go to the crew: other superlatives, years,
+named categories, activities or sites, comparisons, counts and groupings
+other than by scope, which the templated answers would silently ignore. Prints the mismatches and the time
+per classification; exits non-zero on any mismatch.
+
+Usage:
+    python benchmarks/bench_query_router.py
+"""
+
+import json
+import sys
+import time
+
+from emissions_agent.tools.query_router import classify_question
+
+# (question, expected intent, or None for the crew)
+ROUTING_TABLE = [
+    # Standard questions
+    ("What is our highest emitting Scope 3 category and what specific activities contribute to it?", 'top_category'),
+    ("Which suppliers should I prioritise to engage for emissions reduction efforts?", 'top_suppliers'),
+    ("Generate a summary report of our total emissions by scope with key insights", 'scope_totals'),
+    ("Should employee business travel be classified as Scope 1 or Scope 3? Explain the reasoning and describe how I can calculate my business travel emissions?", None),
+    ("Are my scope 2 emissions calculation valid according to the Greenhouse Gas Protocol?", None),
+    ("How do my scope 1 & 2 emissions compare with other companies in my industry, and what insights can I derive from this comparison?", None),
+    # Other routed wordings
+    ("Which category has the highest emissions?", 'top_category'),
+    ("What are our total Scope 3 emissions?", 'scope_totals'),
+    ("Rank our suppliers by emissions", 'top_suppliers'),
+    ("Which facilities emit the most?", 'top_facilities'),
+    ("What are the largest emitting sites in Scope 1?", 'top_facilities'),
+    ("What are our total emissions per scope?", 'scope_totals'),
+    ("Give me a breakdown of emissions across all scopes", 'scope_totals'),
+    # Near misses: a constraint the handler can't honour
+    ("Which category has the lowest emissions?", None),
+    ("What are our total Scope 3 emissions from business travel?", None),
+    ("What are the total emissions for Category 6 business travel?", None),
+    ("How did total emissions change between 2023 and 2024?", None),
+    ("What are our total emissions at the Houston plant?", None),
+    ("What were our total emissions in 2023?", None),
+    ("Compare total emissions of scope 1 versus scope 2", None),
+    ("Who are our top 3 suppliers by emissions?", None),
+    ("Which suppliers should we engage?", None),
+    ("Which supplier has the smallest emissions?", None),
+    ("What is the highest emitting Scope 1 category?", None),
+    ("Which Scope 3 sites emit the most?", None),
+    ("What is the monthly trend of total emissions?", None),
+    # Groupings the handlers don't break down by
+    ("What are total emissions by supplier?", None),
+    ("What are the total emissions by category?", None),
+    ("Give me a breakdown of emissions by facility", None),
+    ("What are our total scope 3 emissions per supplier?", None),
+    ("What are total emissions per site?", None),
+    ("What are our total emissions for each country?", None),
+]
+
+
+def main():
+    mismatches = []
+    started = time.perf_counter()
+    for question, expected in ROUTING_TABLE:
+        route = classify_question(question)
+        intent = route['intent'] if route else None
+        if intent != expected:
+            mismatches.append({'question': question, 'expected': expected, 'got': intent})
+    seconds = time.perf_counter() - started
+
+    print(json.dumps({
+        'questions': len(ROUTING_TABLE),
+        'routed': sum(expected is not None for _, expected in ROUTING_TABLE),
+        'mismatches': mismatches,
+        'us_per_question': round(seconds / len(ROUTING_TABLE) * 1e6, 1),
+    }, indent=2))
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
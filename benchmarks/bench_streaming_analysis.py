@@ -0,0 +1,79 @@
+"""
+Streaming vs in-memory analysis of a large scope CSV.
+
+Writes a resampled scope CSV, then runs the summary/hotspots/quality analyses
+both from a fully loaded dataframe and in chunks from disk. Reports time and
+peak traced memory for each path and checks that the JSON answers match.
+
+Usage:
+    python benchmarks/bench_streaming_analysis.py --rows 1000000 --chunk-rows 100000
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pandas as pd
+
+from common import scale_inventory
+from emissions_agent.tools.aggregate_cube import AggregateCube
+from emissions_agent.tools.data_cache import read_scope_csv
+from emissions_agent.tools.data_quality import quality_report
+from emissions_agent.tools.streaming_analysis import stream_cube, stream_quality_report
+
+
+def _measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {'seconds': round(seconds, 3), 'peak_mb': round(peak / 2**20, 1)}
+
+
+def _in_memory(path: Path) -> dict:
+    df = read_scope_csv(path)
+    cube = AggregateCube.build(df)
+    return {'summary': cube.summary(), 'hotspots': cube.hotspots(), 'quality': quality_report(df)}
+
+
+def _streamed(path: Path, chunk_rows: int) -> dict:
+    cube = stream_cube(path, chunk_rows)
+    return {'summary': cube.summary(), 'hotspots': cube.hotspots(),
+            'quality': stream_quality_report(path, chunk_rows)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark chunked streaming analysis')
+    parser.add_argument('--data-directory', type=Path, default=Path('data'))
+    parser.add_argument('--scope', default='scope3')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--chunk-rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / f"{args.scope}.csv"
+        scale_inventory(pd.read_csv(args.data_directory / f"{args.scope}.csv"), args.rows).to_csv(path, index=False)
+
+        expected, in_memory = _measure(lambda: _in_memory(path))
+        actual, streamed = _measure(lambda: _streamed(path, args.chunk_rows))
+
+    print(json.dumps({
+        'scope': args.scope,
+        'rows': args.rows,
+        'chunk_rows': args.chunk_rows,
+        'in_memory': in_memory,
+        'streaming': streamed,
+        'identical': json.dumps(expected, default=str) == json.dumps(actual, default=str),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+End-to-end benchmark of the data, analysis and retrieval tools on synthetic data.
+
+Generates a synthetic inventory (``synthetic.py``) and PDF corpus in a
+temporary directory, points the global ``VectorManager`` at a throwaway
+store with the deterministic ``HashingEmbeddingFunction`` (no model download
+or network), then times:
+
+- ``LoadEmissionsDataTool``: cold CSV parse, warm columnar cache, streaming
+- ``AnalyzeEmissionsTool``: summary, hotspots and quality for each scope
+- ``CompareEmissionsTool``: each pair of scopes
+- ``LoadKnowledgeBaseTool``: cold extraction, incremental reload
+- ``CreateVectorCollectionsTool``: cold build, unchanged re-sync
+- ``VectorManager``: query_collection (uncached, cached), hybrid_search, batch_query
+
+Each case reports the best and median wall time over ``--repeat`` runs and
+whether the tool returned an error. Results are written as JSON (with the
+sizes, seed and environment) for regression tracking across commits.
+
+Usage:
+    python benchmarks/bench_suite.py --rows 10000 100000 1000000 --pages 40 --output benchmarks/results/suite.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common import HashingEmbeddingFunction
+from synthetic import write_inventory, write_pdf_corpus
+from emissions_agent.tools import data_tools, vector_manager as vector_manager_module
+from emissions_agent.tools.data_tools import (
+    AnalyzeEmissionsTool,
+    CompareEmissionsTool,
+    CreateVectorCollectionsTool,
+    LoadEmissionsDataTool,
+    LoadKnowledgeBaseTool,
+)
+from emissions_agent.tools.vector_manager import VectorManager
+
+SCOPES = ['scope1', 'scope2', 'scope3']
+ANALYSIS_TYPES = ['summary', 'hotspots', 'quality']
+QUERIES = [
+    "market-based method for scope 2 emissions",
+    "Category 6 business travel",
+    "base year recalculation policy",
+    "operational control boundary",
+    "global warming potential CO2e",
+]
+
+
+def _time(fn, repeat: int) -> dict:
+    """Best and median wall time of ``fn`` over ``repeat`` calls, and whether it errored."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    error = isinstance(result, str) and result.startswith("Error")
+    return {
+        'best_ms': round(min(timings) * 1000, 2),
+        'median_ms': round(statistics.median(timings) * 1000, 2),
+        'runs': repeat,
+        'error': result[:200] if error else None,
+    }
+
+
+def _reset_state():
+    """Forget everything the tools hold in memory between sizes."""
+    for store in (data_tools._dataframes, data_tools._raw_memory, data_tools._documents,
+                  data_tools._cubes, data_tools._streamed_scopes):
+        store.clear()
+
+
+def bench_emissions(data_dir: Path, rows: int, repeat: int) -> dict:
+    load = LoadEmissionsDataTool()
+    results = {
+        # The first cached load parses the CSVs and writes the columnar cache
+        'load_cold': _time(lambda: load._run(str(data_dir), use_cache=False), 1),
+        'load_cache_write': _time(lambda: load._run(str(data_dir)), 1),
+        'load_cached': _time(lambda: load._run(str(data_dir)), repeat),
+    }
+
+    analyze = AnalyzeEmissionsTool()
+    for scope in SCOPES:
+        for analysis_type in ANALYSIS_TYPES:
+            results[f'analyze_{scope}_{analysis_type}'] = _time(lambda: analyze._run(scope, analysis_type), repeat)
+
+    compare = CompareEmissionsTool()
+    for first, second in [('scope1', 'scope2'), ('scope1', 'scope3'), ('scope2', 'scope3')]:
+        results[f'compare_{first}_{second}'] = _time(lambda: compare._run(first, second), repeat)
+
+    results['load_streaming'] = _time(lambda: load._run(str(data_dir), streaming=True), 1)
+    for analysis_type in ANALYSIS_TYPES:
+        results[f'analyze_scope3_{analysis_type}_streaming'] = _time(
+            lambda: analyze._run('scope3', analysis_type), 1)
+    return {'rows_per_scope': rows, 'cases': results}
+
+
+def bench_knowledge(data_dir: Path, pages: int, repeat: int) -> dict:
+    load = LoadKnowledgeBaseTool()
+    collections = CreateVectorCollectionsTool()
+    results = {
+        'knowledge_cold': _time(lambda: load._run(str(data_dir), incremental=False), 1),
+        'knowledge_incremental': _time(lambda: load._run(str(data_dir)), repeat),
+        'collections_cold': _time(lambda: collections._run(force_recreate=True), 1),
+        'collections_unchanged': _time(lambda: collections._run(), repeat),
+    }
+
+    manager = vector_manager_module.get_vector_manager()
+    chunks = sum(len(chunks) for chunks in data_tools._documents.values())
+    results['query_uncached'] = _time(
+        lambda: [manager.query_collection("ghg_protocol", query, 5, use_cache=False) for query in QUERIES], repeat)
+    results['query_cached'] = _time(
+        lambda: [manager.query_collection("ghg_protocol", query, 5) for query in QUERIES], repeat)
+    results['hybrid_search'] = _time(
+        lambda: [manager.hybrid_search("ghg_protocol", query, 5) for query in QUERIES], repeat)
+    results['batch_query'] = _time(
+        lambda: manager.batch_query(QUERIES, ["ghg_protocol", "peer_benchmarks"], 5, use_cache=False), repeat)
+    return {'pages_per_pdf': pages, 'chunks': chunks, 'queries': len(QUERIES), 'cases': results}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=Path(__file__).resolve().parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the tools on synthetic data')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000], help='Rows per scope CSV, one run per size')
+    parser.add_argument('--pages', type=int, default=40, help='Pages per synthetic PDF (0 to skip the knowledge benchmarks)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, default=None,
+                        help='JSON results file (default: benchmarks/results/suite_<timestamp>.json)')
+    args = parser.parse_args()
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'emissions': [],
+        'knowledge': None,
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for rows in args.rows:
+            data_dir = tmp / f"rows_{rows}"
+            start = time.perf_counter()
+            write_inventory(data_dir, rows, args.seed)
+            _reset_state()
+            entry = bench_emissions(data_dir, rows, args.repeat)
+            entry['generate_seconds'] = round(time.perf_counter() - start, 2)
+            report['emissions'].append(entry)
+            print(f"{rows} rows: done", file=sys.stderr)
+
+        if args.pages:
+            data_dir = tmp / "knowledge"
+            write_pdf_corpus(data_dir, args.pages, args.seed)
+            vector_manager_module._vector_manager = VectorManager(
+                str(tmp / "chroma"),
+                embedding_function=HashingEmbeddingFunction(),
+                embedding_store_path=str(tmp / "embeddings.sqlite3"),
+            )
+            _reset_state()
+            report['knowledge'] = bench_knowledge(data_dir, args.pages, args.repeat)
+            print(f"{args.pages} pages per PDF: done", file=sys.stderr)
+
+    output = args.output or Path(__file__).resolve().parent / "results" / f"suite_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(report, indent=2))
+    print(f"Results written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Shared helpers for the benchmark scripts.
+"""
+
+import hashlib
+import re
+
+import numpy as np
+from chromadb.api.types import EmbeddingFunction
+
+_WORD = re.compile(r"[a-z0-9]+(?:[-.][a-z0-9]+)*")
+
+
+class HashingEmbeddingFunction(EmbeddingFunction):
+    """Deterministic, network-free embedding: hashed word unigrams and bigrams.
+
+    Good enough to compare chunking or indexing strategies against each other
+    without downloading a model; not a substitute for real semantic quality.
+    """
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+
+    def __call__(self, input):
+        vectors = []
+        for text in input:
+            words = _WORD.findall(text.lower())
+            vector = np.zeros(self.dimensions, dtype=np.float32)
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                index = int.from_bytes(digest[:4], 'little') % self.dimensions
+                sign = 1.0 if digest[4] & 1 else -1.0
+                vector[index] += sign
+            norm = np.linalg.norm(vector)
+            vectors.append(vector / norm if norm else vector)
+        return vectors
+
+    @staticmethod
+    def name() -> str:
+        return "benchmark-hashing"
+
+    def get_config(self) -> dict:
+        return {'dimensions': self.dimensions}
+
+    @staticmethod
+    def build_from_config(config: dict) -> "HashingEmbeddingFunction":
+        return HashingEmbeddingFunction(**config)
+
+
+def scale_inventory(df, rows: int, seed: int = 0):
+    """Resample a scope dataframe to ``rows`` rows, jittering amounts and emissions."""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    scaled = df.iloc[rng.integers(0, len(df), size=rows)].reset_index(drop=True)
+    # Amounts and emissions move together so rows still reconcile with their factor
+    jitter = rng.uniform(0.9, 1.1, size=rows)
+    for column in ('Consumption_Amount', 'Spend_Amount', 'CO2e_Tonnes'):
+        if column in scaled.columns:
+            scaled[column] = scaled[column] * jitter
+    return pd.DataFrame(scaled)
@@ -0,0 +1,243 @@
+"""
+Synthetic emissions inventories and knowledge-base PDFs for benchmarking.
+
+Scope CSVs follow the column schemas of ``data/`` (``SCOPE_SCHEMAS``) with
+the same vocabularies, but with facilities and suppliers that grow with the
+row count, monthly dates, log-normal amounts and emissions that reconcile
+with their factor. A small share of rows carries the issues the quality
+rules look for (missing values, negative amounts, outliers, duplicates).
+Files are written in blocks, so 10M-row inventories don't need 10M rows in
+memory.
+
+The PDF corpus uses the knowledge-base file names the loader expects, with
+chapters, headings, paragraphs and tables of GHG accounting text.
+
+Usage:
+    python benchmarks/synthetic.py --output-directory /tmp/bench-data --rows 1000000 --pages 60
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from emissions_agent.tools.data_cache import SCOPE_SCHEMAS
+from emissions_agent.tools.data_tools import KNOWLEDGE_FILES
+
+# Rows generated and written at a time
+BLOCK_ROWS = 1_000_000
+# Share of rows given a data-quality issue
+ISSUE_RATE = 0.01
+MONTHS = [f"2024-{month:02d}-15" for month in range(1, 13)]
+
+# (Activity_Type, Fuel_Type, Consumption_Unit, Emission_Factor, Notes, typical amount)
+SCOPE1_SOURCES = [
+    ("Stationary Combustion", "Natural Gas", "cubic_feet", 0.0531, "Office heating", 45_000),
+    ("Stationary Combustion", "Coal", "tonnes", 2.42, "Boiler operations", 120),
+    ("Mobile Combustion", "Diesel", "gallons", 10.21, "Delivery trucks", 2_500),
+    ("Mobile Combustion", "Gasoline", "gallons", 8.89, "Company vehicles", 1_800),
+    ("Process Emissions", "Cement Production", "tonnes", 0.52, "Cement manufacturing", 900),
+    ("Fugitive Emissions", "Refrigerants", "kg_R404A", 3922.0, "Cooling system leaks", 3),
+]
+# (Energy_Type, Consumption_Unit, typical amount)
+SCOPE2_ENERGY = [("Electricity", "kWh", 45_000), ("Steam", "MMBtu", 600)]
+# (Grid_Region, electricity factor)
+GRID_REGIONS = [("CAISO", 0.334), ("PJM", 0.421), ("ERCOT", 0.390), ("NEISO", 0.312), ("MISO", 0.497), ("SPP", 0.453)]
+STEAM_FACTOR = 0.074
+SCOPE3_ACTIVITIES = [
+    "Raw Materials - Aluminum", "Raw Materials - Steel", "Inbound Logistics - Truck", "Product Use Phase",
+    "Packaging Materials", "IT Hardware", "Business Travel - Air", "Office Supplies", "Employee Commuting",
+    "Manufacturing Equipment",
+]
+DATA_QUALITY = ["Primary data", "Secondary data", "Proxy data", "Industry average", "Hybrid approach"]
+FACILITY_KINDS = ["HQ", "Manufacturing Plant", "Warehouse", "Data Center", "Fleet Operations", "Office"]
+SUPPLIER_KINDS = ["Co", "Ltd", "Inc", "Corp", "Group", "Logistics"]
+
+
+def _names(kinds: List[str], count: int, prefix: str) -> np.ndarray:
+    return np.array([f"{prefix} {i // len(kinds) + 1:04d} {kinds[i % len(kinds)]}" for i in range(count)], dtype=object)
+
+
+def _entity_count(rows: int, minimum: int, per_rows: int) -> int:
+    """Distinct facilities or suppliers for an inventory of ``rows``."""
+    return max(minimum, rows // per_rows)
+
+
+def generate_scope(scope: str, rows: int, seed: int = 0, total_rows: Optional[int] = None) -> pd.DataFrame:
+    """A synthetic scope inventory of ``rows`` rows with the columns of ``data/<scope>.csv``.
+
+    ``total_rows`` sizes the facility/supplier populations when generating one
+    block of a larger file.
+    """
+    rng = np.random.default_rng(seed)
+    total_rows = total_rows or rows
+    dates = np.array(MONTHS, dtype=object)[rng.integers(0, len(MONTHS), rows)]
+    scale = rng.lognormal(0.0, 0.5, rows)
+
+    if scope == "scope1":
+        facilities = _names(FACILITY_KINDS, _entity_count(total_rows, 4, 2_000), "Site")
+        source = rng.integers(0, len(SCOPE1_SOURCES), rows)
+        table = list(zip(*SCOPE1_SOURCES))
+        amount = np.round(np.array(table[5], dtype=float)[source] * scale, 2)
+        factor = np.array(table[3], dtype=float)[source]
+        df = pd.DataFrame({
+            "Facility": facilities[rng.integers(0, len(facilities), rows)],
+            "Activity_Type": np.array(table[0], dtype=object)[source],
+            "Fuel_Type": np.array(table[1], dtype=object)[source],
+            "Consumption_Amount": amount,
+            "Consumption_Unit": np.array(table[2], dtype=object)[source],
+            "Emission_Factor": factor,
+            "CO2e_Tonnes": np.round(amount * factor / 1000, 4),
+            "Date": dates,
+            "Notes": np.array(table[4], dtype=object)[source],
+        })
+    elif scope == "scope2":
+        facilities = _names(FACILITY_KINDS, _entity_count(total_rows, 4, 2_000), "Site")
+        facility = rng.integers(0, len(facilities), rows)
+        # Each facility sits on one grid
+        region = facility % len(GRID_REGIONS)
+        energy = (rng.random(rows) < 0.2).astype(int)
+        amount = np.round(np.array([e[2] for e in SCOPE2_ENERGY], dtype=float)[energy] * scale)
+        factor = np.where(energy == 1, STEAM_FACTOR, np.array([g[1] for g in GRID_REGIONS])[region])
+        renewable = rng.integers(0, 11, rows) * 5
+        df = pd.DataFrame({
+            "Facility": facilities[facility],
+            "Energy_Type": np.array([e[0] for e in SCOPE2_ENERGY], dtype=object)[energy],
+            "Consumption_Amount": amount,
+            "Consumption_Unit": np.array([e[1] for e in SCOPE2_ENERGY], dtype=object)[energy],
+            "Grid_Region": np.array([g[0] for g in GRID_REGIONS], dtype=object)[region],
+            "Emission_Factor": factor,
+            "CO2e_Tonnes": np.round(amount * factor / 1000, 4),
+            "Date": dates,
+            "Renewable_Percentage": renewable,
+            "Notes": np.where(renewable >= 30, "Office operations - increased renewables", "Office operations"),
+        })
+    elif scope == "scope3":
+        suppliers = _names(SUPPLIER_KINDS, _entity_count(total_rows, 8, 500), "Supplier")
+        spend = np.round(rng.lognormal(10.0, 1.2, rows), 2)
+        factor = np.round(rng.uniform(0.1, 2.0, rows), 3)
+        df = pd.DataFrame({
+            "Category": np.array([f"Category {i}" for i in range(1, 16)], dtype=object)[rng.integers(0, 15, rows)],
+            "Activity_Description": np.array(SCOPE3_ACTIVITIES, dtype=object)[rng.integers(0, len(SCOPE3_ACTIVITIES), rows)],
+            "Spend_Amount": spend,
+            "Spend_Currency": "USD",
+            "Emission_Factor": factor,
+            "CO2e_Tonnes": np.round(spend * factor / 1000, 4),
+            "Date": dates,
+            "Supplier": suppliers[rng.integers(0, len(suppliers), rows)],
+            "Category_Details": "Scope 3 emissions category",
+            "Data_Quality": np.array(DATA_QUALITY, dtype=object)[rng.integers(0, len(DATA_QUALITY), rows)],
+        })
+    else:
+        raise ValueError(f"Unknown scope '{scope}'. Use: {', '.join(SCOPE_SCHEMAS)}")
+
+    _inject_issues(df, rng)
+    return df[list(SCOPE_SCHEMAS[scope])]
+
+
+def _inject_issues(df: pd.DataFrame, rng: np.random.Generator):
+    """Give about ``ISSUE_RATE`` of rows a missing value, negative amount, outlier or duplicate."""
+    rows = len(df)
+    picked = np.flatnonzero(rng.random(rows) < ISSUE_RATE)
+    if not len(picked):
+        return
+    kind = rng.integers(0, 4, len(picked))
+    df.loc[picked[kind == 0], "CO2e_Tonnes"] = np.nan
+    amount = "Spend_Amount" if "Spend_Amount" in df.columns else "Consumption_Amount"
+    df.loc[picked[kind == 1], amount] = -df.loc[picked[kind == 1], amount]
+    df.loc[picked[kind == 2], "CO2e_Tonnes"] = df.loc[picked[kind == 2], "CO2e_Tonnes"] * 100
+    duplicated = picked[(kind == 3) & (picked > 0)]
+    df.iloc[duplicated] = df.iloc[duplicated - 1].to_numpy()
+
+
+def write_scope_csv(path: Path, scope: str, rows: int, seed: int = 0) -> Path:
+    """Write a synthetic scope CSV in blocks of ``BLOCK_ROWS`` rows."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for block, start in enumerate(range(0, rows, BLOCK_ROWS)):
+        df = generate_scope(scope, min(BLOCK_ROWS, rows - start), seed=seed * 1_000 + block, total_rows=rows)
+        df.to_csv(path, mode='w' if block == 0 else 'a', header=block == 0, index=False)
+    return path
+
+
+def write_inventory(directory: Path, rows: int, seed: int = 0, scopes: Optional[List[str]] = None) -> Dict[str, Path]:
+    """Write ``scope1.csv``..``scope3.csv`` with ``rows`` rows each."""
+    return {scope: write_scope_csv(Path(directory) / f"{scope}.csv", scope, rows, seed)
+            for scope in scopes or list(SCOPE_SCHEMAS)}
+
+
+_TOPICS = [
+    ("Setting Organizational Boundaries", ["equity share", "financial control", "operational control", "joint venture"]),
+    ("Setting Operational Boundaries", ["scope 1", "scope 2", "scope 3", "direct emissions", "indirect emissions"]),
+    ("Scope 2 Guidance", ["market-based method", "location-based method", "grid average emission factor", "renewable energy certificates"]),
+    ("Scope 3 Categories", ["Category 1 purchased goods", "Category 4 upstream transportation", "Category 6 business travel", "Category 7 employee commuting"]),
+    ("Tracking Emissions Over Time", ["base year", "recalculation policy", "structural changes", "organic growth"]),
+    ("Identifying and Calculating GHG Emissions", ["emission factors", "activity data", "global warming potential", "CO2e"]),
+    ("Managing Inventory Quality", ["uncertainty", "data quality", "verification", "materiality"]),
+]
+_VERBS = ["report", "quantify", "disclose", "account for", "exclude", "allocate", "verify", "track"]
+_SUBJECTS = ["Companies", "Reporting entities", "Operators", "Suppliers", "Subsidiaries"]
+
+
+def _paragraph(rng: np.random.Generator, terms: List[str]) -> str:
+    sentences = []
+    for _ in range(int(rng.integers(3, 7))):
+        term, other = rng.choice(terms, 2)
+        sentences.append(
+            f"{rng.choice(_SUBJECTS)} should {rng.choice(_VERBS)} {term} separately from {other} "
+            f"and document the emission factor EF-{int(rng.integers(100, 999))}.{int(rng.integers(0, 9))} "
+            f"used for each source in {int(rng.integers(2015, 2025))}."
+        )
+    return ' '.join(sentences)
+
+
+def write_pdf_corpus(directory: Path, pages: int = 40, seed: int = 0,
+                     filenames: Optional[List[str]] = None) -> List[Path]:
+    """Write the knowledge-base PDFs with ``pages`` pages each of synthetic GHG guidance."""
+    import fitz  # PyMuPDF
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    paths = []
+    for filename in filenames or KNOWLEDGE_FILES:
+        doc = fitz.open()
+        for page_number in range(pages):
+            chapter, terms = _TOPICS[page_number * len(_TOPICS) // max(pages, 1)]
+            page = doc.new_page()
+            y = 72
+            page.insert_text((72, y), f"CHAPTER {page_number * len(_TOPICS) // max(pages, 1) + 1}: {chapter}", fontsize=14)
+            y += 30
+            for section in range(2):
+                page.insert_text((72, y), f"{page_number + 1}.{section + 1} {str(rng.choice(terms)).title()}", fontsize=12)
+                y += 20
+                box = fitz.Rect(72, y, page.rect.width - 72, y + 230)
+                page.insert_textbox(box, _paragraph(rng, terms), fontsize=9)
+                y += 240
+            table = ' | '.join(f"{term}: {rng.uniform(0.01, 5):.3f}" for term in terms)
+            page.insert_textbox(fitz.Rect(72, y, page.rect.width - 72, y + 60), f"Table {page_number + 1}. {table}", fontsize=8)
+        path = directory / filename
+        doc.save(path)
+        doc.close()
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic emissions inventory and PDF corpus')
+    parser.add_argument('--output-directory', type=Path, required=True)
+    parser.add_argument('--rows', type=int, default=100_000, help='Rows per scope CSV')
+    parser.add_argument('--pages', type=int, default=40, help='Pages per PDF (0 to skip the PDFs)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    written = {scope: str(path) for scope, path in write_inventory(args.output_directory, args.rows, args.seed).items()}
+    if args.pages:
+        written['pdfs'] = [str(path) for path in write_pdf_corpus(args.output_directory, args.pages, args.seed)]
+    print(json.dumps(written, indent=2))
+
+
+if __name__ == "__main__":
+    main()
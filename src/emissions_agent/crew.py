@@ -1,15 +1,33 @@
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
+from crewai.project import CrewBase, after_kickoff, agent, before_kickoff, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from crewai.knowledge.source.pdf_knowledge_source import PDFKnowledgeSource
 from crewai.knowledge.source.text_file_knowledge_source import TextFileKnowledgeSource
+from crewai.utilities.constants import NOT_SPECIFIED
 from typing import List
+from emissions_agent.task_graph import async_flags, execution_plan, task_dependencies
+from emissions_agent.tools.replay_cache import get_replay_cache
+from emissions_agent.tools.task_context import get_task_context_store
 from emissions_agent.tools.tool_registry import get_tool_registry
+from emissions_agent.tools.warm_state import get_warm_state
 
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
 
+class DigestContextCrew(Crew):
+    """Crew that gives each task size-bounded digests of the outputs it depends on instead of their full text."""
+
+    def _get_context(self, task: Task, task_outputs) -> str:
+        if not task.context:
+            return ""
+        outputs = task_outputs if task.context is NOT_SPECIFIED else [dependency.output for dependency in task.context]
+        return get_task_context_store().context_for(
+            task.name or task.description,
+            task.prompt(),
+            [(output.name or output.description, output.raw) for output in outputs if output is not None],
+        )
+
 @CrewBase
 class EmissionsAgent():
     """Emissions Analysis & Insights Agent crew"""
@@ -47,12 +65,16 @@ class EmissionsAgent():
             tool_registry.get_tool('analyze_emissions'),
             tool_registry.get_tool('compare_emissions'),
             tool_registry.get_tool('get_data_info'),
+            tool_registry.get_tool('sql_query'),
             # Vector tools for cross-referencing data and regulations
             tool_registry.get_tool('query'),
             tool_registry.get_tool('similarity_search'),
             tool_registry.get_tool('retrieve_topk_with_spans'),
+            tool_registry.get_tool('batch_query'),
             # Report saving tool
             tool_registry.get_tool('save_question_report'),
+            # Full output of an earlier task, when its digest isn't enough
+            tool_registry.get_tool('fetch_task_output'),
         ]
         return Agent(
             config=agent_config,
@@ -69,7 +91,10 @@ class EmissionsAgent():
             tool_registry.get_tool('query'),
             tool_registry.get_tool('similarity_search'),
             tool_registry.get_tool('retrieve_topk_with_spans'),
+            tool_registry.get_tool('batch_query'),
             tool_registry.get_tool('load_knowledge_base'),
+            # Full output of an earlier task, when its digest isn't enough
+            tool_registry.get_tool('fetch_task_output'),
         ]
         
         # No duplicate knowledge sources - PDFs will be loaded via custom vector tools
@@ -90,6 +115,8 @@ class EmissionsAgent():
             tool_registry.get_tool('save_question_report'),
             # Analysis tools
             tool_registry.get_tool('analyze_emissions'),
+            # Full output of an earlier task, when its digest isn't enough
+            tool_registry.get_tool('fetch_task_output'),
         ]
         return Agent(
             config=agent_config,
@@ -138,6 +165,21 @@ class EmissionsAgent():
             # Remove hardcoded output_file - let save_question_report tool handle file naming
         )
 
+    @before_kickoff
+    def start_task_context(self, inputs):
+        """Keep this run's task outputs and prompt-size metrics apart from earlier runs."""
+        get_task_context_store().start_run('crew')
+        return inputs
+
+    @after_kickoff
+    def store_task_outputs(self, output):
+        """Store the outputs no later task consumed, so the run's metrics cover every task."""
+        store = get_task_context_store()
+        for task_output in output.tasks_output:
+            store.store(task_output.name or task_output.description, task_output.raw)
+        store.write_metrics()
+        return output
+
     @crew
     def crew(self) -> Crew:
         """Creates the Emissions Analysis & Insights Agent crew"""
@@ -149,13 +191,36 @@ class EmissionsAgent():
             file_paths=["user_preference.txt"]
         )
 
-        return Crew(
+        # Later tasks get digests of earlier outputs, built from the tool results of each task
+        get_task_context_store().listen()
+
+        return get_replay_cache().wrap_crew(DigestContextCrew(
             agents=self.agents, # Automatically created by the @agent decorator
-            tasks=self.tasks, # Automatically created by the @task decorator
+            tasks=self._task_graph(self.tasks), # Independent tasks run concurrently
             process=Process.sequential,
             verbose=True,
             knowledge_sources=[user_prefs_knowledge],
-        )
+        ))
+
+    def _task_graph(self, tasks: List[Task]) -> List[Task]:
+        """Order tasks by their ``input_tasks`` dependencies, running independent ones concurrently.
+        
+        Each task gets exactly its dependencies as context, so a task waits only on
+        the tasks it really needs and its prompt carries only their digests.
+        """
+        by_name = {task.name: task for task in tasks}
+        names = list(by_name)
+        dependencies = task_dependencies(self.tasks_config, names)
+        waves = execution_plan(dependencies, names, {task.name: str(id(task.agent)) for task in tasks})
+        
+        ordered = []
+        for name, run_async in async_flags(waves):
+            task = by_name[name]
+            task.async_execution = run_async
+            if dependencies[name] or 'input_tasks' in self.tasks_config[name]:
+                task.context = [by_name[dependency] for dependency in dependencies[name]]
+            ordered.append(task)
+        return ordered
 
     def simple_crew(self) -> Crew:
         """Creates a simple crew for answering single questions"""
@@ -165,11 +230,53 @@ class EmissionsAgent():
             file_paths=["user_preference.txt"]
         )
 
-        return Crew(
+        return get_replay_cache().wrap_crew(Crew(
             agents=[self.data_engineer(), self.emissions_analyst()], # Only essential agents
             tasks=[self.data_ingestion_and_quality_assessment(), self.single_question_analysis()], # Simplified tasks
             process=Process.sequential,
             verbose=True,
             # Only user preferences - PDFs handled by custom vector tools to avoid duplication
             knowledge_sources=[user_prefs_knowledge],
+        ))
+
+    def question_crew(self) -> Crew:
+        """Creates a crew that answers a single question over data that is already loaded.
+        
+        Skips the ingestion task, so several question crews can share one ingestion.
+        """
+        user_prefs_knowledge = TextFileKnowledgeSource(
+            file_paths=["user_preference.txt"]
         )
+
+        return get_replay_cache().wrap_crew(Crew(
+            agents=[self.emissions_analyst()],
+            tasks=[self.single_question_analysis()],
+            process=Process.sequential,
+            verbose=True,
+            knowledge_sources=[user_prefs_knowledge],
+        ))
+
+    def warm_crew(self, data_directory: str = "./data") -> Crew:
+        """Creates a single question crew, skipping ingestion when this process already has the data loaded.
+        
+        Falls back to ``simple_crew`` unless the emissions data, knowledge base and vector
+        collections are all loaded from ``data_directory`` and their sources are unchanged.
+        """
+        if get_warm_state().is_warm(data_directory):
+            return self.question_crew()
+        return self.simple_crew()
+
+    def shared_crew(self, data_directory: str = "./data") -> Crew:
+        """Creates a single question crew for one of several questions answered concurrently.
+        
+        Never runs the ingestion task: stale data is reloaded once with ``ensure_warm``,
+        whose lock makes concurrent callers wait for that load and then reuse it.
+        Raises RuntimeError if the data still isn't warm afterwards.
+        """
+        warm_state = get_warm_state()
+        warm_state.ensure_warm(data_directory)
+        stale = warm_state.stale_parts(data_directory)
+        if stale:
+            raise RuntimeError("Shared data could not be loaded: "
+                               + ', '.join(f"{part} ({reason})" for part, reason in stale.items()))
+        return self.question_crew()
@@ -3,11 +3,17 @@ import sys
 import warnings
 import os
 import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, Optional
 from dotenv import load_dotenv
 
-from emissions_agent.crew import EmissionsAgent
+# crewai, chromadb, pandas and PyMuPDF are imported only by the commands that
+# need them (via emissions_agent.crew or the tools), keeping --help and
+# argument or API key errors fast
 
 # Load environment variables from .env file
 # Look for .env file in current directory and parent directories
@@ -28,8 +34,17 @@ STANDARD_QUESTIONS = [
     "Generate a summary report of our total emissions by scope with key insights"
 ]
 
+# Replay cache modes (see emissions_agent.tools.replay_cache); the default comes from the environment
+REPLAY_MODES = ['off', 'cache', 'record', 'replay']
+DEFAULT_REPLAY_MODE = os.getenv('EMISSIONS_AGENT_REPLAY', 'off')
+REPLAY_HELP = ("Replay cache for LLM and tool calls: cache (serve recorded, record the rest), record, "
+               "replay (recorded only, offline) or off (default: $EMISSIONS_AGENT_REPLAY or off)")
+
 def check_api_key():
-    """Check if OpenAI API key is available."""
+    """Check if OpenAI API key is available (a replayed run doesn't need one)."""
+    from emissions_agent.tools.replay_cache import get_replay_cache
+    if get_replay_cache().mode == 'replay':
+        return True
     if not os.getenv('OPENAI_API_KEY'):
         print("⚠️  Warning: OPENAI_API_KEY not found in environment variables.")
         print("   Please create a .env file with your OpenAI API key:")
@@ -51,7 +66,7 @@ def save_report_fallback(question_text: str, result: str, question_number: int):
     
     if not report_file.exists():
         try:
-            from src.emissions_agent.tools.reporting_tools import SaveQuestionReportTool
+            from emissions_agent.tools.reporting_tools import SaveQuestionReportTool
             save_tool = SaveQuestionReportTool()
             save_result = save_tool._run(
                 question=question_text, 
@@ -75,17 +90,57 @@ def run_full_crew():
     
     try:
         print("🚀 Starting comprehensive emissions analysis with all questions...")
+        from emissions_agent.crew import EmissionsAgent
         EmissionsAgent().crew().kickoff(inputs=inputs)
     except Exception as e:
         raise Exception(f"An error occurred while running the full crew: {e}")
+    print_task_context_metrics()
 
-def run_single_question(question_text: str, question_number: int = 1, save_fallback: bool = True):
-    """Run a single question analysis."""
-    if not check_api_key():
-        return None
+def print_task_context_metrics():
+    """Print the estimated prompt size of each task with digests versus full upstream outputs."""
+    from emissions_agent.tools.task_context import get_task_context_store
+    metrics = get_task_context_store().metrics()
+    rows = [(name, row) for name, row in metrics['tasks'].items() if 'prompt_tokens' in row]
+    if not rows:
+        return
+    print("📏 Prompt size per task (estimated tokens, with digests vs full outputs):")
+    for name, row in rows:
+        print(f"   {name}: {row['prompt_tokens']:,} vs {row['prompt_tokens_full']:,} "
+              f"(context {row['context_tokens']:,} vs {row['context_tokens_full']:,})")
+    print(f"   Full task outputs and metrics.json in {metrics['run_dir']}")
+
+def print_ingestion(ingestion: dict):
+    """Print what ``ingest_shared_data`` reloaded, and why."""
+    if not ingestion['stale']:
+        print("♻️  Shared data already loaded and up to date")
+        return
+    reasons = ', '.join(f"{part}: {reason}" for part, reason in ingestion['stale'].items())
+    print(f"📥 Ingested shared data ({reasons})")
+    for result in ingestion['results']:
+        print(f"   {result}")
+
+def run_single_question(question_text: str, question_number: int = 1, save_fallback: bool = True,
+                        fast_path: bool = True, shared_data: bool = False):
+    """Run a single question analysis.
     
+    Purely quantitative questions are answered directly from the data when
+    ``fast_path`` is set; the rest go to the crew, which skips ingestion when
+    the data is already loaded in this process and still current. With
+    ``shared_data`` (questions answered concurrently) the crew never ingests
+    on its own; stale data is reloaded once for all questions instead.
+    """
     ensure_outputs_dir()
     
+    if fast_path:
+        from emissions_agent.tools.query_router import answer_with_fast_path
+        routed = answer_with_fast_path(question_text, question_number)
+        if routed is not None:
+            print(f"⚡ Answered from the emissions data ({routed['intent']}) in {routed['seconds']:.2f}s: {routed['saved']}")
+            return routed['answer']
+    
+    if not check_api_key():
+        return None
+    
     inputs = {
         'question': question_text,
         'question_number': question_number,
@@ -96,7 +151,12 @@ def run_single_question(question_text: str, question_number: int = 1, save_fallb
         print(f"🚀 Answering question: {question_text}")
         print(f"📁 Output will be saved to: outputs/question_{question_number}_report.md")
         
-        result = EmissionsAgent().simple_crew().kickoff(inputs=inputs)
+        from emissions_agent.crew import EmissionsAgent
+        from emissions_agent.tools.tool_trace import get_tool_tracer
+        with get_tool_tracer().label(f"question_{question_number}"):
+            agent = EmissionsAgent()
+            crew = agent.shared_crew() if shared_data else agent.warm_crew()
+            result = crew.kickoff(inputs=inputs)
         
         # Use fallback save mechanism if enabled
         if save_fallback:
@@ -107,20 +167,28 @@ def run_single_question(question_text: str, question_number: int = 1, save_fallb
     except Exception as e:
         raise Exception(f"An error occurred while running the question: {e}")
 
-def run_questions_individually():
-    """Run each standard question individually and collect results."""
-    if not check_api_key():
-        return None
+def run_questions_individually(concurrency: Optional[int] = None, fast_path: bool = True):
+    """Run each standard question individually and collect results.
+    
+    With ``concurrency`` the data is ingested once and up to that many questions
+    are answered at the same time.
+    """
+    if concurrency:
+        return run_questions_concurrently(concurrency, fast_path)
     
     outputs_dir = ensure_outputs_dir()
     results = {}
+    timings = {}
+    started = time.perf_counter()
     
     for i, question in enumerate(STANDARD_QUESTIONS, 1):
         print(f"\n{'='*80}")
         print(f"QUESTION {i}: {question}")
         print(f"{'='*80}")
         
-        result = run_single_question(question, question_number=i, save_fallback=True)
+        question_started = time.perf_counter()
+        result = run_single_question(question, question_number=i, save_fallback=True, fast_path=fast_path)
+        timings[i] = time.perf_counter() - question_started
         if result:
             results[f"Question {i}"] = {
                 "question": question,
@@ -128,12 +196,130 @@ def run_questions_individually():
             }
     
     # Create a summary index file
-    create_summary_index(outputs_dir)
+    create_summary_index(outputs_dir, timings, time.perf_counter() - started)
     
     return results
 
-def create_summary_index(outputs_dir: Path):
-    """Create a summary index of all question reports."""
+def run_questions_concurrently(concurrency: int, fast_path: bool = True):
+    """Ingest the data once, then answer the standard questions with bounded parallelism."""
+    outputs_dir = ensure_outputs_dir()
+    results = {}
+    timings: Dict[int, Optional[float]] = {}
+    started = time.perf_counter()
+    
+    from emissions_agent.tools.warm_state import ingest_shared_data
+    print_ingestion(ingest_shared_data())
+    
+    def answer(question_number: int, question: str):
+        question_started = time.perf_counter()
+        result = run_single_question(question, question_number=question_number, save_fallback=False,
+                                     fast_path=fast_path, shared_data=True)
+        return result, time.perf_counter() - question_started
+    
+    print(f"\n🚀 Answering {len(STANDARD_QUESTIONS)} questions with concurrency {concurrency}")
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="question") as pool:
+        futures = [(i, question, pool.submit(answer, i, question))
+                   for i, question in enumerate(STANDARD_QUESTIONS, 1)]
+        # Collect in question order so fallback saves and results stay ordered
+        for i, question, future in futures:
+            try:
+                result, seconds = future.result()
+            except Exception as e:
+                print(f"❌ Question {i} failed: {e}")
+                timings[i] = None
+                continue
+            timings[i] = seconds
+            if result:
+                save_report_fallback(question, str(result), i)
+                results[f"Question {i}"] = {
+                    "question": question,
+                    "answer": result
+                }
+    
+    create_summary_index(outputs_dir, timings, time.perf_counter() - started, concurrency)
+    
+    return results
+
+def run_server(args):
+    """Serve questions over HTTP or a Unix socket from one warm process.
+
+    Without an API key the server still starts: fast-path questions are
+    answered and questions that need the crew fail with a clear error.
+    """
+    if not check_api_key():
+        print("   Serving anyway: only questions answered directly from the data will succeed.")
+    ensure_outputs_dir()
+    from emissions_agent.server import serve
+    with tool_trace('serve'):
+        serve(data_directory=args.data_directory, host=args.host, port=args.port,
+              socket_path=args.socket, workers=args.workers, queue_size=args.queue_size)
+
+@contextmanager
+def tool_trace(name: str):
+    """Write a JSONL trace of every tool call made during the block to outputs/traces."""
+    from emissions_agent.tools.tool_trace import get_tool_tracer
+    tracer = get_tool_tracer()
+    trace_path = tracer.start_run(name)
+    try:
+        yield trace_path
+    finally:
+        tracer.end_run()
+        if trace_path.exists():
+            print(f"🧭 Tool trace written to {trace_path} (summarize with: profile {trace_path})")
+
+@contextmanager
+def replay_session(mode: str, data_directory: str = "./data"):
+    """Serve LLM completions and tool results from the replay cache during the block."""
+    if mode == 'off':
+        yield None
+        return
+    from emissions_agent.tools.replay_cache import get_replay_cache
+    cache = get_replay_cache()
+    cache.configure(mode, data_directory)
+    print(f"📼 Replay cache in {mode} mode ({cache.path})")
+    try:
+        yield cache
+    finally:
+        stats = cache.stats()
+        print(f"📼 Replay cache: {stats['hits']} hits, {stats['misses']} misses, {stats['recorded']} recorded")
+        cache.configure('off')
+
+def profile(trace_files, top: int = 15, as_json: bool = False):
+    """Summarize tool-call hot spots from traces, by default the latest questions run."""
+    import json
+    from emissions_agent.tools.tool_trace import DEFAULT_TRACE_DIR, read_trace, summarize_trace
+    
+    paths = [Path(path) for path in trace_files]
+    if not paths:
+        runs = sorted(DEFAULT_TRACE_DIR.glob("questions_*.jsonl"), key=lambda path: path.stat().st_mtime)
+        if not runs:
+            print(f"No questions traces found in {DEFAULT_TRACE_DIR}. Run the 'questions' command first.")
+            return None
+        paths = [runs[-1]]
+    
+    summary = summarize_trace(read_trace(paths))
+    if as_json:
+        print(json.dumps(summary, indent=2))
+        return summary
+    
+    print(f"Tool hot spots for {', '.join(path.name for path in paths)}")
+    print(f"{summary['calls']} calls, {summary['total_tool_ms'] / 1000:.1f}s in tools, "
+          f"~{summary['output_tokens']:,} output tokens\n")
+    print(f"{'tool':<26}{'calls':>6}{'errors':>7}{'total_s':>9}{'share':>7}{'mean_ms':>9}"
+          f"{'p95_ms':>9}{'out_tokens':>11}{'cache_hits':>11}")
+    for row in summary['tools'][:top]:
+        print(f"{row['tool']:<26}{row['calls']:>6}{row['errors']:>7}{row['total_ms'] / 1000:>9.2f}"
+              f"{row['share']:>7.0%}{row['mean_ms']:>9.1f}{row['p95_ms']:>9.1f}"
+              f"{row['output_tokens']:>11,}{row['cache_hits']:>11}")
+    if len(summary['labels']) > 1:
+        print(f"\n{'run part':<26}{'calls':>6}{'total_s':>9}{'out_tokens':>11}")
+        for label, row in sorted(summary['labels'].items()):
+            print(f"{label:<26}{row['calls']:>6}{row['total_ms'] / 1000:>9.2f}{row['output_tokens']:>11,}")
+    return summary
+
+def create_summary_index(outputs_dir: Path, timings: Optional[Dict[int, Optional[float]]] = None,
+                         total_seconds: Optional[float] = None, concurrency: int = 1):
+    """Create a summary index of all question reports, with per-question timing when given."""
     summary_content = f"""# Emissions Analysis - Question Reports Summary
 
 Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -142,7 +328,13 @@ Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 """
     for i, question in enumerate(STANDARD_QUESTIONS, 1):
-        summary_content += f"{i}. [{question}](question_{i}_report.md)\n"
+        summary_content += f"{i}. [{question}](question_{i}_report.md)"
+        if timings is not None and i in timings:
+            summary_content += f" ({timings[i]:.1f}s)" if timings[i] is not None else " (failed)"
+        summary_content += "\n"
+    
+    if total_seconds is not None:
+        summary_content += f"\nTotal wall time: {total_seconds:.1f}s (concurrency {concurrency})\n"
     
     try:
         with open(outputs_dir / "question_reports_index.md", 'w', encoding='utf-8') as f:
@@ -159,6 +351,7 @@ def train(iterations: int, filename: str):
         'current_year': str(datetime.now().year)
     }
     try:
+        from emissions_agent.crew import EmissionsAgent
         EmissionsAgent().crew().train(n_iterations=iterations, filename=filename, inputs=inputs)
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}")
@@ -172,6 +365,7 @@ def test(iterations: int, eval_llm: str):
     }
     
     try:
+        from emissions_agent.crew import EmissionsAgent
         EmissionsAgent().crew().test(n_iterations=iterations, eval_llm=eval_llm, inputs=inputs)
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
@@ -179,10 +373,21 @@ def test(iterations: int, eval_llm: str):
 def replay(task_id: str):
     """Replay the crew execution from a specific task."""
     try:
+        from emissions_agent.crew import EmissionsAgent
         EmissionsAgent().crew().replay(task_id=task_id)
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
 
+def positive_int(value: str) -> int:
+    """argparse type accepting only integers of at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}")
+    return number
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(description='Emissions Agent - AI-powered emissions analysis')
@@ -190,14 +395,38 @@ def main():
     
     # Run full comprehensive analysis
     run_parser = subparsers.add_parser('run', help='Run comprehensive analysis with all questions in one crew')
+    run_parser.add_argument('--replay', choices=REPLAY_MODES, default=DEFAULT_REPLAY_MODE, help=REPLAY_HELP)
     
     # Run questions individually 
     questions_parser = subparsers.add_parser('questions', help='Run all questions individually and save separate reports')
+    questions_parser.add_argument('--concurrency', '-c', type=positive_int, default=None,
+                                  help='Ingest data once and answer up to N questions at the same time')
+    questions_parser.add_argument('--no-fast-path', action='store_true',
+                                  help='Send every question to the crew, even purely quantitative ones')
+    questions_parser.add_argument('--replay', choices=REPLAY_MODES, default=DEFAULT_REPLAY_MODE, help=REPLAY_HELP)
     
     # Single question
     single_parser = subparsers.add_parser('ask', help='Ask a single question')
     single_parser.add_argument('question', help='The question to ask')
     single_parser.add_argument('--number', '-n', type=int, default=1, help='Question number for file naming (default: 1)')
+    single_parser.add_argument('--no-fast-path', action='store_true',
+                               help='Send the question to the crew even if it can be answered directly from the data')
+    single_parser.add_argument('--replay', choices=REPLAY_MODES, default=DEFAULT_REPLAY_MODE, help=REPLAY_HELP)
+    
+    # Long-running server
+    serve_parser = subparsers.add_parser('serve', help='Keep data warm and answer questions over a local HTTP endpoint')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    serve_parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    serve_parser.add_argument('--socket', default=None, help='Listen on this Unix socket path instead of host/port')
+    serve_parser.add_argument('--workers', '-w', type=positive_int, default=2, help='Questions answered at the same time (default: 2)')
+    serve_parser.add_argument('--queue-size', type=int, default=16, help='Questions waiting before new ones are rejected (default: 16)')
+    serve_parser.add_argument('--data-directory', default='./data', help='Directory with the emissions data and PDFs (default: ./data)')
+    
+    # Tool-call profile
+    profile_parser = subparsers.add_parser('profile', help='Summarize tool-call hot spots from a run trace')
+    profile_parser.add_argument('traces', nargs='*', help='Trace files (default: the latest questions run in outputs/traces)')
+    profile_parser.add_argument('--top', type=int, default=15, help='Number of tools to show (default: 15)')
+    profile_parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
     
     # Training
     train_parser = subparsers.add_parser('train', help='Train the crew')
@@ -216,11 +445,18 @@ def main():
     args = parser.parse_args()
     
     if args.command == 'run':
-        run_full_crew()
+        with replay_session(args.replay):
+            run_full_crew()
     elif args.command == 'questions':
-        run_questions_individually()
+        with tool_trace('questions'), replay_session(args.replay):
+            run_questions_individually(args.concurrency, fast_path=not args.no_fast_path)
     elif args.command == 'ask':
-        run_single_question(args.question, args.number)
+        with tool_trace('ask'), replay_session(args.replay):
+            run_single_question(args.question, args.number, fast_path=not args.no_fast_path)
+    elif args.command == 'serve':
+        run_server(args)
+    elif args.command == 'profile':
+        profile(args.traces, args.top, args.json)
     elif args.command == 'train':
         train(args.iterations, args.filename)
     elif args.command == 'test':
@@ -0,0 +1,356 @@
+"""
+Long-running question server.
+
+Keeps the tool registry, loaded data and vector collections warm in one
+process and answers questions over a local HTTP endpoint (TCP or a Unix
+socket). Questions go through a bounded queue served by a fixed pool of
+workers; when the queue is full new questions are rejected with 503 rather
+than piling up.
+
+Endpoints:
+    POST /ask         {"question": ..., "wait": true} -> answer, or 202 with a job id when wait is false
+    GET  /jobs/<id>   status and answer of a submitted question
+    GET  /health      liveness, warm state and queue depth
+    GET  /metrics     request counters, queue depth and answer latency percentiles
+"""
+
+import json
+import os
+import queue
+import re
+import socketserver
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_WAIT_SECONDS = 600.0
+# Finished jobs kept for GET /jobs/<id>
+MAX_FINISHED_JOBS = 1000
+# Seconds a rejected client is asked to wait before retrying
+RETRY_AFTER_SECONDS = 5
+# Where question reports are saved (see SaveQuestionReportTool)
+REPORTS_DIRECTORY = Path("outputs")
+_REPORT_NAME = re.compile(r"question_(\d+)_report\.md$")
+
+
+def highest_report_number(reports_directory: Path = REPORTS_DIRECTORY) -> int:
+    """Highest N of the ``question_N_report.md`` files already saved, 0 if none."""
+    if not reports_directory.is_dir():
+        return 0
+    numbers = [int(match.group(1)) for match in map(_REPORT_NAME.match, os.listdir(reports_directory)) if match]
+    return max(numbers, default=0)
+
+
+def parse_question_number(value) -> Optional[int]:
+    """A client-supplied question number: None, or a positive int. Raises ValueError otherwise."""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError(f"question_number must be a positive integer, got {value!r}")
+    return value
+
+
+def answer_question(question: str, question_number: int, data_directory: str) -> str:
+    """Answer purely quantitative questions from the data directly, the rest with the crew."""
+    from emissions_agent.tools.query_router import answer_with_fast_path
+
+    routed = answer_with_fast_path(question, question_number, data_directory)
+    if routed is not None:
+        return routed['answer']
+    return answer_with_crew(question, question_number, data_directory)
+
+
+def answer_with_crew(question: str, question_number: int, data_directory: str) -> str:
+    """Answer a question with a crew over the shared, warm data (never runs its own ingestion)."""
+    from emissions_agent.crew import EmissionsAgent
+    from emissions_agent.tools.replay_cache import get_replay_cache
+    from emissions_agent.tools.tool_trace import get_tool_tracer
+
+    if not os.getenv('OPENAI_API_KEY') and get_replay_cache().mode != 'replay':
+        raise RuntimeError("OPENAI_API_KEY is not set: this question needs the crew, "
+                           "only questions answered directly from the emissions data can be served")
+    inputs = {
+        'question': question,
+        'question_number': question_number,
+        'current_year': str(datetime.now().year)
+    }
+    with get_tool_tracer().label(f"question_{question_number}"):
+        return str(EmissionsAgent().shared_crew(data_directory).kickoff(inputs=inputs))
+
+
+class Job:
+    """A submitted question and, once answered, its result."""
+
+    def __init__(self, question: str, question_number: int):
+        self.id = uuid.uuid4().hex
+        self.question = question
+        self.question_number = question_number
+        self.status = 'queued'
+        self.answer: Optional[str] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.seconds: Optional[float] = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'status': self.status,
+            'question': self.question,
+            'question_number': self.question_number,
+            'answer': self.answer,
+            'error': self.error,
+            'seconds': round(self.seconds, 3) if self.seconds is not None else None,
+        }
+
+
+class QuestionService:
+    """Bounded question queue served by a pool of worker threads over warm data."""
+
+    def __init__(self, data_directory: str = "./data", workers: int = DEFAULT_WORKERS,
+                 queue_size: int = DEFAULT_QUEUE_SIZE,
+                 answer: Optional[Callable[[str, int, str], str]] = None):
+        self.data_directory = data_directory
+        self.workers = max(1, workers)
+        self.answer = answer or answer_question
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._next_number = 1
+        self._in_flight = 0
+        self._latencies = deque(maxlen=1000)
+        self.counters = {'submitted': 0, 'rejected': 0, 'completed': 0, 'failed': 0}
+        self.started_at = time.time()
+
+    def warm_up(self) -> dict:
+        """Build the tool registry and load whatever data is not already warm.
+
+        Returns ``ingest_shared_data``'s status.
+        """
+        from emissions_agent.tools.warm_state import ingest_shared_data
+        from emissions_agent.tools.tool_registry import get_tool_registry
+
+        get_tool_registry()
+        return ingest_shared_data(self.data_directory)
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"question-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Let queued questions finish, then stop the workers."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def submit(self, question: str, question_number: Optional[int] = None) -> Optional[Job]:
+        """Queue a question; returns None when the queue is full.
+
+        Without a ``question_number`` the question is numbered after the highest
+        report already saved, so served reports never overwrite earlier ones.
+        """
+        with self._lock:
+            numbered = question_number is None
+            if numbered:
+                self._next_number = max(self._next_number, highest_report_number() + 1)
+            job = Job(question, self._next_number if numbered else question_number)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self.counters['rejected'] += 1
+                return None
+            self._next_number = max(self._next_number, job.question_number + 1)
+            self.counters['submitted'] += 1
+            self._jobs[job.id] = job
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _work(self):
+        from emissions_agent.tools.warm_state import get_warm_state
+
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                self._in_flight += 1
+            job.status = 'running'
+            started = time.perf_counter()
+            try:
+                # Reload only if the sources changed since the last question
+                get_warm_state().ensure_warm(self.data_directory)
+                job.answer = self.answer(job.question, job.question_number, self.data_directory)
+                job.status = 'completed'
+            except Exception as e:
+                job.error = str(e)
+                job.status = 'failed'
+            job.seconds = time.perf_counter() - started
+            with self._lock:
+                self._in_flight -= 1
+                self.counters[job.status] += 1
+                if job.status == 'completed':
+                    self._latencies.append(job.seconds)
+                self._forget_finished()
+            job.done.set()
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done.is_set()]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def health(self) -> dict:
+        from emissions_agent.tools.warm_state import get_warm_state
+
+        return {
+            'status': 'ok',
+            'warm': get_warm_state().is_warm(self.data_directory),
+            'workers': self.workers,
+            'queue_depth': self._queue.qsize(),
+            'queue_capacity': self._queue.maxsize,
+        }
+
+    def metrics(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            metrics = {
+                **self.counters,
+                'in_flight': self._in_flight,
+                'queue_depth': self._queue.qsize(),
+                'queue_capacity': self._queue.maxsize,
+                'workers': self.workers,
+                'uptime_seconds': round(time.time() - self.started_at, 1),
+            }
+        for name, q in (('p50', 0.5), ('p95', 0.95), ('max', 1.0)):
+            metrics[f'latency_{name}_seconds'] = (
+                round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 3) if latencies else None
+            )
+        return metrics
+
+
+class QuestionRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints over the server's ``QuestionService``."""
+
+    server_version = "EmissionsAgent/0.1"
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def _send(self, status: int, body: dict, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        service: QuestionService = self.server.service
+        if self.path == '/health':
+            self._send(200, service.health())
+        elif self.path == '/metrics':
+            self._send(200, service.metrics())
+        elif self.path.startswith('/jobs/'):
+            job = service.get_job(self.path[len('/jobs/'):])
+            if job is None:
+                self._send(404, {'error': 'Unknown job'})
+            else:
+                self._send(200, job.to_dict())
+        else:
+            self._send(404, {'error': f'Unknown path {self.path}'})
+
+    def do_POST(self):
+        service: QuestionService = self.server.service
+        if self.path != '/ask':
+            self._send(404, {'error': f'Unknown path {self.path}'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            question = str(body['question']).strip()
+            if not question:
+                raise ValueError("question is empty")
+            wait = bool(body.get('wait', True))
+            timeout_seconds = float(body.get('timeout_seconds', DEFAULT_WAIT_SECONDS))
+        except (KeyError, ValueError, TypeError) as e:
+            self._send(400, {'error': f'Expected a JSON body with a "question": {str(e)}'})
+            return
+        try:
+            question_number = parse_question_number(body.get('question_number'))
+        except ValueError as e:
+            self._send(400, {'error': str(e)})
+            return
+
+        job = service.submit(question, question_number)
+        if job is None:
+            self._send(503, {'error': 'Server busy, question queue is full'},
+                       {'Retry-After': str(RETRY_AFTER_SECONDS)})
+            return
+        if not wait:
+            self._send(202, job.to_dict(), {'Location': f'/jobs/{job.id}'})
+            return
+        if not job.done.wait(timeout_seconds):
+            # Still answered in the background; the client can poll for it
+            self._send(202, job.to_dict(), {'Location': f'/jobs/{job.id}'})
+            return
+        self._send(200 if job.status == 'completed' else 500, job.to_dict())
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP over a Unix domain socket."""
+
+    daemon_threads = True
+
+
+def create_server(service: QuestionService, host: str = "127.0.0.1", port: int = 8765,
+                  socket_path: Optional[str] = None):
+    """HTTP server bound to ``socket_path`` if given, else to ``host:port``."""
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = UnixHTTPServer(socket_path, QuestionRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), QuestionRequestHandler)
+        server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def serve(data_directory: str = "./data", host: str = "127.0.0.1", port: int = 8765,
+          socket_path: Optional[str] = None, workers: int = DEFAULT_WORKERS,
+          queue_size: int = DEFAULT_QUEUE_SIZE):
+    """Warm up, then answer questions until interrupted."""
+    service = QuestionService(data_directory, workers=workers, queue_size=queue_size)
+    ingestion = service.warm_up()
+    if ingestion['stale']:
+        print(f"📥 Loaded {', '.join(ingestion['stale'])} from {data_directory}")
+    server = create_server(service, host, port, socket_path)
+    service.start()
+    address = socket_path or f"http://{host}:{port}"
+    print(f"🛰️  Serving questions on {address} ({workers} workers, queue of {queue_size})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Shutting down, finishing queued questions...")
+    finally:
+        server.server_close()
+        service.stop()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
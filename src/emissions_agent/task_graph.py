@@ -0,0 +1,92 @@
+"""
+Dependency graph of the crew's tasks, read from ``input_tasks`` in tasks.yaml.
+
+A task that declares ``input_tasks`` depends only on those tasks; one that
+doesn't keeps the sequential behaviour and depends on every task declared
+before it. ``execution_plan`` groups the tasks into waves whose members have
+all their dependencies in earlier waves, so they can run at the same time.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+
+def task_dependencies(tasks_config: Dict[str, dict], names: Sequence[str]) -> Dict[str, List[str]]:
+    """Direct dependencies of each task in ``names``, restricted to tasks in ``names``.
+
+    Raises ValueError for an unknown task name in ``input_tasks``.
+    """
+    dependencies = {}
+    for position, name in enumerate(names):
+        declared = tasks_config.get(name, {}).get('input_tasks')
+        if declared is None:
+            dependencies[name] = list(names[:position])
+            continue
+        unknown = [dependency for dependency in declared if dependency not in tasks_config]
+        if unknown:
+            raise ValueError(f"Task '{name}' has unknown input_tasks: {', '.join(unknown)}")
+        # Dependencies outside this crew (e.g. in a reduced crew) are already satisfied
+        dependencies[name] = [dependency for dependency in declared if dependency in names]
+    return dependencies
+
+
+def execution_levels(dependencies: Dict[str, List[str]], names: Sequence[str]) -> List[List[str]]:
+    """Topological levels: each task comes one level after its deepest dependency.
+
+    Tasks keep their declaration order within a level. Raises ValueError on a cycle.
+    """
+    levels: Dict[str, int] = {}
+    remaining = list(names)
+    while remaining:
+        ready = [name for name in remaining if all(dependency in levels for dependency in dependencies[name])]
+        if not ready:
+            raise ValueError(f"Cyclic input_tasks between: {', '.join(remaining)}")
+        for name in ready:
+            levels[name] = 1 + max((levels[dependency] for dependency in dependencies[name]), default=-1)
+        remaining = [name for name in remaining if name not in levels]
+    grouped: List[List[str]] = [[] for _ in range(max(levels.values(), default=-1) + 1)]
+    for name in names:
+        grouped[levels[name]].append(name)
+    return grouped
+
+
+def execution_plan(dependencies: Dict[str, List[str]], names: Sequence[str],
+                   agents: Dict[str, str]) -> List[List[str]]:
+    """Waves of tasks that can run concurrently, in execution order.
+
+    An agent can only work on one task at a time, so tasks of the same level
+    that share an agent are spread over consecutive waves.
+    """
+    waves = []
+    for level in execution_levels(dependencies, names):
+        pending = list(level)
+        while pending:
+            wave, busy = [], set()
+            for name in pending:
+                if agents.get(name) not in busy:
+                    wave.append(name)
+                    busy.add(agents.get(name))
+            pending = [name for name in pending if name not in wave]
+            waves.append(wave)
+    return waves
+
+
+def async_flags(waves: List[List[str]]) -> List[Tuple[str, bool]]:
+    """Flatten waves into ``(task, async_execution)`` for a sequential crew.
+
+    A sequential crew starts asynchronous tasks in the background and makes
+    the next synchronous task wait for all of them, so the tasks of a wave run
+    asynchronously and single-task waves synchronously. crewai requires a
+    synchronous task between dependent asynchronous ones and at most one
+    asynchronous task at the end, so a wave that follows an asynchronous
+    wave starts with a synchronous task, and the last wave ends with one.
+    """
+    flags: List[Tuple[str, bool]] = []
+    for index, wave in enumerate(waves):
+        previous_async = bool(flags) and flags[-1][1]
+        last_wave = index == len(waves) - 1
+        for position, name in enumerate(wave):
+            synchronous = (len(wave) == 1
+                           or (position == 0 and previous_async)
+                           or (last_wave and position == len(wave) - 1))
+            flags.append((name, not synchronous))
+    return flags
@@ -6,32 +6,50 @@ Maps tools.yaml specifications to actual Python implementations.
 # This file now serves as a simple import aggregator.
 # The actual tool registry logic is in tool_registry.py
 
-# Re-export tools for convenient importing
-from .data_tools import (
-    LoadEmissionsDataTool, 
-    LoadKnowledgeBaseTool, 
-    AnalyzeEmissionsTool, 
-    CompareEmissionsTool, 
-    GetDataInfoTool,
-    CreateVectorCollectionsTool
-)
-from .vector_tools import UpsertTool, QueryTool, SimilaritySearchTool, RetrieveTopKWithSpansTool
-from .reporting_tools import WriteMDTool, WriteFileTool, SaveQuestionReportTool
+import importlib
 
-# For backwards compatibility, import the modern registry
-from .tool_registry import get_tool_registry
+# Re-export tools for convenient importing. Submodules are imported on first
+# attribute access so that importing the package stays cheap.
+_EXPORTS = {
+    # Data tools
+    'LoadEmissionsDataTool': 'data_tools', 'LoadKnowledgeBaseTool': 'data_tools',
+    'AnalyzeEmissionsTool': 'data_tools', 'CompareEmissionsTool': 'data_tools',
+    'GetDataInfoTool': 'data_tools', 'CreateVectorCollectionsTool': 'data_tools', 'SQLQueryTool': 'data_tools',
+    
+    # Vector tools
+    'UpsertTool': 'vector_tools', 'QueryTool': 'vector_tools', 'SimilaritySearchTool': 'vector_tools',
+    'RetrieveTopKWithSpansTool': 'vector_tools', 'BatchQueryTool': 'vector_tools',
+    
+    # Reporting tools
+    'WriteMDTool': 'reporting_tools', 'WriteFileTool': 'reporting_tools', 'SaveQuestionReportTool': 'reporting_tools',
+    
+    # Task context tools
+    'FetchTaskOutputTool': 'task_context',
+    
+    # For backwards compatibility, the modern registry
+    'get_tool_registry': 'tool_registry',
+}
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{module_name}", __name__), name)
 
 __all__ = [
     # Data tools
     'LoadEmissionsDataTool', 'LoadKnowledgeBaseTool', 'AnalyzeEmissionsTool', 
-    'CompareEmissionsTool', 'GetDataInfoTool', 'CreateVectorCollectionsTool',
+    'CompareEmissionsTool', 'GetDataInfoTool', 'CreateVectorCollectionsTool', 'SQLQueryTool',
     
     # Vector tools
-    'UpsertTool', 'QueryTool', 'SimilaritySearchTool', 'RetrieveTopKWithSpansTool',
+    'UpsertTool', 'QueryTool', 'SimilaritySearchTool', 'RetrieveTopKWithSpansTool', 'BatchQueryTool',
     
     # Reporting tools
     'WriteMDTool', 'WriteFileTool', 'SaveQuestionReportTool',
     
+    # Task context tools
+    'FetchTaskOutputTool',
+    
     # Registry
     'get_tool_registry'
 ]
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""
+Materialized aggregate cube over an emissions inventory.
+
+The cube groups a scope's rows by whichever of Facility, Category, Supplier
+and month are present and keeps sum, count, min and max of CO2e_Tonnes plus
+the row count per group. Summary and hotspot answers are then computed from
+the groups rather than by rescanning every row.
+"""
+
+from typing import Hashable, List, Optional
+
+import pandas as pd
+
+from .data_cache import infer_date_format, parse_dates
+
+VALUE_COLUMN = 'CO2e_Tonnes'
+DIMENSIONS = ['Facility', 'Category', 'Supplier', 'Month']
+# Hotspots are reported on the first of these present in the data
+HOTSPOT_DIMENSIONS = ['Facility', 'Category']
+# Reported tonnages are rounded so that answers don't depend on summation order
+TONNES_DECIMALS = 6
+
+
+def round_tonnes(value) -> float:
+    """Round an emissions figure for reporting."""
+    return round(float(value), TONNES_DECIMALS)
+
+
+def _month_column(df: pd.DataFrame, date_format: Optional[str] = None) -> Optional[pd.Series]:
+    if 'Date' not in df.columns:
+        return None
+    return parse_dates(df['Date'], date_format or infer_date_format(df['Date'])).dt.strftime('%Y-%m')
+
+
+class AggregateCube:
+    """Per-group sum/count/min/max/rows of CO2e_Tonnes for one scope."""
+
+    def __init__(self, groups: pd.DataFrame, dimensions: List[str]):
+        self.groups = groups
+        self.dimensions = dimensions
+        # Identify the data the cube was built from so stale cubes are never served
+        self.source_key: Optional[Hashable] = None
+        self.frame: Optional[pd.DataFrame] = None
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, date_format: Optional[str] = None) -> Optional["AggregateCube"]:
+        """Build a cube from a scope dataframe, or None if it has no CO2e_Tonnes column.
+
+        ``date_format`` overrides the format guessed from ``df``'s first date, so
+        that cubes built over chunks of one file bucket months the same way.
+        """
+        if VALUE_COLUMN not in df.columns:
+            return None
+
+        keys = {}
+        for dimension in DIMENSIONS:
+            if dimension == 'Month':
+                month = _month_column(df, date_format)
+                if month is not None:
+                    keys['Month'] = month
+            elif dimension in df.columns:
+                keys[dimension] = df[dimension]
+
+        values = df[VALUE_COLUMN]
+        if not keys:
+            # No dimensions to group on: a single group for the whole scope
+            keys['_all'] = pd.Series(0, index=df.index)
+
+        frame = pd.DataFrame({**keys, VALUE_COLUMN: values})
+        groups = frame.groupby(list(keys), dropna=False, observed=True, sort=False)[VALUE_COLUMN].agg(
+            ['sum', 'count', 'min', 'max', 'size']
+        ).rename(columns={'size': 'rows'})
+        return cls(groups, list(keys))
+
+    @classmethod
+    def merge(cls, cubes: List["AggregateCube"]) -> Optional["AggregateCube"]:
+        """Combine cubes built over disjoint row sets of the same scope."""
+        cubes = [cube for cube in cubes if cube is not None]
+        if not cubes:
+            return None
+        dimensions = cubes[0].dimensions
+        combined = pd.concat([cube.groups for cube in cubes])
+        groups = combined.groupby(level=list(range(len(dimensions))), dropna=False, sort=False).agg(
+            {'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max', 'rows': 'sum'}
+        )
+        groups.index.names = dimensions
+        return cls(groups, dimensions)
+
+    def summary(self) -> dict:
+        """Total, mean and max emissions plus record count."""
+        total = float(self.groups['sum'].sum())
+        count = int(self.groups['count'].sum())
+        return {
+            "total_emissions": round_tonnes(total),
+            "average_emissions": round_tonnes(total / count) if count else float('nan'),
+            "max_emissions": round_tonnes(self.groups['max'].max()) if count else float('nan'),
+            "records": int(self.groups['rows'].sum())
+        }
+
+    def totals_by(self, dimension: str) -> pd.Series:
+        """Total emissions per value of a dimension, largest first (missing keys dropped)."""
+        totals = self.groups['sum'].groupby(level=dimension, dropna=True, observed=True).sum()
+        return totals.sort_values(ascending=False, kind='stable')
+
+    def hotspots(self, top_n: int = 3) -> Optional[dict]:
+        """Top emitting facilities (or categories when there is no Facility column)."""
+        for dimension in HOTSPOT_DIMENSIONS:
+            if dimension in self.dimensions:
+                totals = self.totals_by(dimension).head(top_n)
+                return {f"{dimension.lower()}_hotspots": {k: round_tonnes(v) for k, v in totals.items()}}
+        return None
+
+    @property
+    def memory_bytes(self) -> int:
+        return int(self.groups.memory_usage(deep=True).sum())
+
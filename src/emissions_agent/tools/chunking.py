@@ -0,0 +1,236 @@
+"""
+Pluggable chunking engines for knowledge base documents.
+
+A chunker receives a document as a list of pages, each holding the text blocks
+PyMuPDF extracted from it, and returns chunks with the page span they cover:
+``{'text': ..., 'page_start': ..., 'page_end': ...}``.
+
+- ``fixed``: the original behaviour, fixed-size character slices per page.
+- ``structured``: groups headings, paragraphs and tables into token-budgeted
+  chunks that may span pages, with sentence-level overlap between chunks.
+"""
+
+import inspect
+import math
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Dict, List, Type
+
+# Rough characters-per-token ratio for English text with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+")
+_DIGITS = re.compile(r"\d+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the token count of a string without loading a tokenizer."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class Chunker(ABC):
+    """Base class for chunking engines."""
+
+    name: str = ""
+
+    @abstractmethod
+    def chunk(self, pages: List[dict]) -> List[dict]:
+        """Chunk ``[{'page': n, 'blocks': [str, ...]}, ...]`` into page-spanned chunks."""
+
+
+class FixedSizeChunker(Chunker):
+    """Fixed-size character slices of each page's text, with no overlap."""
+
+    name = "fixed"
+
+    def __init__(self, chunk_size: int = 1000, **_):
+        self.chunk_size = chunk_size
+
+    def chunk(self, pages: List[dict]) -> List[dict]:
+        chunks = []
+        for page in pages:
+            text = ''.join(page['blocks'])
+            if not text.strip():
+                continue
+            for i in range(0, len(text), self.chunk_size):
+                piece = text[i:i + self.chunk_size]
+                if piece.strip():
+                    chunks.append({'text': piece, 'page_start': page['page'], 'page_end': page['page']})
+        return chunks
+
+
+class StructuredChunker(Chunker):
+    """Heading, paragraph and table aware chunker with token budgets and overlap.
+
+    Blocks are classified as headings (short standalone lines), tables (runs of
+    short blocks such as table cells) or paragraphs. Running headers/footers that
+    repeat across pages are dropped. A heading always starts a new chunk and is
+    repeated at the top of later chunks of the same section; tables are kept
+    whole where they fit; long paragraphs are split at sentence boundaries.
+    """
+
+    name = "structured"
+
+    def __init__(self, max_tokens: int = 256, overlap_tokens: int = 40,
+                 short_block_chars: int = 80, **_):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = min(overlap_tokens, max_tokens // 2)
+        self.short_block_chars = short_block_chars
+
+    # -- block classification ------------------------------------------------
+
+    def _running_blocks(self, pages: List[dict]) -> set:
+        """Blocks (digits ignored) repeated on many pages, e.g. headers and footers."""
+        if len(pages) < 3:
+            return set()
+        counts = Counter()
+        for page in pages:
+            counts.update({_DIGITS.sub('#', ' '.join(block.split())) for block in page['blocks']})
+        threshold = max(3, int(len(pages) * 0.3))
+        return {key for key, count in counts.items() if count >= threshold and key}
+
+    def _units(self, pages: List[dict]) -> List[dict]:
+        """Flatten pages into classified units: ``{'kind', 'text', 'page'}``."""
+        running = self._running_blocks(pages)
+        units = []
+        for page in pages:
+            blocks = []
+            for block in page['blocks']:
+                text = ' '.join(block.split())
+                if text and _DIGITS.sub('#', text) not in running:
+                    blocks.append(text)
+
+            i = 0
+            while i < len(blocks):
+                # A run of three or more short blocks reads as a table or list
+                j = i
+                while j < len(blocks) and len(blocks[j]) <= self.short_block_chars:
+                    j += 1
+                if j - i >= 3:
+                    units.append({'kind': 'table', 'text': '\n'.join(blocks[i:j]), 'page': page['page']})
+                    i = j
+                    continue
+                text = blocks[i]
+                if len(text) <= self.short_block_chars and not text.endswith(('.', ',', ';', ':')):
+                    units.append({'kind': 'heading', 'text': text, 'page': page['page']})
+                else:
+                    units.append({'kind': 'paragraph', 'text': text, 'page': page['page']})
+                i += 1
+        return units
+
+    def _split_long(self, unit: dict) -> List[dict]:
+        """Split a unit over the budget into sentence (or line, or word) pieces."""
+        if estimate_tokens(unit['text']) <= self.max_tokens:
+            return [unit]
+        separator = '\n' if unit['kind'] == 'table' else ' '
+        parts = unit['text'].split('\n') if unit['kind'] == 'table' else _SENTENCE_END.split(unit['text'])
+
+        pieces = []
+        for part in parts:
+            if estimate_tokens(part) <= self.max_tokens:
+                pieces.append(part)
+                continue
+            # A single run-on sentence: fall back to word windows
+            words = part.split()
+            step = max(1, self.max_tokens * CHARS_PER_TOKEN // 6)
+            for start in range(0, len(words), step):
+                pieces.append(' '.join(words[start:start + step]))
+        return [{'kind': unit['kind'], 'text': piece, 'page': unit['page'], 'separator': separator}
+                for piece in pieces if piece.strip()]
+
+    # -- assembly ------------------------------------------------------------
+
+    def chunk(self, pages: List[dict]) -> List[dict]:
+        chunks = []
+        # Units in the chunk being built. Units flagged 'context' (the section
+        # heading and sentences carried over as overlap) don't count as content.
+        current: List[dict] = []
+        heading = None
+        heading_fresh = False
+        last_was_heading = False
+
+        def tokens(units):
+            return sum(estimate_tokens(u['text']) for u in units)
+
+        def overlap(body):
+            carried = []
+            budget = self.overlap_tokens
+            for u in reversed(body):
+                for sentence in reversed(_SENTENCE_END.split(u['text'])):
+                    cost = estimate_tokens(sentence)
+                    if cost > budget:
+                        return carried
+                    carried.insert(0, {**u, 'text': sentence, 'separator': ' ', 'context': True})
+                    budget -= cost
+            return carried
+
+        def flush(keep_overlap: bool):
+            nonlocal current, heading_fresh
+            body = [u for u in current if not u.get('context')]
+            if body:
+                text = ''
+                for u in current:
+                    if text:
+                        text += u.get('separator', '\n')
+                    text += u['text']
+                # A repeated heading doesn't move the citation back to where the section began
+                cited = [u for u in current if u is not heading or heading_fresh]
+                chunks.append({
+                    'text': text,
+                    'page_start': min(u['page'] for u in cited),
+                    'page_end': max(u['page'] for u in cited),
+                })
+                heading_fresh = False
+            carried = overlap(body) if keep_overlap and body and self.overlap_tokens else []
+            current = ([heading] if heading is not None else []) + carried
+
+        for unit in self._units(pages):
+            if unit['kind'] == 'heading':
+                if last_was_heading and heading is not None:
+                    # Consecutive headings (e.g. chapter + section title) stack up
+                    heading = {**heading, 'text': heading['text'] + '\n' + unit['text']}
+                else:
+                    flush(keep_overlap=False)
+                    heading = {**unit, 'context': True}
+                current = [heading]
+                heading_fresh = True
+                last_was_heading = True
+                continue
+            last_was_heading = False
+
+            for piece in self._split_long(unit):
+                cost = estimate_tokens(piece['text'])
+                if tokens(current) + cost > self.max_tokens and any(not u.get('context') for u in current):
+                    flush(keep_overlap=True)
+                    # Drop carried context until the piece fits
+                    while current and tokens(current) + cost > self.max_tokens:
+                        current.pop()
+                current.append(piece)
+
+        flush(keep_overlap=False)
+        return chunks
+
+
+CHUNKERS: Dict[str, Type[Chunker]] = {
+    FixedSizeChunker.name: FixedSizeChunker,
+    StructuredChunker.name: StructuredChunker,
+}
+
+
+def register_chunker(chunker_class: Type[Chunker]):
+    """Make a chunking engine available by its ``name``.
+
+    Raises TypeError for a chunker that doesn't implement ``chunk``.
+    """
+    if inspect.isabstract(chunker_class):
+        raise TypeError(f"Chunker '{chunker_class.__name__}' must implement chunk()")
+    CHUNKERS[chunker_class.name] = chunker_class
+    return chunker_class
+
+
+def get_chunker(name: str = "structured", **options) -> Chunker:
+    """Instantiate a chunking engine by name."""
+    if name not in CHUNKERS:
+        raise ValueError(f"Unknown chunking strategy '{name}'. Available: {list(CHUNKERS)}")
+    return CHUNKERS[name](**options)
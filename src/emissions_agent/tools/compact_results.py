@@ -0,0 +1,154 @@
+"""
+Token-budgeted, citation-carrying views of vector search results.
+
+Retrieval tools used to return every matched chunk in full, with its
+metadata, pretty-printed. ``compact_results`` instead returns, per result,
+an extractive snippet around the sentences that best match the query, a
+short source/page citation and the distance, dropping results whose snippet
+repeats one already shown (overlapping chunks) and stopping once the token
+budget is spent.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from .chunking import CHARS_PER_TOKEN, estimate_tokens
+from .lexical_index import query_terms, term_spans, tokenize
+
+DEFAULT_MAX_TOKENS = 400
+# Smallest snippet worth returning, in tokens
+MIN_SNIPPET_TOKENS = 30
+# Tokens taken by a result's citation, distance and JSON punctuation
+RESULT_OVERHEAD_TOKENS = 15
+
+_SENTENCE = re.compile(r"[^.!?;:\n]+(?:[.!?;:]+|\n|$)")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """``(start, end)`` offsets of the sentences in ``text``, without surrounding whitespace."""
+    spans = []
+    for match in _SENTENCE.finditer(text):
+        start, end = match.start(), match.end()
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            spans.append((start, end))
+    return spans
+
+
+def _score(sentence: str, terms: set) -> float:
+    words = [term for term, _, _ in tokenize(sentence)]
+    if not words:
+        return 0.0
+    matched = terms.intersection(words)
+    # Distinct query terms first, then density of matches
+    return len(matched) + sum(word in terms for word in words) / (len(words) + 5)
+
+
+def best_snippet(text: str, query_text: str, max_chars: int) -> Tuple[int, int]:
+    """``(start, end)`` of the passage of at most ``max_chars`` around the best-matching sentence.
+
+    Grows from the best sentence to its neighbours while they fit; falls back
+    to the start of the text when nothing matches.
+    """
+    spans = sentence_spans(text)
+    if not spans:
+        return 0, 0
+    terms = set(query_terms(query_text))
+    scores = [_score(text[start:end], terms) for start, end in spans]
+    best = max(range(len(spans)), key=lambda i: (scores[i], -i)) if any(scores) else 0
+
+    start, end = spans[best]
+    if end - start > max_chars:
+        # A single long sentence: centre the window on the first query term in it
+        matches = term_spans(text[start:end], query_text)
+        anchor = start + matches[0]['start'] if matches else start
+        sentence_start = start
+        start = max(start, min(anchor - max_chars // 4, end - max_chars))
+        end = start + max_chars
+        # Don't cut words in half
+        if start > sentence_start and not text[start - 1].isspace():
+            start = next((m.start() for m in _WORD.finditer(text, start, end)), start)
+        cut = text.rfind(' ', start, end)
+        if end < len(text) and not text[end].isspace() and cut > start:
+            end = cut
+        return start, end
+
+    lo, hi = best, best
+    grown = True
+    while grown:
+        grown = False
+        for i in (hi + 1, lo - 1):
+            if 0 <= i < len(spans) and max(end, spans[i][1]) - min(start, spans[i][0]) <= max_chars:
+                start, end = min(start, spans[i][0]), max(end, spans[i][1])
+                lo, hi = min(lo, i), max(hi, i)
+                grown = True
+    return start, end
+
+
+def citation(metadata: Optional[dict]) -> str:
+    """Short ``document p.N`` (or ``p.N-M``) citation from chunk metadata."""
+    metadata = metadata or {}
+    name = metadata.get('document_name') or metadata.get('source') or 'unknown'
+    page, page_end = metadata.get('page'), metadata.get('page_end')
+    if page is None:
+        return str(name)
+    if page_end is not None and page_end != page:
+        return f"{name} p.{page}-{page_end}"
+    return f"{name} p.{page}"
+
+
+def _normalized(text: str) -> str:
+    return ' '.join(_WORD.findall(text.lower()))
+
+
+def compact_results(results: List[dict], query_text: str, max_tokens: int = DEFAULT_MAX_TOKENS,
+                    include_spans: bool = False) -> dict:
+    """Budgeted snippets with citations for ranked search results.
+
+    Returns ``{'results': [{'cite', 'text', 'distance'[, 'span', 'terms']}], 'omitted': n}``;
+    ``span`` is the snippet's ``[start, end]`` offset in the source chunk and
+    ``terms`` the offsets of the query terms within it (from the results' ``spans``).
+    """
+    compact = []
+    seen: List[str] = []
+    seen_ids = set()
+    remaining = max(max_tokens, MIN_SNIPPET_TOKENS + RESULT_OVERHEAD_TOKENS)
+    omitted = 0
+    for position, result in enumerate(results):
+        if result.get('id') in seen_ids:
+            continue
+        # Share what is left of the budget evenly among the results still to come
+        share = remaining // max(1, len(results) - position) - RESULT_OVERHEAD_TOKENS
+        budget = max(share, min(MIN_SNIPPET_TOKENS, remaining - RESULT_OVERHEAD_TOKENS))
+        if budget < MIN_SNIPPET_TOKENS:
+            omitted += len(results) - position
+            break
+
+        text = result.get('text') or ''
+        start, end = best_snippet(text, query_text, budget * CHARS_PER_TOKEN)
+        snippet = ' '.join(text[start:end].split())
+        key = _normalized(snippet)
+        # Overlapping chunks repeat the same passage; keep the best-ranked copy
+        if not key or any(key in other or other in key for other in seen):
+            continue
+        seen.append(key)
+        seen_ids.add(result.get('id'))
+
+        entry = {
+            'cite': citation(result.get('metadata')),
+            'text': ('…' if start > 0 else '') + snippet + ('…' if end < len(text.rstrip()) else ''),
+        }
+        if result.get('distance') is not None:
+            entry['distance'] = round(result['distance'], 3)
+        if include_spans:
+            entry['span'] = [start, end]
+            # Offsets of the query terms inside the snippet, relative to the chunk
+            entry['terms'] = [[span['start'], span['end']] for span in result.get('spans', [])
+                              if start <= span['start'] and span['end'] <= end]
+        compact.append(entry)
+        remaining -= estimate_tokens(entry['text']) + RESULT_OVERHEAD_TOKENS
+    return {'results': compact, 'omitted': omitted}
@@ -0,0 +1,354 @@
+"""
+Columnar on-disk cache for the scope CSV inventories.
+
+Parsed CSVs are converted to each scope's declared in-memory schema and
+written to Parquet next to a small JSON manifest recording the source file's
+size, mtime and SHA-256. Later loads reuse the Parquet file while the source
+is unchanged and fall back to CSV parsing (rebuilding the cache) when it
+changes.
+"""
+
+import hashlib
+import json
+import warnings
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+CACHE_DIRNAME = ".cache"
+CACHE_FORMAT_VERSION = 3
+
+# Explicit dtypes for the numeric columns of each scope so that CSV parsing
+# never has to infer them and the cached frame round-trips identically.
+SCOPE_DTYPES: Dict[str, Dict[str, str]] = {
+    "scope1": {
+        "Consumption_Amount": "float64",
+        "Emission_Factor": "float64",
+        "CO2e_Tonnes": "float64",
+    },
+    "scope2": {
+        "Consumption_Amount": "float64",
+        "Emission_Factor": "float64",
+        "CO2e_Tonnes": "float64",
+        "Renewable_Percentage": "float64",
+    },
+    "scope3": {
+        "Spend_Amount": "float64",
+        "Emission_Factor": "float64",
+        "CO2e_Tonnes": "float64",
+    },
+}
+
+
+# Declared in-memory representation of each scope's columns:
+# - category: repeated labels, stored as categoricals
+# - text: free text, stored as pyarrow-backed strings
+# - number: inputs narrowed to float32 when every value survives exactly; integers stay int64
+# - measure: summed and reported figures, kept in float64 so totals don't drift
+# - date: parsed to datetime64 when every value parses
+SCOPE_SCHEMAS: Dict[str, Dict[str, str]] = {
+    "scope1": {
+        "Facility": "category",
+        "Activity_Type": "category",
+        "Fuel_Type": "category",
+        "Consumption_Amount": "number",
+        "Consumption_Unit": "category",
+        "Emission_Factor": "number",
+        "CO2e_Tonnes": "measure",
+        "Date": "date",
+        "Notes": "text",
+    },
+    "scope2": {
+        "Facility": "category",
+        "Energy_Type": "category",
+        "Consumption_Amount": "number",
+        "Consumption_Unit": "category",
+        "Grid_Region": "category",
+        "Emission_Factor": "number",
+        "CO2e_Tonnes": "measure",
+        "Date": "date",
+        "Renewable_Percentage": "number",
+        "Notes": "text",
+    },
+    "scope3": {
+        "Category": "category",
+        "Activity_Description": "text",
+        "Spend_Amount": "number",
+        "Spend_Currency": "category",
+        "Emission_Factor": "number",
+        "CO2e_Tonnes": "measure",
+        "Date": "date",
+        "Supplier": "category",
+        "Category_Details": "category",
+        "Data_Quality": "category",
+    },
+}
+
+# Declared categoricals with more distinct values than this share of rows stay text
+CATEGORY_MAX_RATIO = 0.5
+
+
+def _parquet_available() -> bool:
+    """Check whether a Parquet engine is installed."""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def file_sha256(file_path: Path, block_size: int = 1 << 20) -> str:
+    """Compute the SHA-256 of a file without reading it all into memory."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_scope_csv(file_path: Path, **kwargs) -> pd.DataFrame:
+    """Parse a scope CSV with its declared dtypes."""
+    dtypes = SCOPE_DTYPES.get(file_path.stem, {})
+    if dtypes:
+        header = pd.read_csv(file_path, nrows=0).columns
+        dtypes = {col: dtype for col, dtype in dtypes.items() if col in header}
+    return pd.read_csv(file_path, dtype=dtypes or None, **kwargs)
+
+
+def _downcast(values: pd.Series) -> pd.Series:
+    """float32 if it holds every value exactly; integer columns stay int64.
+
+    Integers are never narrowed: an int8/int16 column silently wraps in
+    arithmetic (e.g. ``sum`` in numpy or a product in pandas), while the saving
+    is small next to the categoricals.
+    """
+    if not pd.api.types.is_float_dtype(values):
+        return values
+    narrow = values.astype('float32')
+    if (narrow.astype('float64') == values)[values.notna()].all():
+        return narrow
+    return values
+
+
+def apply_scope_schema(df: pd.DataFrame, scope: str) -> pd.DataFrame:
+    """Convert a parsed scope frame to its declared compact representation.
+
+    Only lossless conversions are applied: a numeric column is narrowed only
+    if no value changes, and Date stays text if any value fails to parse (so
+    the quality check can still report it).
+    """
+    schema = SCOPE_SCHEMAS.get(scope, {})
+    converted = {}
+    for column, kind in schema.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if kind == "category":
+            if values.nunique() <= CATEGORY_MAX_RATIO * max(len(values), 1):
+                converted[column] = values.astype('category')
+            elif _parquet_available():
+                converted[column] = values.astype('string[pyarrow]')
+        elif kind == "text":
+            if _parquet_available():
+                converted[column] = values.astype('string[pyarrow]')
+        elif kind == "number":
+            converted[column] = _downcast(pd.to_numeric(values, errors='coerce')) \
+                if pd.api.types.is_numeric_dtype(values) else values
+        elif kind == "measure":
+            if pd.api.types.is_numeric_dtype(values):
+                converted[column] = values.astype('float64')
+        elif kind == "date":
+            parsed = parse_dates(values, infer_date_format(values))
+            if not (values.notna() & parsed.isna()).any():
+                converted[column] = parsed
+    return df.assign(**converted) if converted else df
+
+
+def column_memory(df: pd.DataFrame) -> Dict[str, int]:
+    """Bytes held by each column, including string payloads."""
+    return {column: int(size) for column, size in df.memory_usage(deep=True, index=False).items()}
+
+
+def memory_report(df: pd.DataFrame, raw_memory: Optional[Dict[str, int]] = None) -> dict:
+    """Per-column dtype and bytes before (as parsed) and after the schema is applied."""
+    after = column_memory(df)
+    raw_memory = raw_memory or {}
+    columns = {
+        column: {
+            "dtype": str(df[column].dtype),
+            "bytes_before": raw_memory.get(column),
+            "bytes_after": size,
+        }
+        for column, size in after.items()
+    }
+    total_after = sum(after.values())
+    total_before = sum(raw_memory.values()) if raw_memory else None
+    return {
+        "columns": columns,
+        "total_bytes_before": total_before,
+        "total_bytes_after": total_after,
+        "reduction_pct": round(100 * (1 - total_after / total_before), 1) if total_before else None,
+    }
+
+
+def load_scope_frame(file_path: Path) -> tuple:
+    """Parse a scope CSV into its compact schema.
+
+    Returns ``(dataframe, raw_memory)`` where raw_memory holds the bytes per
+    column of the frame as parsed, before the schema was applied.
+    """
+    file_path = Path(file_path)
+    raw = read_scope_csv(file_path)
+    raw_memory = column_memory(raw)
+    return apply_scope_schema(raw, file_path.stem), raw_memory
+
+
+def iter_scope_csv(file_path: Path, chunk_rows: int, dtype: Optional[Dict[str, str]] = None) -> Iterator[pd.DataFrame]:
+    """Parse a scope CSV in chunks of ``chunk_rows`` rows, numbered continuously.
+
+    ``dtype`` overrides the declared dtypes (e.g. to pin columns whose inferred
+    type would otherwise differ between chunks).
+    """
+    file_path = Path(file_path)
+    dtypes = dict(SCOPE_DTYPES.get(file_path.stem, {}))
+    dtypes.update(dtype or {})
+    header = pd.read_csv(file_path, nrows=0).columns
+    dtypes = {col: dtype for col, dtype in dtypes.items() if col in header}
+    with pd.read_csv(file_path, dtype=dtypes or None, chunksize=chunk_rows) as reader:
+        yield from reader
+
+
+def infer_date_format(dates: pd.Series) -> Optional[str]:
+    """Guess the strftime format of a date column from its first non-empty value.
+
+    This is the guess ``pd.to_datetime`` makes itself. Making it explicit lets a
+    file parsed in chunks use the whole file's format rather than each chunk's.
+    Returns ``'mixed'`` (parse each value separately) when no format fits, and
+    None when the column has no values to guess from.
+    """
+    first = dates.first_valid_index()
+    if first is None:
+        return None
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return guess_datetime_format(str(dates[first])) or 'mixed'
+
+
+def parse_dates(dates: pd.Series, date_format: Optional[str]) -> pd.Series:
+    """Parse dates with a known format, element by element when there is none."""
+    return pd.to_datetime(dates, format=date_format or 'mixed', errors='coerce')
+
+
+class ColumnarCache:
+    """Content-hash-keyed Parquet cache for CSV files."""
+
+    def __init__(self, cache_directory: Path):
+        self.cache_directory = Path(cache_directory)
+
+    def _manifest_path(self, file_path: Path) -> Path:
+        return self.cache_directory / f"{file_path.stem}.json"
+
+    def _data_path(self, file_path: Path, sha256: str) -> Path:
+        return self.cache_directory / f"{file_path.stem}-{sha256[:16]}.parquet"
+
+    def _read_manifest(self, file_path: Path) -> Optional[dict]:
+        manifest_path = self._manifest_path(file_path)
+        if not manifest_path.exists():
+            return None
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('version') != CACHE_FORMAT_VERSION:
+            return None
+        return manifest
+
+    def _write_manifest(self, file_path: Path, manifest: dict):
+        with open(self._manifest_path(file_path), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+    def lookup(self, file_path: Path) -> Optional[tuple]:
+        """Return the cached ``(frame, raw_memory)`` for ``file_path`` if the source is unchanged."""
+        manifest = self._read_manifest(file_path)
+        if manifest is None:
+            return None
+
+        stat = file_path.stat()
+        if stat.st_mtime_ns != manifest['mtime_ns'] or stat.st_size != manifest['size']:
+            # The file was touched or rewritten - only the content hash can tell
+            if stat.st_size != manifest['size'] or file_sha256(file_path) != manifest['sha256']:
+                return None
+            manifest['mtime_ns'] = stat.st_mtime_ns
+            self._write_manifest(file_path, manifest)
+
+        data_path = self._data_path(file_path, manifest['sha256'])
+        if not data_path.exists():
+            return None
+        try:
+            df = pd.read_parquet(data_path)
+        except Exception:
+            return None
+        changed = {col: dtype for col, dtype in manifest['dtypes'].items() if str(df[col].dtype) != dtype}
+        return (df.astype(changed) if changed else df), manifest.get('raw_memory')
+
+    def store(self, file_path: Path, df: pd.DataFrame, raw_memory: Optional[Dict[str, int]] = None):
+        """Write ``df`` as the cached representation of ``file_path``."""
+        self.cache_directory.mkdir(parents=True, exist_ok=True)
+        stat = file_path.stat()
+        sha256 = file_sha256(file_path)
+        data_path = self._data_path(file_path, sha256)
+
+        tmp_path = data_path.with_suffix('.parquet.tmp')
+        df.to_parquet(tmp_path, index=False)
+        tmp_path.replace(data_path)
+
+        # Drop cache files left behind by previous versions of the source
+        for stale in self.cache_directory.glob(f"{file_path.stem}-*.parquet"):
+            if stale != data_path:
+                stale.unlink(missing_ok=True)
+
+        self._write_manifest(file_path, {
+            'version': CACHE_FORMAT_VERSION,
+            'source': str(file_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': sha256,
+            'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()},
+            'raw_memory': raw_memory,
+        })
+
+    def load(self, file_path: Path) -> tuple:
+        """Load ``file_path`` through the cache.
+
+        Returns a ``(dataframe, source, raw_memory)`` tuple where source is
+        ``"cache"`` or ``"csv"`` and raw_memory is as for ``load_scope_frame``.
+        """
+        cached = self.lookup(file_path)
+        if cached is not None:
+            df, raw_memory = cached
+            return df, "cache", raw_memory
+
+        df, raw_memory = load_scope_frame(file_path)
+        try:
+            self.store(file_path, df, raw_memory)
+        except Exception:
+            # A read-only data directory shouldn't stop the load itself
+            pass
+        return df, "csv", raw_memory
+
+
+def load_csv_cached(file_path: Path, cache_directory: Optional[Path] = None) -> tuple:
+    """Load a scope CSV, using the columnar cache when a Parquet engine is available.
+
+    Returns ``(dataframe, source, raw_memory)`` as for ``ColumnarCache.load``.
+    """
+    file_path = Path(file_path)
+    if not _parquet_available():
+        df, raw_memory = load_scope_frame(file_path)
+        return df, "csv", raw_memory
+    if cache_directory is None:
+        cache_directory = file_path.parent / CACHE_DIRNAME
+    return ColumnarCache(cache_directory).load(file_path)
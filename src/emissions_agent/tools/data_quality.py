@@ -0,0 +1,411 @@
+"""
+Rule-based, vectorized data-quality engine for the emissions inventories.
+
+Each rule is a vectorized check over a dataframe returning a boolean mask of
+violating rows. The engine combines the masks into a per-row bitmask (one bit
+per rule) and per-rule counts in a single pass per scope.
+
+Rules that compare rows with each other (unit consistency, outliers, date
+format) read whole-scope statistics from ``ScopeStatistics``. Those are built
+from counts that add up across chunks, so a file validated chunk by chunk
+(see ``streaming_analysis``) gets exactly the same report as one loaded whole.
+"""
+
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_cache import infer_date_format, parse_dates
+
+AMOUNT_COLUMNS = ['Consumption_Amount', 'Spend_Amount']
+NUMERIC_COLUMNS = ['Consumption_Amount', 'Spend_Amount', 'Emission_Factor', 'CO2e_Tonnes', 'Renewable_Percentage']
+UNIT_COLUMNS = ['Consumption_Unit', 'Spend_Currency']
+# Columns whose values should share one unit; scope 3 has no grouping column
+UNIT_GROUP_COLUMNS = ['Fuel_Type', 'Energy_Type']
+OUTLIER_GROUP_COLUMNS = ['Facility', 'Fuel_Type', 'Energy_Type', 'Category']
+
+# Emission factors are quoted either in tonnes or in kg CO2e per unit
+FACTOR_SCALES = (1.0, 0.001)
+RECONCILIATION_RTOL = 0.02
+RECONCILIATION_ATOL = 0.01
+OUTLIER_Z = 3.5
+
+# Group key used when a scope has no column to group units or peers by
+_WHOLE_SCOPE = ''
+
+
+def _first_present(df: pd.DataFrame, columns: List[str]) -> Optional[str]:
+    for column in columns:
+        if column in df.columns:
+            return column
+    return None
+
+
+def _numeric(df: pd.DataFrame, column: str) -> pd.Series:
+    return pd.to_numeric(df[column], errors='coerce')
+
+
+def _unit_groups(df: pd.DataFrame) -> pd.Series:
+    group_column = _first_present(df, UNIT_GROUP_COLUMNS)
+    if group_column is None:
+        return pd.Series(_WHOLE_SCOPE, index=df.index, dtype='object')
+    return df[group_column].astype('object')
+
+
+def _peer_keys(df: pd.DataFrame) -> pd.DataFrame:
+    columns = [column for column in OUTLIER_GROUP_COLUMNS if column in df.columns]
+    if not columns:
+        return pd.DataFrame({'_scope': _WHOLE_SCOPE}, index=df.index)
+    return df[columns].astype('object')
+
+
+class _Counts:
+    """Row counts per key, added up over chunks in first-seen key order.
+
+    Partial counts are buffered and combined once they outgrow the running
+    total, so adding many chunks doesn't regroup the total every time.
+    """
+
+    def __init__(self):
+        self._total: Optional[pd.Series] = None
+        self._pending: List[pd.Series] = []
+        self._pending_size = 0
+
+    def add(self, counts: pd.Series):
+        self._pending.append(counts)
+        self._pending_size += len(counts)
+        if self._total is None or self._pending_size > len(self._total):
+            self._combine()
+
+    def _combine(self):
+        if not self._pending:
+            return
+        parts = ([self._total] if self._total is not None else []) + self._pending
+        combined = pd.concat(parts)
+        self._total = combined.groupby(level=list(range(combined.index.nlevels)), sort=False).sum()
+        self._pending, self._pending_size = [], 0
+
+    def total(self) -> Optional[pd.Series]:
+        self._combine()
+        return self._total
+
+
+def _reduce_sorted(group: np.ndarray, values: np.ndarray, rows: np.ndarray) -> tuple:
+    """Sort (group, value) pairs and add up the rows of repeated pairs."""
+    order = np.lexsort((values, group))
+    group, values, rows = group[order], values[order], rows[order]
+    if len(group) == 0:
+        return group, values, rows
+    starts = np.flatnonzero(np.concatenate(([True], (group[1:] != group[:-1]) | (values[1:] != values[:-1]))))
+    return group[starts], values[starts], np.add.reduceat(rows, starts)
+
+
+def _grouped_median(group: np.ndarray, values: np.ndarray, weights: np.ndarray, n_groups: int) -> np.ndarray:
+    """Median of each group from distinct values and their counts (NaN for empty groups)."""
+    group, values, weights = _reduce_sorted(group, values, weights)
+    if len(group) == 0:
+        return np.full(n_groups, np.nan)
+    ends = np.cumsum(weights)
+    sizes = np.bincount(group, weights=weights, minlength=n_groups).astype(np.int64)
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+    def value_at(position):
+        return values[np.clip(np.searchsorted(ends, position, side='right'), 0, len(values) - 1)]
+
+    median = (value_at(offsets + (sizes - 1) // 2) + value_at(offsets + sizes // 2)) / 2
+    return np.where(sizes > 0, median, np.nan)
+
+
+class _PeerValueCounts:
+    """Row counts per (peer group, CO2e value) as sorted numpy arrays.
+
+    Peer groups are numbered in order of first appearance. Like ``_Counts``,
+    partial counts are buffered until they outgrow the running total.
+    """
+
+    def __init__(self):
+        self.groups: Dict[tuple, int] = {}
+        self.key_columns: List[str] = []
+        self._total = (np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=np.int64))
+        self._pending: List[tuple] = []
+        self._pending_size = 0
+
+    def add(self, keys: pd.DataFrame, values: np.ndarray):
+        self.key_columns = list(keys.columns)
+        # Rows with a missing key or value belong to no peer group
+        local = keys.groupby(self.key_columns, sort=False).ngroup().to_numpy(dtype=float)
+        keyed = ~np.isnan(local)
+        valid = keyed & ~np.isnan(values)
+        first_rows = keys[keyed].drop_duplicates()
+        codes = np.array([self.groups.setdefault(key, len(self.groups))
+                          for key in first_rows.itertuples(index=False, name=None)], dtype=np.int64)
+        if not valid.any():
+            return
+        part = _reduce_sorted(codes[local[valid].astype(np.int64)], values[valid], np.ones(int(valid.sum()), dtype=np.int64))
+        self._pending.append(part)
+        self._pending_size += len(part[0])
+        if self._pending_size > len(self._total[0]):
+            self._combine()
+
+    def _combine(self):
+        if not self._pending:
+            return
+        parts = [self._total] + self._pending
+        self._total = _reduce_sorted(*(np.concatenate([part[i] for part in parts]) for i in range(3)))
+        self._pending, self._pending_size = [], 0
+
+    def total(self) -> tuple:
+        """``(group, value, rows)`` arrays sorted by group, then value."""
+        self._combine()
+        return self._total
+
+
+class ScopeStatistics:
+    """Whole-scope statistics for the rules that compare rows with each other.
+
+    Holds row counts per (unit group, unit) and per (peer group, CO2e value),
+    plus the date format guessed from the first date. Counts from separate
+    chunks of a file are combined with ``observe``.
+    """
+
+    def __init__(self):
+        self._unit_counts = _Counts()
+        self._value_counts = _PeerValueCounts()
+        self.date_format: Optional[str] = None
+        self._modal_units: Optional[pd.Series] = None
+        self._peer_stats: Optional[pd.DataFrame] = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "ScopeStatistics":
+        stats = cls()
+        stats.observe(df)
+        return stats
+
+    def observe(self, df: pd.DataFrame):
+        """Add the rows of ``df`` (the next chunk of the scope)."""
+        unit_column = _first_present(df, UNIT_COLUMNS)
+        if unit_column is not None:
+            frame = pd.DataFrame({'group': _unit_groups(df), 'unit': df[unit_column].astype('object')})
+            self._unit_counts.add(frame.groupby(['group', 'unit'], sort=False).size())
+        if 'CO2e_Tonnes' in df.columns:
+            self._value_counts.add(_peer_keys(df), _numeric(df, 'CO2e_Tonnes').to_numpy(dtype=float))
+        if self.date_format is None and 'Date' in df.columns:
+            self.date_format = infer_date_format(df['Date'])
+        self._modal_units = self._peer_stats = None
+
+    def modal_units(self) -> pd.Series:
+        """Most common unit per unit group (ties go to the unit seen first)."""
+        if self._modal_units is None:
+            unit_counts = self._unit_counts.total()
+            if unit_counts is None or unit_counts.empty:
+                self._modal_units = pd.Series(dtype='object')
+            else:
+                ordered = unit_counts.rename('rows').sort_values(ascending=False, kind='stable').reset_index()
+                self._modal_units = ordered.drop_duplicates('group').set_index('group')['unit']
+        return self._modal_units
+
+    def peer_stats(self) -> pd.DataFrame:
+        """Median and median absolute deviation of CO2e_Tonnes per peer group."""
+        if self._peer_stats is None:
+            group, values, weights = self._value_counts.total()
+            if len(group) == 0:
+                return pd.DataFrame(columns=['median', 'mad'])
+            n_groups = len(self._value_counts.groups)
+            median = _grouped_median(group, values, weights, n_groups)
+            mad = _grouped_median(group, np.abs(values - median[group]), weights, n_groups)
+            index = pd.MultiIndex.from_tuples(list(self._value_counts.groups), names=self._value_counts.key_columns)
+            self._peer_stats = pd.DataFrame({'median': median, 'mad': mad}, index=index)
+        return self._peer_stats
+
+
+class DuplicateTracker:
+    """Flags rows repeating any row seen in earlier chunks (or earlier in the chunk).
+
+    Rows are compared by 64-bit hash, keeping 8 bytes per distinct row seen.
+    """
+
+    def __init__(self):
+        self._seen = np.empty(0, dtype=np.uint64)
+
+    def mark(self, df: pd.DataFrame) -> np.ndarray:
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        mask = pd.Series(hashes).duplicated().to_numpy()
+        if len(self._seen):
+            positions = np.minimum(np.searchsorted(self._seen, hashes), len(self._seen) - 1)
+            mask = mask | (self._seen[positions] == hashes)
+        new = np.unique(hashes[~mask])
+        self._seen = np.insert(self._seen, np.searchsorted(self._seen, new), new)
+        return mask
+
+
+def check_missing_values(df: pd.DataFrame, stats: ScopeStatistics) -> np.ndarray:
+    """Any empty cell in the row."""
+    return df.isna().to_numpy().any(axis=1)
+
+
+def check_duplicate_rows(df: pd.DataFrame, stats: ScopeStatistics) -> np.ndarray:
+    """Exact repeat of an earlier row."""
+    return df.duplicated().to_numpy()
+
+
+def check_missing_emission_factor(df: pd.DataFrame, stats: ScopeStatistics) -> np.ndarray:
+    """Emission factor absent, non-numeric or zero."""
+    if 'Emission_Factor' not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    factor = _numeric(df, 'Emission_Factor')
+    return (factor.isna() | (factor == 0)).to_numpy()
+
+
+def check_negative_values(df: pd.DataFrame, stats: ScopeStatistics) -> np.ndarray:
+    """Any negative amount, factor or emission figure."""
+    mask = np.zeros(len(df), dtype=bool)
+    for column in NUMERIC_COLUMNS:
+        if column in df.columns:
+            mask |= (_numeric(df, column) < 0).to_numpy()
+    return mask
+
+
+def check_co2e_reconciliation(df: pd.DataFrame, stats: ScopeStatistics) -> np.ndarray:
+    """CO2e_Tonnes doesn't match amount x emission factor (in t or kg per unit)."""
+    amount_column = _first_present(df, AMOUNT_COLUMNS)
+    if amount_column is None or 'Emission_Factor' not in df.columns or 'CO2e_Tonnes' not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+
+    base = (_numeric(df, amount_column) * _numeric(df, 'Emission_Factor')).to_numpy(dtype=float)
+    reported = _numeric(df, 'CO2e_Tonnes').to_numpy(dtype=float)
+    matches = np.zeros(len(df), dtype=bool)
+    for scale in FACTOR_SCALES:
+        matches |= np.isclose(reported, base * scale, rtol=RECONCILIATION_RTOL, atol=RECONCILIATION_ATOL)
+    # Rows missing an input are reported by the missing-value rules instead
+    comparable = ~(np.isnan(base) | np.isnan(reported))
+    return comparable & ~matches
+
+
+def check_unit_consistency(df: pd.DataFrame, stats: ScopeStatistics) -> np.ndarray:
+    """Unit differs from the most common unit for the same fuel/energy type (or scope)."""
+    unit_column = _first_present(df, UNIT_COLUMNS)
+    if unit_column is None:
+        return np.zeros(len(df), dtype=bool)
+    units = df[unit_column].astype('object')
+    expected = _unit_groups(df).map(stats.modal_units())
+    return (units.notna() & expected.notna() & (units != expected)).to_numpy()
+
+
+def check_outliers(df: pd.DataFrame, stats: ScopeStatistics) -> np.ndarray:
+    """CO2e_Tonnes far from its peer group's median (modified z-score above 3.5)."""
+    if 'CO2e_Tonnes' not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    values = _numeric(df, 'CO2e_Tonnes').to_numpy(dtype=float)
+    peers = stats.peer_stats().reindex(pd.MultiIndex.from_frame(_peer_keys(df)))
+    median = peers['median'].to_numpy(dtype=float)
+    mad = peers['mad'].to_numpy(dtype=float)
+    deviation = np.abs(values - median)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = 0.6745 * deviation / mad
+    return np.nan_to_num(z, nan=0.0, posinf=0.0) > OUTLIER_Z
+
+
+def check_date_parsing(df: pd.DataFrame, stats: ScopeStatistics) -> np.ndarray:
+    """Date present but not parseable."""
+    if 'Date' not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    parsed = parse_dates(df['Date'], stats.date_format)
+    return (df['Date'].notna() & parsed.isna()).to_numpy()
+
+
+# Order defines each rule's bit in the violation bitmask
+RULES: Dict[str, Callable[[pd.DataFrame, ScopeStatistics], np.ndarray]] = {
+    'missing_values': check_missing_values,
+    'duplicate_rows': check_duplicate_rows,
+    'missing_emission_factor': check_missing_emission_factor,
+    'negative_values': check_negative_values,
+    'co2e_reconciliation': check_co2e_reconciliation,
+    'unit_inconsistency': check_unit_consistency,
+    'outliers': check_outliers,
+    'invalid_dates': check_date_parsing,
+}
+
+
+def rule_bits() -> Dict[str, int]:
+    """Bit value of each rule in the violation bitmask."""
+    return {name: 1 << i for i, name in enumerate(RULES)}
+
+
+def validate(df: pd.DataFrame, stats: Optional[ScopeStatistics] = None,
+             duplicates: Optional[DuplicateTracker] = None) -> dict:
+    """Run every rule over ``df``.
+
+    ``stats`` and ``duplicates`` carry whole-scope state when ``df`` is one
+    chunk of a larger file; by default ``df`` is treated as the whole scope.
+
+    Returns ``{'bitmask': np.ndarray[uint16], 'rule_counts': {...}, 'rows_with_issues': int,
+    'missing_cells': int}``.
+    """
+    if stats is None:
+        stats = ScopeStatistics.from_frame(df)
+    bitmask = np.zeros(len(df), dtype=np.uint16)
+    rule_counts = {}
+    # The null matrix feeds both the missing-values rule and the cell count
+    missing = df.isna().to_numpy()
+    for bit, (name, rule) in enumerate(RULES.items()):
+        if rule is check_missing_values:
+            mask = missing.any(axis=1)
+        elif rule is check_duplicate_rows and duplicates is not None:
+            mask = duplicates.mark(df)
+        else:
+            mask = rule(df, stats)
+        rule_counts[name] = int(mask.sum())
+        bitmask |= mask.astype(np.uint16) << bit
+    return {
+        'bitmask': bitmask,
+        'rule_counts': rule_counts,
+        'rows_with_issues': int(np.count_nonzero(bitmask)),
+        'missing_cells': int(missing.sum()),
+    }
+
+
+class QualityAccumulator:
+    """Combines the validation results of consecutive chunks into one report."""
+
+    def __init__(self, sample_size: int = 5):
+        self.sample_size = sample_size
+        self.total_rows = 0
+        self.missing_cells = 0
+        self.rows_with_issues = 0
+        self.rule_counts = {name: 0 for name in RULES}
+        self.samples: Dict[str, List[int]] = {name: [] for name in RULES}
+
+    def add(self, result: dict, rows: int):
+        """Add the ``validate`` result for the next ``rows`` rows."""
+        bits = rule_bits()
+        for name, count in result['rule_counts'].items():
+            self.rule_counts[name] += count
+            wanted = self.sample_size - len(self.samples[name])
+            if count and wanted > 0:
+                hits = np.flatnonzero(result['bitmask'] & bits[name])[:wanted]
+                self.samples[name].extend(int(self.total_rows + row) for row in hits)
+        self.missing_cells += result['missing_cells']
+        self.rows_with_issues += result['rows_with_issues']
+        self.total_rows += rows
+
+    def report(self) -> dict:
+        """Summarize the validation run for reporting (no per-row payload)."""
+        total_rows = self.total_rows
+        return {
+            "total_rows": total_rows,
+            "missing_values": self.missing_cells,
+            "duplicate_rows": self.rule_counts['duplicate_rows'],
+            "rows_with_issues": self.rows_with_issues,
+            "rule_counts": dict(self.rule_counts),
+            "sample_rows": {name: rows for name, rows in self.samples.items() if rows},
+            "quality_score": round(100 * (1 - self.rows_with_issues / total_rows), 1) if total_rows else 100.0,
+            "issues": [name for name, count in self.rule_counts.items() if count]
+        }
+
+
+def quality_report(df: pd.DataFrame, sample_size: int = 5) -> dict:
+    """Summarize a validation run for reporting (no per-row payload)."""
+    accumulator = QualityAccumulator(sample_size)
+    accumulator.add(validate(df), len(df))
+    return accumulator.report()
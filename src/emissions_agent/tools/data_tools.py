@@ -1,17 +1,34 @@
 from crewai.tools import BaseTool
-from typing import Type, Dict, List, Optional
+from typing import Type, Dict, Iterator, List, Optional
 from pydantic import BaseModel, Field
 import pandas as pd
 import numpy as np
-import fitz  # PyMuPDF
 from pathlib import Path
 import os
 import json
 from .vector_manager import get_vector_manager
+from .data_cache import load_csv_cached, load_scope_frame, memory_report
+from .knowledge_manifest import get_knowledge_manifest, resolve_worker_count
+from .chunking import get_chunker
+from .aggregate_cube import AggregateCube, round_tonnes
+from .data_quality import quality_report
+from .streaming_analysis import DEFAULT_CHUNK_ROWS, stream_cube, stream_quality_report
+from .sql_engine import DEFAULT_MAX_ROWS, DEFAULT_TIMEOUT_SECONDS, SQLQueryError, get_sql_engine
+from .warm_state import get_warm_state, source_fingerprint
+from .tool_trace import record_cache_hit
+
+# Source files expected in the data directory
+EMISSIONS_FILES = ["scope1.csv", "scope2.csv", "scope3.csv"]
+KNOWLEDGE_FILES = ["ghg-protocol-revised.pdf", "peer1_emissions_report.pdf", "peer2_emissions_report.pdf"]
 
 # Global data storage
 _dataframes: Dict[str, pd.DataFrame] = {}
 _documents: Dict[str, List[dict]] = {}
+_cubes: Dict[str, AggregateCube] = {}
+# Bytes per column of each loaded scope as parsed, before its schema was applied
+_raw_memory: Dict[str, Dict[str, int]] = {}
+# Scopes analyzed straight from disk in chunks instead of being held in _dataframes
+_streamed_scopes: Dict[str, dict] = {}
 
 # ============================================================================
 # DATA LOADING TOOLS
@@ -20,34 +37,51 @@ _documents: Dict[str, List[dict]] = {}
 class LoadEmissionsDataInput(BaseModel):
     """Input schema for LoadEmissionsData tool."""
     data_directory: str = Field(default="./data", description="Directory containing emissions data files")
+    use_cache: bool = Field(default=True, description="Reuse the columnar cache when the source CSVs are unchanged")
+    streaming: bool = Field(default=False, description="Analyze the files in chunks from disk instead of loading them into memory (for inventories larger than RAM)")
+    chunk_rows: int = Field(default=DEFAULT_CHUNK_ROWS, description="Rows read per chunk in streaming mode")
 
 class LoadEmissionsDataTool(BaseTool):
     name: str = "load_emissions_data"
-    description: str = "Load all emissions data files (scope1.csv, scope2.csv, scope3.csv) into memory"
+    description: str = "Load all emissions data files (scope1.csv, scope2.csv, scope3.csv) into memory, or register them for chunked streaming analysis"
     args_schema: Type[BaseModel] = LoadEmissionsDataInput
 
-    def _run(self, data_directory: str = "./data") -> str:
+    def _run(self, data_directory: str = "./data", use_cache: bool = True, streaming: bool = False,
+             chunk_rows: int = DEFAULT_CHUNK_ROWS) -> str:
         try:
-            # Handle relative paths from current working directory
-            if data_directory.startswith('./'):
-                data_dir = Path.cwd() / data_directory[2:]
-            elif data_directory.startswith('/') or ':' in data_directory:
-                data_dir = Path(data_directory)
-            else:
-                data_dir = Path.cwd() / data_directory
+            data_dir = resolve_data_directory(data_directory)
             
             loaded_files = []
             
-            for filename in ["scope1.csv", "scope2.csv", "scope3.csv"]:
+            for filename in EMISSIONS_FILES:
                 file_path = data_dir / filename
                 if file_path.exists():
-                    df = pd.read_csv(file_path)
                     df_name = filename.replace('.csv', '')
+                    stat = file_path.stat()
+                    source_key = (str(file_path), stat.st_size, stat.st_mtime_ns)
+                    if streaming:
+                        rows = register_streamed_scope(df_name, file_path, chunk_rows, source_key)
+                        loaded_files.append(f"{filename}: {rows} rows (streamed in chunks of {chunk_rows})")
+                        continue
+                    if use_cache:
+                        df, source, raw_memory = load_csv_cached(file_path)
+                        if source == "cache":
+                            record_cache_hit('columnar')
+                    else:
+                        (df, raw_memory), source = load_scope_frame(file_path), "csv"
+                    _streamed_scopes.pop(df_name, None)
                     _dataframes[df_name] = df
-                    loaded_files.append(f"{filename}: {len(df)} rows")
+                    _raw_memory[df_name] = raw_memory
+                    refresh_cube(df_name, df, source_key=source_key)
+                    loaded_files.append(f"{filename}: {len(df)} rows (from {source})")
                 else:
                     loaded_files.append(f"{filename}: File not found")
             
+            get_warm_state().record(
+                'emissions', data_dir,
+                sources=source_fingerprint(data_dir / filename for filename in EMISSIONS_FILES),
+                objects=loaded_objects()['emissions'],
+            )
             return f"Loaded emissions data from {data_dir}: {'; '.join(loaded_files)}"
         except Exception as e:
             return f"Error loading data: {str(e)}"
@@ -55,25 +89,25 @@ class LoadEmissionsDataTool(BaseTool):
 class LoadKnowledgeBaseInput(BaseModel):
     """Input schema for LoadKnowledgeBase tool."""
     data_directory: str = Field(default="./data", description="Directory containing knowledge base files")
+    incremental: bool = Field(default=True, description="Only re-extract pages that changed since the last load")
+    workers: int = Field(default=1, description="Processes used for page text extraction (0 = one per CPU)")
+    chunking: str = Field(default="structured", description="Chunking strategy (structured or fixed)")
+    max_tokens: int = Field(default=256, description="Approximate token budget per chunk (structured chunking)")
+    overlap_tokens: int = Field(default=40, description="Approximate tokens of overlap between consecutive chunks (structured chunking)")
 
 class LoadKnowledgeBaseTool(BaseTool):
     name: str = "load_knowledge_base"
     description: str = "Load knowledge base documents (PDFs) and prepare them for vector search"
     args_schema: Type[BaseModel] = LoadKnowledgeBaseInput
 
-    def _run(self, data_directory: str = "./data") -> str:
+    def _run(self, data_directory: str = "./data", incremental: bool = True, workers: int = 1,
+             chunking: str = "structured", max_tokens: int = 256, overlap_tokens: int = 40) -> str:
         try:
-            # Handle relative paths from current working directory (consistent with LoadEmissionsDataTool)
-            if data_directory.startswith('./'):
-                data_dir = Path.cwd() / data_directory[2:]
-            elif data_directory.startswith('/') or ':' in data_directory:
-                data_dir = Path(data_directory)
-            else:
-                data_dir = Path.cwd() / data_directory
+            data_dir = resolve_data_directory(data_directory)
             loaded_files = []
             
             # Only load PDF files that actually exist
-            expected_pdfs = ["ghg-protocol-revised.pdf", "peer1_emissions_report.pdf", "peer2_emissions_report.pdf"]
+            expected_pdfs = KNOWLEDGE_FILES
             available_pdfs = []
             
             # Check which PDFs are actually available
@@ -82,45 +116,68 @@ class LoadKnowledgeBaseTool(BaseTool):
                 if file_path.exists():
                     available_pdfs.append(filename)
                     
+            # Forget documents whose PDF was deleted, so syncing drops their chunks too
+            pruned_pdfs = self._prune_missing_documents(data_dir, available_pdfs)
+            
             if not available_pdfs:
+                get_warm_state().record('knowledge', data_dir, sources={}, objects=loaded_objects()['knowledge'])
                 return f"No PDF files found in {data_directory}. Expected: {expected_pdfs}"
             
-            # Load only available PDFs
+            # Load only available PDFs, re-extracting only pages that changed
+            chunker = get_chunker(chunking, max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+            manifest = get_knowledge_manifest(data_dir, chunker=chunker)
+            results = manifest.load_pdfs(
+                [data_dir / filename for filename in available_pdfs],
+                reuse=incremental,
+                workers=resolve_worker_count(workers),
+            )
             for filename in available_pdfs:
-                file_path = data_dir / filename
-                try:
-                    doc = fitz.open(file_path)
-                    chunks = []
-                    for page_num, page in enumerate(doc):
-                        text = page.get_text()
-                        if text.strip():  # Only add non-empty chunks
-                            for i in range(0, len(text), 1000):
-                                chunk = text[i:i + 1000]
-                                if chunk.strip():  # Only add non-empty chunks
-                                    chunks.append({
-                                        'text': chunk,
-                                        'metadata': {
-                                            'page': page_num + 1,
-                                            'source': str(file_path),
-                                            'document_name': filename.replace('.pdf', '')
-                                        }
-                                    })
-                    doc.close()
-                    
-                    doc_name = filename.replace('.pdf', '')
-                    _documents[doc_name] = chunks
-                    loaded_files.append(f"{filename}: {len(chunks)} chunks")
-                except Exception as file_error:
-                    loaded_files.append(f"{filename}: Error loading - {str(file_error)}")
+                doc_name = filename.replace('.pdf', '')
+                result = results[doc_name]
+                if isinstance(result, Exception):
+                    loaded_files.append(f"{filename}: Error loading - {str(result)}")
+                    continue
+                
+                chunks, stats = result
+                _documents[doc_name] = chunks
+                if stats['reused']:
+                    record_cache_hit('pdf_pages', stats['reused'])
+                loaded_files.append(
+                    f"{filename}: {len(chunks)} chunks "
+                    f"({stats['extracted']} pages extracted, {stats['reused']} unchanged)"
+                )
             
             # Report unavailable files for transparency
             missing_files = [f for f in expected_pdfs if f not in available_pdfs]
             if missing_files:
                 loaded_files.append(f"Missing files: {', '.join(missing_files)}")
+            if pruned_pdfs:
+                loaded_files.append(f"Removed deleted files: {', '.join(pruned_pdfs)}")
             
+            # Fingerprint every PDF that was attempted, including any that failed to load:
+            # the check compares against all files present, and a failed file should only
+            # trigger a reload once it changes
+            get_warm_state().record(
+                'knowledge', data_dir,
+                sources=source_fingerprint(data_dir / filename for filename in available_pdfs),
+                objects=loaded_objects()['knowledge'],
+            )
             return f"Available PDFs loaded: {'; '.join(loaded_files)}"
         except Exception as e:
             return f"Error loading knowledge base: {str(e)}"
+    
+    def _prune_missing_documents(self, data_dir: Path, available_pdfs: List[str]) -> List[str]:
+        """Drop the loaded chunks and manifest entries of knowledge files no longer on disk."""
+        manifest = get_knowledge_manifest(data_dir)
+        pruned = []
+        for filename in KNOWLEDGE_FILES:
+            if filename in available_pdfs:
+                continue
+            doc_name = filename.replace('.pdf', '')
+            manifest.remove(doc_name)
+            if _documents.pop(doc_name, None) is not None:
+                pruned.append(filename)
+        return pruned
 
 # ============================================================================
 # DATA ANALYSIS TOOLS
@@ -139,20 +196,37 @@ class AnalyzeEmissionsTool(BaseTool):
     def _run(self, scope: str, analysis_type: str) -> str:
         try:
             if scope == "all":
-                dataframes = {k: v for k, v in _dataframes.items() if k.startswith("scope")}
+                scopes = [name for name in list_dataframes() if name.startswith("scope")]
             else:
-                if scope not in _dataframes:
-                    return f"Dataframe '{scope}' not found. Available: {list(_dataframes.keys())}"
-                dataframes = {scope: _dataframes[scope]}
+                if not has_dataframe(scope):
+                    return f"Dataframe '{scope}' not found. Available: {list_dataframes()}"
+                scopes = [scope]
             
             results = {}
-            for df_name, df in dataframes.items():
+            for df_name in scopes:
+                cube = get_cube(df_name)
+                streamed = _streamed_scopes.get(df_name)
+                df = _dataframes.get(df_name)
                 if analysis_type == "summary":
-                    results[df_name] = self._get_summary(df)
+                    if cube is not None:
+                        results[df_name] = cube.summary()
+                    else:
+                        results[df_name] = self._get_summary(df) if streamed is None else {"error": "No CO2e_Tonnes column"}
                 elif analysis_type == "hotspots":
-                    results[df_name] = self._get_hotspots(df)
+                    hotspots = cube.hotspots() if cube is not None else None
+                    if hotspots is not None:
+                        results[df_name] = hotspots
+                    elif streamed is None:
+                        results[df_name] = self._get_hotspots(df)
+                    elif cube is None:
+                        results[df_name] = {"error": "No CO2e_Tonnes column"}
+                    else:
+                        results[df_name] = {"error": "No Facility or Category column for hotspot analysis"}
                 elif analysis_type == "quality":
-                    results[df_name] = self._get_quality(df)
+                    if streamed is not None:
+                        results[df_name] = stream_quality_report(streamed['path'], streamed['chunk_rows'])
+                    else:
+                        results[df_name] = self._get_quality(df)
                 else:
                     return f"Unsupported analysis type. Use: summary, hotspots, quality"
             
@@ -167,9 +241,9 @@ class AnalyzeEmissionsTool(BaseTool):
         
         total = df['CO2e_Tonnes'].sum()
         return {
-            "total_emissions": total,
-            "average_emissions": df['CO2e_Tonnes'].mean(),
-            "max_emissions": df['CO2e_Tonnes'].max(),
+            "total_emissions": round_tonnes(total),
+            "average_emissions": round_tonnes(df['CO2e_Tonnes'].mean()),
+            "max_emissions": round_tonnes(df['CO2e_Tonnes'].max()),
             "records": len(df)
         }
     
@@ -180,28 +254,16 @@ class AnalyzeEmissionsTool(BaseTool):
         
         if 'Facility' in df.columns:
             facility_emissions = df.groupby('Facility')['CO2e_Tonnes'].sum().sort_values(ascending=False)
-            return {"facility_hotspots": facility_emissions.head(3).to_dict()}
+            return {"facility_hotspots": {k: round_tonnes(v) for k, v in facility_emissions.head(3).items()}}
         elif 'Category' in df.columns:
             category_emissions = df.groupby('Category')['CO2e_Tonnes'].sum().sort_values(ascending=False)
-            return {"category_hotspots": category_emissions.head(3).to_dict()}
+            return {"category_hotspots": {k: round_tonnes(v) for k, v in category_emissions.head(3).items()}}
         else:
             return {"error": "No Facility or Category column for hotspot analysis"}
     
     def _get_quality(self, df: pd.DataFrame) -> dict:
-        """Assess data quality"""
-        issues = []
-        if df.isnull().sum().sum() > 0:
-            issues.append("Missing values")
-        if df.duplicated().sum() > 0:
-            issues.append("Duplicate rows")
-        
-        return {
-            "total_rows": len(df),
-            "missing_values": df.isnull().sum().sum(),
-            "duplicate_rows": df.duplicated().sum(),
-            "quality_score": max(0, 100 - len(issues) * 20),
-            "issues": issues
-        }
+        """Assess data quality with the rule-based validation engine"""
+        return quality_report(df)
 
 class CompareEmissionsInput(BaseModel):
     """Input schema for CompareEmissions tool."""
@@ -215,26 +277,68 @@ class CompareEmissionsTool(BaseTool):
 
     def _run(self, scope1: str, scope2: str) -> str:
         try:
-            if scope1 not in _dataframes or scope2 not in _dataframes:
-                return f"One or both dataframes not found. Available: {list(_dataframes.keys())}"
+            if not has_dataframe(scope1) or not has_dataframe(scope2):
+                return f"One or both dataframes not found. Available: {list_dataframes()}"
             
-            df1, df2 = _dataframes[scope1], _dataframes[scope2]
-            total1, total2 = df1['CO2e_Tonnes'].sum(), df2['CO2e_Tonnes'].sum()
+            (total1, records1), (total2, records2) = self._totals(scope1), self._totals(scope2)
             
             comparison = {
-                scope1: {"total": total1, "records": len(df1)},
-                scope2: {"total": total2, "records": len(df2)},
-                "difference": total1 - total2,
+                scope1: {"total": total1, "records": records1},
+                scope2: {"total": total2, "records": records2},
+                "difference": round_tonnes(total1 - total2),
                 "percentage_diff": ((total1 - total2) / total2 * 100) if total2 != 0 else float('inf')
             }
             
             return json.dumps(comparison, indent=2, default=str)
         except Exception as e:
             return f"Error comparing emissions: {str(e)}"
+    
+    def _totals(self, name: str) -> tuple:
+        """Rounded total emissions and record count of a scope, from its cube when available"""
+        cube = get_cube(name)
+        if cube is not None:
+            summary = cube.summary()
+            return summary["total_emissions"], summary["records"]
+        if name in _streamed_scopes:
+            raise KeyError('CO2e_Tonnes')
+        df = _dataframes[name]
+        return round_tonnes(df['CO2e_Tonnes'].sum()), len(df)
+
+class SQLQueryInput(BaseModel):
+    """Input schema for SQLQuery tool."""
+    query: str = Field(..., description="A single read-only SELECT over the tables scope1, scope2 and scope3 (one per loaded CSV, same column names)")
+    max_rows: int = Field(default=DEFAULT_MAX_ROWS, description="Maximum number of result rows returned")
+    timeout_seconds: float = Field(default=DEFAULT_TIMEOUT_SECONDS, description="Time limit for the query")
+
+class SQLQueryTool(BaseTool):
+    name: str = "sql_query"
+    description: str = (
+        "Run a read-only SQL SELECT over the loaded emissions data (tables scope1, scope2, scope3) "
+        "for ad-hoc questions such as breakdowns by supplier, category, facility or month. "
+        "Returns compact JSON rows."
+    )
+    args_schema: Type[BaseModel] = SQLQueryInput
+
+    def _run(self, query: str, max_rows: int = DEFAULT_MAX_ROWS, timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS) -> str:
+        try:
+            if not _dataframes:
+                if _streamed_scopes:
+                    return "Streamed scopes can't be queried with SQL. Load the data without streaming first."
+                return "No dataframes loaded. Use load_emissions_data first."
+            engine = get_sql_engine()
+            try:
+                result = engine.query(query, _dataframes, max_rows=max_rows, timeout_seconds=timeout_seconds)
+            except SQLQueryError as e:
+                # Show the schema so the query can be fixed without another round trip
+                tables = json.dumps(engine.describe(_dataframes), separators=(',', ':'))
+                return f"Error running SQL query: {str(e)}. Tables: {tables}"
+            return json.dumps(result, separators=(',', ':'), default=str)
+        except Exception as e:
+            return f"Error running SQL query: {str(e)}"
 
 class GetDataInfoInput(BaseModel):
     """Input schema for GetDataInfo tool."""
-    data_type: str = Field(default="dataframes", description="Type of data (dataframes or documents)")
+    data_type: str = Field(default="dataframes", description="Type of data (dataframes, memory, documents, query_cache or warm_state)")
 
 class GetDataInfoTool(BaseTool):
     name: str = "get_data_info"
@@ -251,12 +355,29 @@ class GetDataInfoTool(BaseTool):
                     "column_count": len(df.columns),
                     "columns": list(df.columns)
                 }
+                for name, streamed in _streamed_scopes.items():
+                    info[name] = {
+                        "rows": streamed["rows"],
+                        "column_count": len(streamed["columns"]),
+                        "columns": streamed["columns"],
+                        "streamed": True,
+                        "chunk_rows": streamed["chunk_rows"]
+                    }
+            elif data_type == "memory":
+                info = {name: memory_report(df, _raw_memory.get(name)) for name, df in _dataframes.items()}
             elif data_type == "documents":
                 info = {}
                 for name, docs in _documents.items():
                     info[name] = {"chunks": len(docs)}
+            elif data_type == "query_cache":
+                vector_manager = get_vector_manager()
+                info = vector_manager.cache_stats()
+                if vector_manager.embedding_store is not None:
+                    info["embedding_store"] = vector_manager.embedding_store.stats()
+            elif data_type == "warm_state":
+                info = get_warm_state().status()
             else:
-                return f"Invalid data_type. Use: dataframes or documents"
+                return f"Invalid data_type. Use: dataframes, memory, documents, query_cache or warm_state"
             
             return json.dumps(info, indent=2)
         except Exception as e:
@@ -266,17 +387,35 @@ class GetDataInfoTool(BaseTool):
 # UTILITY FUNCTIONS FOR OTHER MODULES
 # ============================================================================
 
+def resolve_data_directory(data_directory: str) -> Path:
+    """Resolve a data directory argument, treating relative paths as relative to the working directory."""
+    if data_directory.startswith('./'):
+        return Path.cwd() / data_directory[2:]
+    elif data_directory.startswith('/') or ':' in data_directory:
+        return Path(data_directory)
+    return Path.cwd() / data_directory
+
+def loaded_objects() -> Dict[str, Dict[str, object]]:
+    """The objects currently holding each loaded scope, document and the vector manager."""
+    from . import vector_manager
+    return {
+        'emissions': {**_dataframes, **_streamed_scopes},
+        'knowledge': dict(_documents),
+        'collections': ({'vector_manager': vector_manager._vector_manager}
+                        if vector_manager._vector_manager is not None else {}),
+    }
+
 def get_dataframe(name: str) -> pd.DataFrame:
     """Get a dataframe by name."""
     return _dataframes.get(name)
 
 def has_dataframe(name: str) -> bool:
-    """Check if a dataframe exists."""
-    return name in _dataframes
+    """Check if a dataframe exists (in memory or streamed)."""
+    return name in _dataframes or name in _streamed_scopes
 
 def list_dataframes() -> list:
-    """List all dataframe names."""
-    return list(_dataframes.keys())
+    """List all dataframe names (in memory or streamed)."""
+    return list(_dataframes.keys()) + [name for name in _streamed_scopes if name not in _dataframes]
 
 def get_documents(name: str) -> List[dict]:
     """Get documents by name."""
@@ -290,6 +429,60 @@ def list_documents() -> list:
     """List all document names."""
     return list(_documents.keys())
 
+def refresh_cube(name: str, df: pd.DataFrame, source_key=None) -> Optional[AggregateCube]:
+    """Build the aggregate cube for a loaded scope, reusing it if the source is unchanged."""
+    cube = _cubes.get(name)
+    if cube is None or source_key is None or cube.source_key != source_key:
+        cube = AggregateCube.build(df)
+        if cube is None:
+            _cubes.pop(name, None)
+            return None
+        cube.source_key = source_key
+        _cubes[name] = cube
+    cube.frame = df
+    return cube
+
+def register_streamed_scope(name: str, file_path: Path, chunk_rows: int, source_key) -> int:
+    """Register a scope for chunked analysis, streaming its cube unless the source is unchanged.
+    
+    Returns the scope's row count.
+    """
+    cube = _cubes.get(name)
+    if cube is None or cube.source_key != source_key:
+        cube = stream_cube(file_path, chunk_rows)
+        if cube is None:
+            _cubes.pop(name, None)
+        else:
+            cube.source_key = source_key
+            _cubes[name] = cube
+    if cube is not None:
+        rows = int(cube.groups['rows'].sum())
+    else:
+        rows = sum(len(chunk) for chunk in pd.read_csv(file_path, usecols=[0], chunksize=chunk_rows))
+    _dataframes.pop(name, None)
+    _raw_memory.pop(name, None)
+    _streamed_scopes[name] = {
+        "path": file_path,
+        "chunk_rows": chunk_rows,
+        "source_key": source_key,
+        "rows": rows,
+        "columns": list(pd.read_csv(file_path, nrows=0).columns)
+    }
+    return rows
+
+def get_cube(name: str) -> Optional[AggregateCube]:
+    """Get the aggregate cube for a scope if it matches the currently loaded dataframe."""
+    cube = _cubes.get(name)
+    streamed = _streamed_scopes.get(name)
+    if streamed is not None:
+        cube = cube if cube is not None and cube.source_key == streamed["source_key"] else None
+    else:
+        df = _dataframes.get(name)
+        cube = None if cube is None or df is None or cube.frame is not df else cube
+    if cube is not None:
+        record_cache_hit('cube')
+    return cube
+
 class CreateVectorCollectionsInput(BaseModel):
     """Input schema for CreateVectorCollections tool."""
     force_recreate: bool = Field(default=False, description="Whether to recreate existing collections")
@@ -306,59 +499,62 @@ class CreateVectorCollectionsTool(BaseTool):
             
             collections_created = []
             
-            # Check if collections already exist
-            existing_collections = []
-            try:
-                existing_collections = [col.name for col in vector_manager.client.list_collections()]
-            except:
-                pass
-            
-
-            
             # Create GHG protocol collection from PDF documents
-            if "ghg_protocol" not in existing_collections or force_recreate:
-                ghg_docs = []
-                for doc_name, chunks in _documents.items():
-                    if 'ghg' in doc_name.lower() or 'protocol' in doc_name.lower():
-                        for i, chunk in enumerate(chunks):
-                            ghg_docs.append({
-                                'id': f"{doc_name}_chunk_{i}",
-                                'text': chunk['text'],
-                                'metadata': {
-                                    **chunk['metadata'],
-                                    'data_type': 'regulatory_guidance'
-                                }
-                            })
-                
-                if ghg_docs:
-                    result = vector_manager.upsert_documents("ghg_protocol", ghg_docs)
-                    collections_created.append(f"ghg_protocol: {result}")
-            else:
-                collections_created.append("ghg_protocol: Already exists, skipped")
+            ghg_docs = self._collect_documents(
+                lambda name: 'ghg' in name or 'protocol' in name, 'regulatory_guidance'
+            )
+            collections_created.append(
+                self._sync_collection(vector_manager, "ghg_protocol", ghg_docs, force_recreate)
+            )
             
             # Create peer benchmarks collection
-            if "peer_benchmarks" not in existing_collections or force_recreate:
-                peer_docs = []
-                for doc_name, chunks in _documents.items():
-                    if 'peer' in doc_name.lower():
-                        for i, chunk in enumerate(chunks):
-                            peer_docs.append({
-                                'id': f"{doc_name}_chunk_{i}",
-                                'text': chunk['text'],
-                                'metadata': {
-                                    **chunk['metadata'],
-                                    'data_type': 'peer_benchmark'
-                                }
-                            })
-                
-                if peer_docs:
-                    result = vector_manager.upsert_documents("peer_benchmarks", peer_docs)
-                    collections_created.append(f"peer_benchmarks: {result}")
-            else:
-                collections_created.append("peer_benchmarks: Already exists, skipped")
+            peer_docs = self._collect_documents(lambda name: 'peer' in name, 'peer_benchmark')
+            collections_created.append(
+                self._sync_collection(vector_manager, "peer_benchmarks", peer_docs, force_recreate)
+            )
             
+            warm_state = get_warm_state()
+            warm_state.record(
+                'collections', None, sources={},
+                objects=loaded_objects()['collections'],
+                knowledge_version=warm_state.versions['knowledge'],
+            )
             return f"Created vector collections: {'; '.join(collections_created)}"
             
         except Exception as e:
             return f"Error creating vector collections: {str(e)}"
- 
\ No newline at end of file
+    
+    def _collect_documents(self, matches, data_type: str) -> Optional[Iterator[dict]]:
+        """Lazily yield loaded chunks for the documents selected by ``matches``.
+        
+        Returns None when no loaded document matches.
+        """
+        doc_names = [doc_name for doc_name in _documents if matches(doc_name.lower())]
+        if not any(_documents[doc_name] for doc_name in doc_names):
+            return None
+        
+        def generate():
+            for doc_name in doc_names:
+                for i, chunk in enumerate(_documents[doc_name]):
+                    yield {
+                        'id': chunk.get('id', f"{doc_name}_chunk_{i}"),
+                        'text': chunk['text'],
+                        'metadata': {
+                            **chunk['metadata'],
+                            'data_type': data_type
+                        }
+                    }
+        return generate()
+    
+    def _sync_collection(self, vector_manager, collection_name: str, docs: Optional[Iterator[dict]], force_recreate: bool) -> str:
+        """Incrementally sync a collection, or rebuild it from scratch when forced."""
+        if docs is None:
+            # Once the knowledge base has been loaded, no matching documents means their
+            # PDFs were deleted: empty the collection rather than keep serving stale chunks
+            if get_warm_state().versions['knowledge'] and vector_manager.has_collection(collection_name):
+                return f"{collection_name}: {vector_manager.sync_documents(collection_name, iter(()))}"
+            return f"{collection_name}: No loaded documents, skipped"
+        if force_recreate:
+            vector_manager.delete_collection(collection_name)
+            return f"{collection_name}: {vector_manager.upsert_documents(collection_name, docs)}"
+        return f"{collection_name}: {vector_manager.sync_documents(collection_name, docs)}"
@@ -0,0 +1,126 @@
+"""
+Persistent embedding store keyed by text hash and embedding model.
+
+Embeddings are kept in a local SQLite database as float32 blobs so that
+rebuilding a collection, or pointing VectorManager at a fresh persist
+directory, only computes embeddings for text that has never been seen.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from .tool_trace import record_cache_hit
+
+DEFAULT_STORE_PATH = "./embedding_cache/embeddings.sqlite3"
+
+# SQLite caps the number of bound parameters per statement
+_LOOKUP_BATCH = 500
+
+
+def text_hash(text: str) -> str:
+    """Hash text for use as an embedding store key."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def embedding_model_name(embedding_function) -> str:
+    """Identify an embedding function and its configuration."""
+    try:
+        name = embedding_function.name()
+    except Exception:
+        name = type(embedding_function).__name__
+    try:
+        config = json.dumps(embedding_function.get_config(), sort_keys=True, default=str)
+    except Exception:
+        config = ""
+    return f"{name}:{config}" if config and config != "{}" else name
+
+
+class EmbeddingStore:
+    """SQLite-backed map of (model, text hash) to embedding vector."""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " dim INTEGER NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, model: str, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Fetch stored embeddings for the given hashes."""
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique), _LOOKUP_BATCH):
+                batch = unique[start:start + _LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch],
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, model: str, items: Dict[str, Sequence[float]]):
+        """Store embeddings keyed by text hash."""
+        rows = []
+        for key, vector in items.items():
+            vector = np.asarray(vector, dtype=np.float32)
+            rows.append((model, key, int(vector.shape[0]), vector.tobytes()))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vector) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def embed(self, model: str, texts: List[str], compute: Callable[[List[str]], Sequence]) -> List[np.ndarray]:
+        """Return embeddings for ``texts``, computing only those not already stored."""
+        hashes = [text_hash(text) for text in texts]
+        found = self.get_many(model, hashes)
+
+        missing = {}
+        for key, text in zip(hashes, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        hits = len(texts) - sum(1 for key in hashes if key in missing)
+        self.hits += hits
+        if hits:
+            record_cache_hit('embedding', hits)
+        self.misses += len(missing)
+
+        if missing:
+            computed = compute(list(missing.values()))
+            new_items = dict(zip(missing.keys(), computed))
+            self.put_many(model, new_items)
+            for key, vector in new_items.items():
+                found[key] = np.asarray(vector, dtype=np.float32)
+
+        return [found[key] for key in hashes]
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and number of stored vectors."""
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'stored': count}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
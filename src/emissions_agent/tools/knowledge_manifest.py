@@ -0,0 +1,295 @@
+"""
+Per-document and per-page fingerprint manifest for incremental PDF ingestion.
+
+For every PDF the manifest records the file's size, mtime and SHA-256 along
+with a hash of each page's raw content stream and resources and the text
+blocks extracted from it. On reload, unchanged documents are served straight from the manifest
+and only new or modified pages of changed documents are re-extracted. Chunking
+runs over the stored blocks, so switching chunkers never requires re-extraction.
+"""
+
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .chunking import Chunker, get_chunker
+from .data_cache import CACHE_DIRNAME, file_sha256
+
+MANIFEST_FORMAT_VERSION = 3
+
+
+def extract_page_blocks(page) -> List[str]:
+    """Extract a page's text blocks (paragraphs, headings, table cells) in reading order."""
+    return [block[4] for block in page.get_text("blocks") if block[6] == 0]
+
+
+def page_fingerprint(page) -> str:
+    """Hash a page's raw content stream and resources - far cheaper than extracting its text.
+
+    Text drawn through a form XObject or a swapped font never touches the
+    content stream, so the fonts and XObjects it references, and the XObject
+    streams themselves, are hashed too.
+    """
+    doc = page.parent
+    digest = hashlib.sha256(page.read_contents())
+    digest.update(f"rotation={page.rotation}".encode())
+    for font in page.get_fonts():
+        digest.update(f"font={font[0]}:{font[3]}:{font[4]}".encode())
+    for xobject in page.get_xobjects():
+        digest.update(f"xobject={xobject[0]}:{xobject[1]}".encode())
+        digest.update(doc.xref_stream(xobject[0]) or b'')
+    for image in page.get_images():
+        digest.update(f"image={image[0]}:{image[7]}".encode())
+    return digest.hexdigest()
+
+
+def content_hash(text: str) -> str:
+    """Hash chunk text for change detection in the vector store."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def build_chunk_dicts(pages: List[dict], file_path: Path, chunker: Chunker) -> List[dict]:
+    """Chunk manifest page entries into the chunk dicts stored in ``_documents``."""
+    document_name = file_path.name.replace('.pdf', '')
+    chunks = []
+    seen = {}
+    for chunk in chunker.chunk(pages):
+        # Ids follow the chunk content rather than its position, so inserting or
+        # removing a page doesn't invalidate the embeddings of everything after it
+        digest = content_hash(chunk['text'])
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        chunks.append({
+            'id': f"{document_name}_{digest[:16]}_{occurrence}",
+            'text': chunk['text'],
+            'metadata': {
+                'page': chunk['page_start'],
+                'page_end': chunk['page_end'],
+                'source': str(file_path),
+                'document_name': document_name,
+                'content_hash': digest,
+            }
+        })
+    return chunks
+
+
+class KnowledgeManifest:
+    """JSON manifest of PDF fingerprints and extracted text, one file per document."""
+
+    def __init__(self, cache_directory: Path, chunker: Optional[Chunker] = None):
+        self.cache_directory = Path(cache_directory)
+        self.chunker = chunker or get_chunker()
+
+    def _entry_path(self, document_name: str) -> Path:
+        return self.cache_directory / f"{document_name}.json"
+
+    def get(self, document_name: str) -> Optional[dict]:
+        """Return the stored entry for a document, if any."""
+        entry_path = self._entry_path(document_name)
+        if not entry_path.exists():
+            return None
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('version') != MANIFEST_FORMAT_VERSION:
+            return None
+        return entry
+
+    def put(self, document_name: str, entry: dict):
+        """Persist a document entry."""
+        self.cache_directory.mkdir(parents=True, exist_ok=True)
+        entry_path = self._entry_path(document_name)
+        tmp_path = entry_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        tmp_path.replace(entry_path)
+
+    def remove(self, document_name: str):
+        """Drop a document's entry, e.g. once its PDF has been deleted."""
+        try:
+            self._entry_path(document_name).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _plan(self, file_path: Path, reuse: bool) -> dict:
+        """Fingerprint a PDF and work out which of its pages still need extracting."""
+        document_name = file_path.name.replace('.pdf', '')
+        previous = self.get(document_name) if reuse else None
+        stat = file_path.stat()
+        plan = {'file_path': file_path, 'document_name': document_name, 'stat': stat, 'unchanged': False}
+
+        if previous is not None and previous['size'] == stat.st_size:
+            unchanged = previous['mtime_ns'] == stat.st_mtime_ns
+            if not unchanged and file_sha256(file_path) == previous['sha256']:
+                previous['mtime_ns'] = stat.st_mtime_ns
+                self.put(document_name, previous)
+                unchanged = True
+            if unchanged:
+                plan.update(unchanged=True, pages=previous['pages'])
+                return plan
+
+        # Index previously extracted pages by fingerprint so moved pages are reused too
+        known_pages = {}
+        if previous is not None:
+            known_pages = {page['fingerprint']: page['blocks'] for page in previous['pages']}
+
+        import fitz  # PyMuPDF, imported on first extraction
+
+        pages = []
+        doc = fitz.open(file_path)
+        try:
+            for page_num, page in enumerate(doc):
+                fingerprint = page_fingerprint(page)
+                pages.append({
+                    'page': page_num + 1,
+                    'fingerprint': fingerprint,
+                    'blocks': known_pages.get(fingerprint),
+                })
+        finally:
+            doc.close()
+        plan['pages'] = pages
+        return plan
+
+    def _finish(self, plan: dict) -> tuple:
+        """Persist a plan whose pages are all extracted and build its chunk dicts."""
+        file_path = plan['file_path']
+        pages = plan['pages']
+        extracted = plan.get('extracted', 0)
+        if not plan['unchanged']:
+            self.put(plan['document_name'], {
+                'version': MANIFEST_FORMAT_VERSION,
+                'source': str(file_path),
+                'size': plan['stat'].st_size,
+                'mtime_ns': plan['stat'].st_mtime_ns,
+                'sha256': file_sha256(file_path),
+                'pages': pages,
+            })
+        stats = {'pages': len(pages), 'extracted': extracted, 'reused': len(pages) - extracted}
+        return build_chunk_dicts(pages, file_path, self.chunker), stats
+
+    def load_pdfs(self, file_paths: List[Path], reuse: bool = True, workers: int = 1) -> Dict[str, tuple]:
+        """Load several PDFs, re-extracting only pages whose fingerprint changed.
+
+        With ``reuse=False`` every page is extracted again and the entries rebuilt.
+        With ``workers > 1`` the pages to extract, across all PDFs, are spread over
+        a process pool; chunk order is the same as the serial path.
+        Returns ``{document_name: (chunks, stats)}`` in input order; a document
+        that fails to load (fingerprinting, extraction or saving) maps to the
+        raised exception instead, without affecting the others.
+        """
+        file_paths = [Path(fp) for fp in file_paths]
+        plans = []
+        results = {}
+        for file_path in file_paths:
+            try:
+                plans.append(self._plan(file_path, reuse))
+            except Exception as e:
+                results[file_path.name.replace('.pdf', '')] = e
+
+        tasks = _build_extraction_tasks(plans, workers)
+        failed = {}
+        for plan_index, extracted_pages in _run_extraction_tasks(tasks, workers):
+            if isinstance(extracted_pages, Exception):
+                failed.setdefault(plan_index, extracted_pages)
+                continue
+            plan = plans[plan_index]
+            for page_index, blocks in extracted_pages:
+                plan['pages'][page_index]['blocks'] = blocks
+            plan['extracted'] = plan.get('extracted', 0) + len(extracted_pages)
+
+        for plan_index, plan in enumerate(plans):
+            if plan_index in failed:
+                results[plan['document_name']] = failed[plan_index]
+                continue
+            try:
+                results[plan['document_name']] = self._finish(plan)
+            except Exception as e:
+                results[plan['document_name']] = e
+        return {fp.name.replace('.pdf', ''): results[fp.name.replace('.pdf', '')] for fp in file_paths}
+
+    def load_pdf(self, file_path: Path, reuse: bool = True) -> tuple:
+        """Load a single PDF's chunks serially. Returns ``(chunks, stats)``."""
+        file_path = Path(file_path)
+        result = self.load_pdfs([file_path], reuse=reuse)[file_path.name.replace('.pdf', '')]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _extract_pages(task: tuple) -> tuple:
+    """Process-pool worker: extract the text blocks of a batch of pages from one PDF."""
+    import fitz  # PyMuPDF
+
+    plan_index, file_path, page_indices = task
+    doc = fitz.open(file_path)
+    try:
+        return plan_index, [(i, extract_page_blocks(doc[i])) for i in page_indices]
+    finally:
+        doc.close()
+
+
+def _build_extraction_tasks(plans: List[dict], workers: int) -> List[tuple]:
+    """Split the pages that need extracting into per-PDF batches sized for the pool."""
+    pending = [
+        (plan_index, [i for i, page in enumerate(plan['pages']) if page['blocks'] is None])
+        for plan_index, plan in enumerate(plans)
+        if not plan['unchanged']
+    ]
+    total_pages = sum(len(indices) for _, indices in pending)
+    # A few batches per worker keeps the pool balanced when PDFs differ in size
+    batch_size = max(1, math.ceil(total_pages / (max(1, workers) * 4)))
+
+    tasks = []
+    for plan_index, indices in pending:
+        file_path = str(plans[plan_index]['file_path'])
+        for start in range(0, len(indices), batch_size):
+            tasks.append((plan_index, file_path, indices[start:start + batch_size]))
+    return tasks
+
+
+def _extract_pages_safely(task: tuple) -> tuple:
+    """``_extract_pages`` in this process, with a failure returned as ``(plan_index, exception)``."""
+    try:
+        return _extract_pages(task)
+    except Exception as e:
+        return task[0], e
+
+
+def _run_extraction_tasks(tasks: List[tuple], workers: int):
+    """Run extraction batches serially or on a process pool, yielding results in task order.
+
+    A batch that fails yields ``(plan_index, exception)`` instead of its pages.
+    Batches lost to a broken pool (a worker that crashed) are retried in this process.
+    """
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _extract_pages_safely(task)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        futures = [executor.submit(_extract_pages, task) for task in tasks]
+        for task, future in zip(tasks, futures):
+            try:
+                yield future.result()
+            except BrokenProcessPool:
+                yield _extract_pages_safely(task)
+            except Exception as e:
+                yield task[0], e
+
+
+def resolve_worker_count(workers: int) -> int:
+    """Translate a worker option into a process count (0 means one per CPU)."""
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def get_knowledge_manifest(data_dir: Path, chunker: Optional[Chunker] = None) -> KnowledgeManifest:
+    """Get the manifest stored alongside a data directory."""
+    return KnowledgeManifest(Path(data_dir) / CACHE_DIRNAME / "knowledge", chunker=chunker)
@@ -0,0 +1,143 @@
+"""
+In-memory inverted index for BM25 keyword search over a vector collection.
+
+Embedding search misses exact terms such as "market-based", "Category 6" or
+emission-factor codes. Each collection gets a ``LexicalIndex`` kept in step
+with its upserts and deletes; ``reciprocal_rank_fusion`` merges its BM25
+ranking with the vector ranking, and ``term_spans`` gives the character
+offsets of the query terms in a retrieved text.
+
+Hyphenated and dotted terms are indexed both whole and by their parts, so
+"market-based" matches a query for "market based" and vice versa.
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Rank offset of reciprocal-rank fusion; damps the weight of the very top ranks
+RRF_K = 60
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-./][a-z0-9]+)*")
+_PART = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be been but by can could do does for from had has have how i if in into is it its "
+    "may my not of on or our should so such than that the their then there these they this those to was "
+    "we were what when where which while who why will with would you your".split()
+)
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """``(term, start, end)`` for each indexed term of ``text``, in order.
+
+    A compound term like ``market-based`` yields itself and then its parts.
+    """
+    lowered = text.lower()
+    tokens = []
+    for match in _TOKEN.finditer(lowered):
+        term = match.group(0)
+        if term not in _STOPWORDS:
+            tokens.append((term, match.start(), match.end()))
+        if any(separator in term for separator in '-./'):
+            for part in _PART.finditer(lowered, match.start(), match.end()):
+                if part.group(0) not in _STOPWORDS:
+                    tokens.append((part.group(0), part.start(), part.end()))
+    return tokens
+
+
+def query_terms(query_text: str) -> List[str]:
+    """Distinct indexed terms of a query, in order."""
+    return list(dict.fromkeys(term for term, _, _ in tokenize(query_text)))
+
+
+def term_spans(text: str, query_text: str) -> List[Dict]:
+    """Offsets of every occurrence of a query term in ``text``.
+
+    Overlapping matches (a compound term and its parts) are merged into the
+    longest span.
+    """
+    terms = set(query_terms(query_text))
+    spans = []
+    for term, start, end in sorted(tokenize(text), key=lambda token: (token[1], -token[2])):
+        if term not in terms:
+            continue
+        if spans and start < spans[-1]['end']:
+            continue
+        spans.append({'start': start, 'end': end, 'term': term})
+    return spans
+
+
+class LexicalIndex:
+    """BM25 inverted index over a collection's documents."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, doc_id: str, text: str):
+        """Index (or re-index) a document."""
+        counts = Counter(term for term, _, _ in tokenize(text))
+        with self._lock:
+            self.remove(doc_id)
+            for term, count in counts.items():
+                self.postings.setdefault(term, {})[doc_id] = count
+            length = sum(counts.values())
+            self.doc_lengths[doc_id] = length
+            self._doc_terms[doc_id] = list(counts)
+            self._total_length += length
+
+    def add_many(self, documents: Iterable[Tuple[str, str]]):
+        for doc_id, text in documents:
+            self.add(doc_id, text)
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            length = self.doc_lengths.pop(doc_id, None)
+            if length is None:
+                return
+            self._total_length -= length
+            for term in self._doc_terms.pop(doc_id):
+                del self.postings[term][doc_id]
+                if not self.postings[term]:
+                    del self.postings[term]
+
+    def search(self, query_text: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """``(doc_id, bm25_score)`` of the best matching documents, best first."""
+        with self._lock:
+            n_docs = len(self.doc_lengths)
+            if not n_docs:
+                return []
+            average_length = self._total_length / n_docs or 1.0
+            scores: Dict[str, float] = {}
+            for term in query_terms(query_text):
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc_id, tf in docs.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:top_k]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = RRF_K,
+                           weights: Optional[List[float]] = None) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists: each id scores ``sum(weight / (k + rank))``, best first."""
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
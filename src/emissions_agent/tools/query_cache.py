@@ -0,0 +1,141 @@
+"""
+LRU/TTL cache for vector query results with near-duplicate matching.
+
+Entries are keyed on collection, collection version, normalized query text and
+n_results. Each entry also keeps the query embedding, so a differently worded
+query whose embedding is close enough to a cached one is served from the cache.
+A semantic hit also requires the same identifiers (terms with a digit, such as
+"1" in "Scope 1" or "hfc-134a"): queries that differ only in an identifier embed
+almost identically but ask for different things.
+"""
+
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .lexical_index import query_terms
+from .tool_trace import record_cache_hit
+
+
+def normalize_query(query_text: str) -> str:
+    """Lower-case, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", query_text).lower().strip().rstrip("?.!").strip()
+
+
+def identifier_terms(query_text: str) -> frozenset:
+    """Terms of a query that contain a digit: scope and category numbers, years, codes."""
+    return frozenset(term for term in query_terms(query_text) if any(char.isdigit() for char in term))
+
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class QueryCache:
+    """In-memory LRU cache of query results with a TTL and semantic lookup.
+
+    Safe to share between threads answering questions concurrently.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600.0,
+                 similarity_threshold: float = 0.97):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._stats = {'hits': 0, 'semantic_hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        self._lock = threading.RLock()
+
+    def _expired(self, entry: dict, now: float) -> bool:
+        return self.ttl_seconds is not None and now - entry['created'] > self.ttl_seconds
+
+    def get(self, collection_name: str, version: int, query_text: str, n_results: int) -> Optional[List[Dict[str, Any]]]:
+        """Exact lookup on the normalized query text. Doesn't count a miss."""
+        with self._lock:
+            key = (collection_name, version, normalize_query(query_text), n_results)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._expired(entry, time.monotonic()):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            record_cache_hit('query')
+            return copy.deepcopy(entry['results'])
+
+    def get_similar(self, collection_name: str, version: int, n_results: int,
+                    embedding: Sequence[float], query_text: str) -> Optional[List[Dict[str, Any]]]:
+        """Semantic lookup: the closest cached query above the similarity threshold with the same identifiers."""
+        with self._lock:
+            now = time.monotonic()
+            query = _unit(embedding)
+            identifiers = identifier_terms(query_text)
+            best_key, best_score = None, self.similarity_threshold
+            for key, entry in list(self._entries.items()):
+                if key[0] != collection_name or key[1] != version or key[3] != n_results:
+                    continue
+                if self._expired(entry, now):
+                    del self._entries[key]
+                    continue
+                if entry['identifiers'] != identifiers:
+                    continue
+                score = float(np.dot(query, entry['embedding']))
+                if score >= best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self._stats['semantic_hits'] += 1
+            record_cache_hit('query_semantic')
+            return copy.deepcopy(self._entries[best_key]['results'])
+
+    def put(self, collection_name: str, version: int, query_text: str, n_results: int,
+            embedding: Sequence[float], results: List[Dict[str, Any]]):
+        """Store results for a query, evicting the least recently used entries."""
+        with self._lock:
+            key = (collection_name, version, normalize_query(query_text), n_results)
+            self._entries[key] = {
+                'embedding': _unit(embedding),
+                'identifiers': identifier_terms(query_text),
+                'results': copy.deepcopy(results),
+                'created': time.monotonic(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, collection_name: str):
+        """Drop every entry for a collection."""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == collection_name]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._stats['invalidations'] += len(stale)
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['semantic_hits'] + self._stats['misses']
+            hits = self._stats['hits'] + self._stats['semantic_hits']
+            return {
+                **self._stats,
+                'entries': len(self._entries),
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,279 @@
+"""
+Deterministic fast path for purely quantitative questions.
+
+Questions such as "What is our highest emitting Scope 3 category?" or
+"Generate a summary report of our total emissions by scope" are answered by a
+group-by over the loaded inventory; running them through the multi-agent crew
+takes minutes and an LLM. ``classify_question`` matches a question against a
+few local intent patterns (no network call) and ``answer_directly`` answers
+the matched ones from the analysis tools with a templated report, saved with
+``save_question_report`` like a crew answer. Anything that needs judgement,
+guidance documents or peer data is left to the crew, as is any question with
+a word the handlers don't understand, since it may be a filter they'd ignore.
+``benchmarks/bench_query_router.py`` checks the routing on a table of questions.
+"""
+
+import json
+import re
+import time
+from typing import Callable, Dict, List, Optional
+
+# Words that mean the question needs reasoning or documents, not just arithmetic
+_QUALITATIVE = re.compile(
+    r"\b(why|explain\w*|reason\w*|valid\w*|protocol|guidance|standard|industry|peers?|other compan\w*|"
+    r"benchmark\w*|classif\w*|calculat\w*|methodolog\w*|complian\w*|target\w*|strateg\w*|"
+    r"should\s+\w+(?:\s+\w+)?\s+be)\b",
+    re.IGNORECASE,
+)
+_RANKING = r"\b(highest|largest|biggest|top|most|main|leading|prioriti[sz]e\w*|rank\w*)\b"
+_SCOPE = re.compile(r"\bscope\s*([123])\b", re.IGNORECASE)
+
+# (intent, patterns that must all match), most specific first
+INTENTS = [
+    ('top_category', [r"\bcategor(y|ies)\b", _RANKING]),
+    ('top_suppliers', [r"\bsuppliers?\b", _RANKING]),
+    ('top_facilities', [r"\b(facilit(y|ies)|sites?|locations?|plants?)\b", _RANKING]),
+    ('scope_totals', [r"\b(total|summary|overview|breakdown)\b", r"\bemissions?\b"]),
+]
+# Scopes each intent's handler can answer for
+INTENT_SCOPES = {
+    'top_category': {'scope3'},
+    'top_suppliers': {'scope3'},
+    'top_facilities': {'scope1', 'scope2'},
+    'scope_totals': {'scope1', 'scope2', 'scope3'},
+}
+# Every word a routed question may contain. The handlers answer for all
+# categories, suppliers, facilities and years at once, so anything else (a
+# named category, activity or site, a year, another superlative such as
+# "lowest", a comparison or a count) is a constraint they would ignore, and
+# the question goes to the crew instead. Grouping words (by, per, each,
+# across) are left out: only the groupings in _ALLOWED_PHRASES are honoured.
+_VOCABULARY = frozenset("""
+    a all an and are do does for from generate give i in is it key list me my of our ours please
+    provide report show summarise summarize tell the their them these this to us we what which who with
+    has have overall whole
+    emission emissions emit emits emitted emitting emitter emitters co2e ghg carbon footprint tonnes
+    total totals summary overview breakdown insight insights
+    scope scopes category categories activity activities specific contribute contributes contributing
+    contribution contributions driving drives source sources
+    supplier suppliers engage engagement reduction effort efforts should
+    facility facilities site sites location locations plant plants
+    highest largest biggest top most main leading prioritise prioritize prioritised prioritized
+    prioritising prioritizing priority rank ranked ranking rankings
+""".split())
+_WORD = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+# Scope filters are honoured; any other number (a category, year or count) is not.
+# Totals are only broken down by scope and rankings only order by emissions, so
+# "by supplier" or "per site" goes to the crew rather than getting scope totals.
+_ALLOWED_PHRASES = re.compile(
+    r"\b(?:by|per|across(?:\s+all)?|(?:for\s+)?each)\s+(?:scopes?|emissions?|co2e|tco2e)\b"
+    r"|\bscope\s*[123]\b|\btco2e\b"
+)
+# Activities and suppliers listed in a report
+TOP_N = 5
+
+
+class FastPathUnavailable(Exception):
+    """The data needed for a direct answer isn't loaded; the crew should answer instead."""
+
+
+def _unhandled_words(question: str) -> List[str]:
+    """Words of ``question`` outside what the fast-path handlers can honour."""
+    text = _ALLOWED_PHRASES.sub(' ', question.lower())
+    return [word for word in _WORD.findall(text) if word not in _VOCABULARY]
+
+
+def classify_question(question: str) -> Optional[dict]:
+    """``{'intent', 'scopes'}`` of a purely quantitative question, or None for the crew.
+
+    Only questions made entirely of known words are routed; any other word may
+    be a filter or a comparison the templated answer would silently ignore.
+    """
+    if _QUALITATIVE.search(question) or _unhandled_words(question):
+        return None
+    for intent, patterns in INTENTS:
+        if all(re.search(pattern, question, re.IGNORECASE) for pattern in patterns):
+            scopes = sorted({f"scope{number}" for number in _SCOPE.findall(question)})
+            if not INTENT_SCOPES[intent].issuperset(scopes):
+                return None
+            return {'intent': intent, 'scopes': scopes}
+    return None
+
+
+def _tool(name: str, **kwargs) -> dict:
+    """Run a registry tool and parse its JSON result."""
+    from .tool_registry import get_tool_registry
+
+    result = get_tool_registry().get_tool(name)._run(**kwargs)
+    try:
+        parsed = json.loads(result)
+    except json.JSONDecodeError:
+        raise FastPathUnavailable(result)
+    errors = [value['error'] for value in parsed.values() if isinstance(value, dict) and 'error' in value]
+    if errors:
+        raise FastPathUnavailable(errors[0])
+    return parsed
+
+
+def _sql(query: str, max_rows: int = TOP_N) -> List[dict]:
+    result = _tool('sql_query', query=query, max_rows=max_rows)
+    return [dict(zip(result['columns'], row)) for row in result['rows']]
+
+
+def _quote(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _tonnes(value: float) -> str:
+    return f"{value:,.1f} tCO2e"
+
+
+def _share(part: float, whole: float) -> str:
+    return f"{part / whole:.1%}" if whole else "n/a"
+
+
+def _scope_label(name: str) -> str:
+    return name.replace('scope', 'Scope ')
+
+
+def _scope_totals(scopes: List[str]) -> str:
+    summaries = _tool('analyze_emissions', scope='all', analysis_type='summary')
+    hotspots = _tool('analyze_emissions', scope='all', analysis_type='hotspots')
+    scopes = [scope for scope in scopes if scope in summaries] or sorted(summaries)
+    if not scopes:
+        raise FastPathUnavailable("No scope data loaded")
+    total = sum(summaries[scope]['total_emissions'] for scope in scopes)
+    records = sum(summaries[scope]['records'] for scope in scopes)
+
+    lines = [f"**Total emissions: {_tonnes(total)}** across {records:,} records.", "",
+             "| Scope | Emissions (tCO2e) | Share | Records |", "|---|---:|---:|---:|"]
+    for scope in scopes:
+        summary = summaries[scope]
+        lines.append(f"| {_scope_label(scope)} | {summary['total_emissions']:,.1f} | "
+                     f"{_share(summary['total_emissions'], total)} | {summary['records']:,} |")
+
+    largest = max(scopes, key=lambda scope: summaries[scope]['total_emissions'])
+    lines += ["", "### Key insights",
+              f"- {_scope_label(largest)} is the largest source at "
+              f"{_share(summaries[largest]['total_emissions'], total)} of the total."]
+    for scope in scopes:
+        for dimension, ranked in hotspots.get(scope, {}).items():
+            if ranked:
+                name, value = next(iter(ranked.items()))
+                kind = dimension.replace('_hotspots', '')
+                lines.append(f"- Largest {_scope_label(scope)} {kind}: {name} ({_tonnes(value)}, "
+                             f"{_share(value, summaries[scope]['total_emissions'])} of {_scope_label(scope)}).")
+    return '\n'.join(lines)
+
+
+def _top_category(scopes: List[str]) -> str:
+    summary = _tool('analyze_emissions', scope='scope3', analysis_type='summary')['scope3']
+    categories = _tool('analyze_emissions', scope='scope3', analysis_type='hotspots')['scope3'].get('category_hotspots')
+    if not categories:
+        raise FastPathUnavailable("No Scope 3 category breakdown")
+    top, top_total = next(iter(categories.items()))
+    activities = _sql(
+        "SELECT Activity_Description AS activity, SUM(CO2e_Tonnes) AS co2e, COUNT(*) AS records "
+        f"FROM scope3 WHERE Category = {_quote(top)} GROUP BY Activity_Description ORDER BY co2e DESC"
+    )
+
+    lines = [f"**{top}** is the highest emitting Scope 3 category at {_tonnes(top_total)} "
+             f"({_share(top_total, summary['total_emissions'])} of Scope 3's {_tonnes(summary['total_emissions'])}).",
+             "", "### Contributing activities", "",
+             "| Activity | Emissions (tCO2e) | Share of category | Records |", "|---|---:|---:|---:|"]
+    for row in activities:
+        lines.append(f"| {row['activity']} | {row['co2e']:,.1f} | {_share(row['co2e'], top_total)} | {row['records']:,} |")
+    lines += ["", "### Next largest categories"]
+    lines += [f"- {name}: {_tonnes(value)} ({_share(value, summary['total_emissions'])})"
+              for name, value in list(categories.items())[1:]]
+    return '\n'.join(lines)
+
+
+def _top_suppliers(scopes: List[str]) -> str:
+    summary = _tool('analyze_emissions', scope='scope3', analysis_type='summary')['scope3']
+    suppliers = _sql(
+        "SELECT Supplier AS supplier, SUM(CO2e_Tonnes) AS co2e, SUM(Spend_Amount) AS spend, COUNT(*) AS records "
+        "FROM scope3 WHERE Supplier IS NOT NULL GROUP BY Supplier ORDER BY co2e DESC"
+    )
+    if not suppliers:
+        raise FastPathUnavailable("No Scope 3 supplier data")
+    total = summary['total_emissions']
+
+    lines = [f"Suppliers ranked by Scope 3 emissions (Scope 3 total {_tonnes(total)}):", "",
+             "| Rank | Supplier | Emissions (tCO2e) | Share | Cumulative | Intensity (tCO2e per $1k spend) |",
+             "|---:|---|---:|---:|---:|---:|"]
+    cumulative = 0.0
+    for rank, row in enumerate(suppliers, 1):
+        cumulative += row['co2e']
+        intensity = f"{row['co2e'] / row['spend'] * 1000:.3f}" if row['spend'] else "n/a"
+        lines.append(f"| {rank} | {row['supplier']} | {row['co2e']:,.1f} | {_share(row['co2e'], total)} | "
+                     f"{_share(cumulative, total)} | {intensity} |")
+    lines += ["", "### Key insights",
+              f"- The top {len(suppliers)} suppliers account for {_share(cumulative, total)} of Scope 3 emissions; "
+              f"engaging them first covers the most emissions per relationship.",
+              f"- {suppliers[0]['supplier']} alone contributes {_share(suppliers[0]['co2e'], total)}."]
+    return '\n'.join(lines)
+
+
+def _top_facilities(scopes: List[str]) -> str:
+    scopes = [scope for scope in scopes if scope != 'scope3'] or ['scope1', 'scope2']
+    lines = []
+    for scope in scopes:
+        summary = _tool('analyze_emissions', scope=scope, analysis_type='summary')[scope]
+        facilities = _tool('analyze_emissions', scope=scope, analysis_type='hotspots')[scope].get('facility_hotspots')
+        if not facilities:
+            raise FastPathUnavailable(f"No facility breakdown for {scope}")
+        lines += [f"### {_scope_label(scope)} (total {_tonnes(summary['total_emissions'])})", "",
+                  "| Facility | Emissions (tCO2e) | Share |", "|---|---:|---:|"]
+        lines += [f"| {name} | {value:,.1f} | {_share(value, summary['total_emissions'])} |"
+                  for name, value in facilities.items()]
+        lines.append("")
+    return '\n'.join(lines).rstrip()
+
+
+HANDLERS: Dict[str, Callable[[List[str]], str]] = {
+    'scope_totals': _scope_totals,
+    'top_category': _top_category,
+    'top_suppliers': _top_suppliers,
+    'top_facilities': _top_facilities,
+}
+
+
+def answer_directly(question: str, question_number: int, data_directory: str = "./data") -> Optional[dict]:
+    """Answer a quantitative question from the emissions data and save its report.
+
+    Returns ``{'intent', 'answer', 'saved'}``, or None when the question (or the
+    loaded data) needs the crew.
+    """
+    route = classify_question(question)
+    if route is None:
+        return None
+
+    from .warm_state import get_warm_state
+
+    try:
+        # Only the emissions tables are needed; the knowledge base stays untouched
+        get_warm_state().ensure_warm(data_directory, parts=('emissions',))
+        body = HANDLERS[route['intent']](route['scopes'])
+    except FastPathUnavailable:
+        return None
+
+    answer = (f"{body}\n\n*Computed directly from the emissions data "
+              f"({route['intent'].replace('_', ' ')}); no language model was used.*")
+    from .tool_registry import get_tool_registry
+    saved = get_tool_registry().get_tool('save_question_report')._run(
+        question=question, answer=answer, question_number=question_number
+    )
+    return {'intent': route['intent'], 'answer': answer, 'saved': saved}
+
+
+def answer_with_fast_path(question: str, question_number: int, data_directory: str = "./data") -> Optional[dict]:
+    """``answer_directly`` traced under the question's label, plus its ``'seconds'``; None for the crew."""
+    from .tool_trace import get_tool_tracer
+
+    started = time.perf_counter()
+    with get_tool_tracer().label(f"question_{question_number}"):
+        routed = answer_directly(question, question_number, data_directory)
+    if routed is None:
+        return None
+    return {**routed, 'seconds': time.perf_counter() - started}
@@ -0,0 +1,295 @@
+"""
+Content-addressed cache of LLM completions and tool results for crew runs.
+
+Re-running ``questions`` or ``run`` on unchanged data repeats every LLM and
+tool call. Each call is keyed by a hash of what determines its result: the
+model, its sampling settings and the full message list for a completion, the
+tool name and arguments for a tool call, and in both cases a fingerprint of
+the emissions CSVs, the PDFs, the user preferences and the embedding model
+behind the vector collections. Results are stored in a local SQLite database.
+
+Modes:
+    off      every call goes to the LLM or tool
+    cache    serve stored results, record the rest
+    record   make every call live and overwrite what is stored
+    replay   serve stored results only; a miss is an error (fully offline)
+
+Read-only tools (analysis, SQL, vector queries) are served without running.
+Tools with side effects (loading data, building collections, writing
+reports) always run, so in-memory state and report files are the same as in
+the recorded run, but return their recorded output so that the transcript,
+and with it the LLM prompts, don't drift on timing or cache-status details.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .tool_trace import record_cache_hit
+
+DEFAULT_CACHE_PATH = "./replay_cache/replay.sqlite3"
+MODES = ('off', 'cache', 'record', 'replay')
+# Tools whose result depends only on their arguments and the loaded data
+READ_ONLY_TOOLS = frozenset({
+    'analyze_emissions', 'compare_emissions', 'sql_query',
+    'query', 'similarity_search', 'retrieve_topk_with_spans', 'batch_query',
+})
+# Inputs outside the data directory that change answers
+EXTRA_SOURCES = [Path("knowledge") / "user_preference.txt"]
+
+
+class ReplayMiss(RuntimeError):
+    """A call had no recorded result in replay mode."""
+
+
+def _hash(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class ReplayCache:
+    """SQLite-backed map of call key to recorded LLM completion or tool result."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, mode: str = 'off'):
+        self.path = Path(path)
+        self.mode = 'off'
+        self.data_directory = "./data"
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._fingerprint: Optional[str] = None
+        # Sizes, mtimes and embedding model the fingerprint was computed from
+        self._fingerprint_state: Optional[tuple] = None
+        self.counters = {'hits': 0, 'misses': 0, 'recorded': 0}
+        self.configure(mode)
+
+    def configure(self, mode: str, data_directory: str = "./data"):
+        """Switch mode and the data directory fingerprinted into every key."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown replay mode '{mode}'. Use: {', '.join(MODES)}")
+        with self._lock:
+            self.mode = mode
+            self.data_directory = data_directory
+            self._fingerprint = None
+        if mode == 'replay':
+            # Nothing should leave the machine when replaying
+            os.environ.setdefault('CREWAI_DISABLE_TELEMETRY', 'true')
+            os.environ.setdefault('OTEL_SDK_DISABLED', 'true')
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != 'off'
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL,"
+                " name TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " created REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS file_digests ("
+                " path TEXT PRIMARY KEY,"
+                " size INTEGER NOT NULL,"
+                " mtime_ns INTEGER NOT NULL,"
+                " digest TEXT NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _file_digest(self, path: Path) -> Optional[str]:
+        """SHA-256 of a file's content, re-hashed only when its size or mtime changed."""
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        key = str(path.resolve())
+        row = self._connection().execute(
+            "SELECT digest FROM file_digests WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (key, stat.st_size, stat.st_mtime_ns),
+        ).fetchone()
+        if row:
+            return row[0]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO file_digests (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+            (key, stat.st_size, stat.st_mtime_ns, digest.hexdigest()),
+        )
+        self._conn.commit()
+        return digest.hexdigest()
+
+    def fingerprint(self) -> str:
+        """Hash of the data, PDFs, user preferences and embedding model behind the current run.
+
+        Recomputed whenever a source file's size or mtime (or the embedding
+        model) changes, so edited data never replays results recorded against
+        the old files in a long-running process.
+        """
+        from .data_tools import EMISSIONS_FILES, KNOWLEDGE_FILES, resolve_data_directory
+        from .embedding_store import embedding_model_name
+        from .vector_manager import get_vector_manager
+        from .warm_state import source_fingerprint
+
+        with self._lock:
+            data_dir = resolve_data_directory(self.data_directory)
+            sources: List[Path] = [data_dir / name for name in EMISSIONS_FILES + KNOWLEDGE_FILES] + EXTRA_SOURCES
+            embedding_model = embedding_model_name(get_vector_manager().embedding_function)
+            state = (source_fingerprint(sources), embedding_model)
+            if self._fingerprint is None or state != self._fingerprint_state:
+                self._fingerprint = _hash({
+                    'files': {path.name: self._file_digest(path) for path in sources},
+                    'embedding_model': embedding_model,
+                })
+                self._fingerprint_state = state
+            return self._fingerprint
+
+    def key(self, kind: str, name: str, payload) -> str:
+        return _hash({'kind': kind, 'name': name, 'payload': payload, 'fingerprint': self.fingerprint()})
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._connection().execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, kind: str, name: str, value):
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO entries (key, kind, name, value, created) VALUES (?, ?, ?, ?, ?)",
+                (key, kind, name, json.dumps(value), time.time()),
+            )
+            self._conn.commit()
+            self.counters['recorded'] += 1
+
+    def _lookup(self, key: str, kind: str, name: str):
+        """Stored value for ``key`` unless recording; raises in replay mode on a miss."""
+        if self.mode == 'record':
+            return None
+        value = self.get(key)
+        with self._lock:
+            self.counters['hits' if value is not None else 'misses'] += 1
+        if value is not None:
+            record_cache_hit('replay')
+            return value
+        if self.mode == 'replay':
+            raise ReplayMiss(f"No recorded {kind} result for {name} (key {key[:12]}); record this run first")
+        return None
+
+    def wrap_tool(self, tool_name: str, run: Callable) -> Callable:
+        """Serve a registry tool's ``_run`` from the cache according to the current mode."""
+        @wraps(run)
+        def replayed(*args, **kwargs):
+            if not self.enabled:
+                return run(*args, **kwargs)
+            key = self.key('tool', tool_name, [args, kwargs])
+            if tool_name in READ_ONLY_TOOLS:
+                recorded = self._lookup(key, 'tool', tool_name)
+                if recorded is not None:
+                    return recorded
+                result = run(*args, **kwargs)
+            else:
+                # Run for its side effects; prefer the recorded output for a stable transcript
+                result = run(*args, **kwargs)
+                if isinstance(result, str) and result.startswith("Error"):
+                    return result
+                recorded = self.get(key) if self.mode != 'record' else None
+                if recorded is not None:
+                    with self._lock:
+                        self.counters['hits'] += 1
+                    record_cache_hit('replay')
+                    return recorded
+            if isinstance(result, str) and not result.startswith("Error"):
+                self.put(key, 'tool', tool_name, result)
+            return result
+        return replayed
+
+    def wrap_llm(self, llm):
+        """Serve a crewai LLM's completions from the cache; returns the same LLM."""
+        if getattr(llm, '_replay_wrapped', False) or not hasattr(llm, 'call'):
+            return llm
+        call = llm.call
+
+        @wraps(call)
+        def replayed(messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+            # Native function calling runs tools inside the call; leave it alone
+            if not self.enabled or available_functions:
+                return call(messages, tools=tools, callbacks=callbacks,
+                            available_functions=available_functions, **kwargs)
+            name = getattr(llm, 'model', type(llm).__name__)
+            key = self.key('llm', name, {
+                'messages': messages,
+                'tools': tools,
+                'temperature': getattr(llm, 'temperature', None),
+                'stop': getattr(llm, 'stop', None),
+                'reasoning_effort': getattr(llm, 'reasoning_effort', None),
+            })
+            recorded = self._lookup(key, 'llm', name)
+            if recorded is not None:
+                return recorded
+            result = call(messages, tools=tools, callbacks=callbacks,
+                          available_functions=available_functions, **kwargs)
+            if isinstance(result, str) and result:
+                self.put(key, 'llm', name, result)
+            return result
+
+        object.__setattr__(llm, 'call', replayed)
+        object.__setattr__(llm, '_replay_wrapped', True)
+        return llm
+
+    def wrap_knowledge(self, knowledge):
+        """Serve a crewai Knowledge's queries (embedding lookups) from the cache."""
+        if knowledge is None or getattr(knowledge, '_replay_wrapped', False):
+            return knowledge
+        query = knowledge.query
+
+        @wraps(query)
+        def replayed(query_texts, *args, **kwargs):
+            if not self.enabled:
+                return query(query_texts, *args, **kwargs)
+            key = self.key('knowledge', 'crew', [query_texts, args, kwargs])
+            recorded = self._lookup(key, 'knowledge', 'crew')
+            if recorded is not None:
+                return recorded
+            results = query(query_texts, *args, **kwargs)
+            self.put(key, 'knowledge', 'crew', [dict(result) for result in results])
+            return results
+
+        object.__setattr__(knowledge, 'query', replayed)
+        object.__setattr__(knowledge, '_replay_wrapped', True)
+        return knowledge
+
+    def wrap_crew(self, crew):
+        """Route a crew's LLM completions and knowledge queries through the cache."""
+        for agent in crew.agents:
+            self.wrap_llm(agent.llm)
+        self.wrap_knowledge(crew.knowledge)
+        return crew
+
+    def stats(self) -> Dict[str, object]:
+        """Mode, hit/miss/record counters and number of stored entries per kind."""
+        with self._lock:
+            stored = dict(self._connection().execute("SELECT kind, COUNT(*) FROM entries GROUP BY kind").fetchall())
+        return {'mode': self.mode, **self.counters, 'stored': stored}
+
+
+# Global replay cache instance
+_replay_cache = None
+
+def get_replay_cache() -> ReplayCache:
+    """Get the global replay cache instance."""
+    global _replay_cache
+    if _replay_cache is None:
+        _replay_cache = ReplayCache()
+    return _replay_cache
@@ -2,8 +2,13 @@ from crewai.tools import BaseTool
 from typing import Type
 from pydantic import BaseModel, Field
 import pandas as pd
+import os
+import threading
 from pathlib import Path
 
+# Serializes report writes when questions are answered concurrently
+_report_lock = threading.Lock()
+
 class WriteMDInput(BaseModel):
     """Input schema for WriteMD tool."""
     content: str = Field(..., description="Markdown content to write")
@@ -74,9 +79,12 @@ class SaveQuestionReportTool(BaseTool):
 *Generated on {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}*
 """
             
-            # Save the file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # Save the file atomically so a concurrent reader never sees a partial report
+            tmp_path = file_path.with_suffix(f".md.{os.getpid()}.{threading.get_ident()}.tmp")
+            with _report_lock:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(tmp_path, file_path)
             
             return f"Successfully saved question report to {file_path}"
         except Exception as e:
@@ -0,0 +1,178 @@
+"""
+Embedded, read-only SQL over the loaded scope dataframes.
+
+Uses DuckDB when it is installed, which queries the pandas frames in place;
+otherwise falls back to an in-memory SQLite copy of the frames. Either way
+queries are limited to a single SELECT (or WITH ... SELECT) statement, capped
+at a number of result rows and interrupted after a time limit.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+DEFAULT_MAX_ROWS = 50
+DEFAULT_TIMEOUT_SECONDS = 5.0
+# Decimal places kept for float results
+RESULT_DECIMALS = 6
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+_WRITE_KEYWORDS = re.compile(
+    r"\b(insert|update|delete|create|drop|alter|attach|detach|copy|export|import|install|load|pragma|vacuum)\b",
+    re.IGNORECASE,
+)
+
+
+class SQLQueryError(ValueError):
+    """A query was rejected, failed or ran out of time."""
+
+
+def _duckdb_available() -> bool:
+    """Check whether DuckDB is installed."""
+    try:
+        import duckdb  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def check_read_only(sql: str) -> str:
+    """Return ``sql`` without a trailing semicolon if it is a single read-only query."""
+    stripped = _LITERAL.sub("''", _COMMENT.sub(' ', sql)).strip().rstrip(';').strip()
+    if not stripped:
+        raise SQLQueryError("Empty query")
+    if ';' in stripped:
+        raise SQLQueryError("Only a single statement is allowed")
+    first = stripped.split(None, 1)[0].lower()
+    if first not in ('select', 'with'):
+        raise SQLQueryError("Only SELECT queries are allowed")
+    keyword = _WRITE_KEYWORDS.search(stripped)
+    if keyword:
+        raise SQLQueryError(f"'{keyword.group(0).upper()}' is not allowed in a read-only query")
+    return sql.strip().rstrip(';').strip()
+
+
+def _compact(value):
+    if isinstance(value, float):
+        return round(value, RESULT_DECIMALS)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+class SQLEngine:
+    """Keeps scope frames registered as tables and runs limited queries over them."""
+
+    def __init__(self, engine: Optional[str] = None):
+        self.engine = engine or ('duckdb' if _duckdb_available() else 'sqlite')
+        self._lock = threading.Lock()
+        # Table name -> frame currently registered under it. Holding the frame
+        # (not its id, which a new frame can reuse once it's freed) makes the
+        # identity check in _sync_tables reliable
+        self._registered: Dict[str, pd.DataFrame] = {}
+        if self.engine == 'duckdb':
+            import duckdb
+            self._conn = duckdb.connect(':memory:')
+            # Queries may only see the registered frames, never the file system
+            self._conn.execute("SET enable_external_access = false")
+        else:
+            self._conn = sqlite3.connect(':memory:', check_same_thread=False)
+
+    def _sync_tables(self, tables: Dict[str, pd.DataFrame]):
+        """Register new or replaced frames and drop tables that are no longer loaded."""
+        for name in [name for name in self._registered if name not in tables]:
+            self._drop(name)
+        for name, df in tables.items():
+            if self._registered.get(name) is not df:
+                self._drop(name)
+                self._register(name, df)
+                self._registered[name] = df
+
+    def _register(self, name: str, df: pd.DataFrame):
+        if self.engine == 'duckdb':
+            self._conn.register(name, df)
+            return
+        # SQLite stores labels and strings as TEXT and dates as ISO timestamps
+        converted = df.astype({column: 'object' for column, dtype in df.dtypes.items()
+                               if isinstance(dtype, (pd.CategoricalDtype, pd.StringDtype))})
+        converted.to_sql(name, self._conn, index=False)
+
+    def _drop(self, name: str):
+        if name not in self._registered:
+            return
+        if self.engine == 'duckdb':
+            self._conn.unregister(name)
+        else:
+            self._conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+        del self._registered[name]
+
+    def _execute(self, sql: str, timeout_seconds: float) -> tuple:
+        if self.engine == 'duckdb':
+            timer = threading.Timer(timeout_seconds, self._conn.interrupt)
+            timer.start()
+            try:
+                cursor = self._conn.execute(sql)
+                return [column[0] for column in cursor.description], cursor.fetchall()
+            finally:
+                timer.cancel()
+
+        deadline = time.monotonic() + timeout_seconds
+        allowed = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+        self._conn.set_authorizer(lambda action, *_: sqlite3.SQLITE_OK if action in allowed else sqlite3.SQLITE_DENY)
+        self._conn.set_progress_handler(lambda: int(time.monotonic() > deadline), 10_000)
+        try:
+            cursor = self._conn.execute(sql)
+            return [column[0] for column in cursor.description], cursor.fetchall()
+        finally:
+            self._conn.set_progress_handler(None, 0)
+            self._conn.set_authorizer(None)
+
+    def query(self, sql: str, tables: Dict[str, pd.DataFrame], max_rows: int = DEFAULT_MAX_ROWS,
+              timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS) -> dict:
+        """Run a read-only query over ``tables``.
+
+        Returns ``{'columns', 'rows', 'row_count', 'truncated', 'engine', 'elapsed_ms'}``
+        with at most ``max_rows`` rows.
+        """
+        sql = check_read_only(sql)
+        limited = f"SELECT * FROM ({sql}) AS result LIMIT {int(max_rows) + 1}"
+        with self._lock:
+            self._sync_tables(tables)
+            start = time.perf_counter()
+            try:
+                columns, rows = self._execute(limited, timeout_seconds)
+            except Exception as e:
+                if time.perf_counter() - start >= timeout_seconds:
+                    raise SQLQueryError(f"Query exceeded the {timeout_seconds:g}s time limit") from e
+                raise SQLQueryError(str(e)) from e
+
+        truncated = len(rows) > max_rows
+        rows = [[_compact(value) for value in row] for row in rows[:max_rows]]
+        return {
+            'columns': columns,
+            'rows': rows,
+            'row_count': len(rows),
+            'truncated': truncated,
+            'engine': self.engine,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    def describe(self, tables: Dict[str, pd.DataFrame]) -> Dict[str, List[str]]:
+        """Column names and dtypes of each queryable table."""
+        return {name: [f"{column} {dtype}" for column, dtype in df.dtypes.items()] for name, df in tables.items()}
+
+
+# Global SQL engine instance
+_sql_engine = None
+
+def get_sql_engine() -> SQLEngine:
+    """Get the global SQL engine instance."""
+    global _sql_engine
+    if _sql_engine is None:
+        _sql_engine = SQLEngine()
+    return _sql_engine
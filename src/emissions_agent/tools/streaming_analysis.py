@@ -0,0 +1,73 @@
+"""
+Chunked analysis of scope CSVs that are too large to load into memory.
+
+A file is read ``chunk_rows`` rows at a time and each chunk is reduced to a
+partial aggregate that merges with the others:
+
+- summary, hotspots and compare: an ``AggregateCube`` per chunk, merged into
+  one cube for the file (one pass).
+- quality: per-group counts (``ScopeStatistics``) on a first pass, then a
+  second pass validating each chunk against them, with duplicates tracked by
+  row hash across chunks.
+
+Peak memory is bounded by the chunk size plus the size of the aggregates,
+which grow with the number of distinct groups rather than rows (duplicate
+detection keeps 8 bytes per distinct row). Results are identical to the
+in-memory path.
+"""
+
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from .aggregate_cube import AggregateCube
+from .data_cache import infer_date_format, iter_scope_csv
+from .data_quality import DuplicateTracker, QualityAccumulator, ScopeStatistics, validate
+
+DEFAULT_CHUNK_ROWS = 250_000
+
+
+def _pinned_dtypes(seen: Dict[str, Set[str]]) -> Dict[str, str]:
+    """Dtypes for columns parsed differently by different chunks.
+
+    A column that is integer in one chunk and float in another (e.g. because
+    only some chunks have blanks) is read as float everywhere, anything else
+    that varies as text, matching what parsing the whole file would infer.
+    """
+    pinned = {}
+    for column, dtypes in seen.items():
+        if len(dtypes) < 2:
+            continue
+        numeric = all(dtype.startswith(('int', 'float')) for dtype in dtypes)
+        pinned[column] = 'float64' if numeric else 'object'
+    return pinned
+
+
+def stream_cube(file_path: Path, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Optional[AggregateCube]:
+    """Build a scope's aggregate cube one chunk at a time.
+
+    Returns None if the file has no CO2e_Tonnes column.
+    """
+    cube = None
+    date_format = None
+    for chunk in iter_scope_csv(file_path, chunk_rows):
+        if date_format is None and 'Date' in chunk.columns:
+            # Chunks before the first date have no months to bucket anyway
+            date_format = infer_date_format(chunk['Date'])
+        cube = AggregateCube.merge([cube, AggregateCube.build(chunk, date_format)])
+    return cube
+
+
+def stream_quality_report(file_path: Path, chunk_rows: int = DEFAULT_CHUNK_ROWS, sample_size: int = 5) -> dict:
+    """Validate a scope one chunk at a time; same report as ``quality_report``."""
+    stats = ScopeStatistics()
+    dtypes_seen: Dict[str, Set[str]] = {}
+    for chunk in iter_scope_csv(file_path, chunk_rows):
+        stats.observe(chunk)
+        for column, dtype in chunk.dtypes.items():
+            dtypes_seen.setdefault(column, set()).add(str(dtype))
+
+    duplicates = DuplicateTracker()
+    accumulator = QualityAccumulator(sample_size)
+    for chunk in iter_scope_csv(file_path, chunk_rows, dtype=_pinned_dtypes(dtypes_seen)):
+        accumulator.add(validate(chunk, stats, duplicates), len(chunk))
+    return accumulator.report()
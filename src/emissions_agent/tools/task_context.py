@@ -0,0 +1,290 @@
+"""
+Size-bounded context passed between the tasks of the full crew.
+
+crewai hands every later task the raw output of the tasks it depends on, so
+the prompts of the last tasks grow with everything written before them. The
+``TaskContextStore`` keeps each task's full output on disk under
+``outputs/task_outputs/<run>/`` and gives dependent tasks a digest instead:
+the key numbers returned by the analysis tools during the task, the
+citations it used and the findings (headings and bullets) of its output,
+within a token budget. ``fetch_task_output`` returns the full text on
+demand. Outputs that already fit the budget are passed unchanged.
+
+For every task the store records the estimated prompt size with digests and
+with full outputs, written to ``metrics.json`` next to the outputs.
+"""
+
+import json
+import re
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from .chunking import CHARS_PER_TOKEN, estimate_tokens
+
+DEFAULT_OUTPUT_DIR = Path("outputs") / "task_outputs"
+# Token budget of one task's digest
+DEFAULT_DIGEST_TOKENS = 500
+# Tools whose JSON results carry the numbers a task's conclusions rest on
+ANALYSIS_TOOLS = ('analyze_emissions', 'compare_emissions', 'sql_query')
+RETRIEVAL_TOOLS = ('query', 'similarity_search', 'retrieve_topk_with_spans', 'batch_query')
+# Share of the digest budget each section may use; findings get the rest
+KEY_NUMBERS_SHARE = 0.45
+CITATIONS_SHARE = 0.15
+# Longest line kept in a digest, in characters
+MAX_LINE_CHARS = 240
+DEFAULT_FETCH_TOKENS = 1500
+
+_CITATION = re.compile(r"[\w.-]+ p\.\d+(?:-\d+)?")
+_FINDING = re.compile(r"^\s*(#{1,6}\s+|[-*+]\s+|\d+[.)]\s+)(.+)$")
+_MARKUP = re.compile(r"[*_`]+")
+
+
+def _number(value: float) -> str:
+    return f"{value:,}" if isinstance(value, int) else f"{value:,.2f}"
+
+
+def _key_numbers(value, prefix: str = '') -> Iterable[str]:
+    """``path=value`` for every number in a parsed tool result."""
+    if isinstance(value, dict):
+        if isinstance(value.get('columns'), list) and isinstance(value.get('rows'), list):
+            # sql_query result: one entry per row
+            for row in value['rows']:
+                yield ', '.join(f"{column}={_number(cell) if isinstance(cell, (int, float)) else cell}"
+                                for column, cell in zip(value['columns'], row))
+            return
+        for key, item in value.items():
+            yield from _key_numbers(item, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from _key_numbers(item, f"{prefix}[{index}]")
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield f"{prefix}={_number(value)}"
+
+
+def _citations(value) -> Iterable[str]:
+    """``cite`` fields of a parsed retrieval result."""
+    if isinstance(value, dict):
+        if isinstance(value.get('cite'), str):
+            yield value['cite']
+        for item in value.values():
+            yield from _citations(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _citations(item)
+
+
+def _parse(output) -> Optional[object]:
+    try:
+        return json.loads(output) if isinstance(output, str) else None
+    except json.JSONDecodeError:
+        return None
+
+
+def _clip(line: str) -> str:
+    return line if len(line) <= MAX_LINE_CHARS else line[:MAX_LINE_CHARS - 3].rstrip() + '...'
+
+
+def _fill(lines: Iterable[str], budget: int) -> List[str]:
+    """Distinct lines, in order, until ``budget`` tokens are used."""
+    kept, seen, used = [], set(), 0
+    for line in lines:
+        line = _clip(line.strip())
+        cost = estimate_tokens(line) + 1
+        if not line or line in seen or used + cost > budget:
+            continue
+        kept.append(line)
+        seen.add(line)
+        used += cost
+    return kept
+
+
+class TaskContextStore:
+    """Full task outputs on disk, their digests, and per-task prompt-size metrics for one crew run."""
+
+    def __init__(self, output_dir: Path = DEFAULT_OUTPUT_DIR, max_tokens: int = DEFAULT_DIGEST_TOKENS):
+        self.output_dir = Path(output_dir)
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self._listening = False
+        self.run_dir: Optional[Path] = None
+        self._outputs: Dict[str, dict] = {}
+        self._tool_results: Dict[str, List[Tuple[str, object, str]]] = {}
+        self._prompts: Dict[str, dict] = {}
+
+    def start_run(self, name: str = 'crew') -> Path:
+        """Store this run's outputs in ``<output_dir>/<name>_<timestamp>_<id>``."""
+        with self._lock:
+            self.run_dir = self.output_dir / f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+            self._outputs, self._tool_results, self._prompts = {}, {}, {}
+        return self.run_dir
+
+    def listen(self):
+        """Collect the analysis and retrieval tool results of each task from crewai's event bus."""
+        if self._listening:
+            return
+        from crewai.events import ToolUsageFinishedEvent, crewai_event_bus
+
+        @crewai_event_bus.on(ToolUsageFinishedEvent)
+        def _record(source, event):
+            self.record_tool_result(event.task_name, event.tool_name, event.tool_args, event.output)
+
+        self._listening = True
+
+    def record_tool_result(self, task_name: Optional[str], tool_name: str, tool_args, output):
+        if task_name and tool_name in ANALYSIS_TOOLS + RETRIEVAL_TOOLS:
+            with self._lock:
+                self._tool_results.setdefault(task_name, []).append((tool_name, tool_args, str(output)))
+
+    def store(self, task_name: str, raw: str) -> dict:
+        """Write a task's full output to disk and build its digest (once per task and run)."""
+        if self.run_dir is None:
+            self.start_run()
+        with self._lock:
+            if task_name in self._outputs:
+                return self._outputs[task_name]
+            tool_results = list(self._tool_results.get(task_name, []))
+        path = self.run_dir / f"{task_name}.md"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(raw, encoding='utf-8')
+        digest = self.digest(task_name, raw, tool_results)
+        entry = {
+            'path': str(path),
+            'output_tokens': estimate_tokens(raw),
+            'digest': digest,
+            'digest_tokens': estimate_tokens(digest),
+        }
+        with self._lock:
+            self._outputs[task_name] = entry
+        return entry
+
+    def digest(self, task_name: str, raw: str, tool_results: List[Tuple[str, object, str]]) -> str:
+        """Key numbers, citations and findings of a task's output within ``max_tokens``.
+
+        Returns the output itself when it already fits.
+        """
+        if estimate_tokens(raw) <= self.max_tokens:
+            return f"### {task_name}\n{raw}"
+        header = (f"### {task_name} (digest of a {estimate_tokens(raw):,}-token output; "
+                  f"fetch_task_output with task_name=\"{task_name}\" returns it in full)")
+        budget = self.max_tokens - estimate_tokens(header)
+
+        numbers, citations = [], []
+        for tool_name, tool_args, output in tool_results:
+            parsed = _parse(output)
+            if parsed is None:
+                continue
+            if tool_name in ANALYSIS_TOOLS:
+                args = tool_args if isinstance(tool_args, str) else json.dumps(tool_args, sort_keys=True)
+                # One line per scope (or per query), so a long result isn't cut off after the first
+                groups = parsed.items() if isinstance(parsed, dict) and 'rows' not in parsed else [('', parsed)]
+                for key, value in groups:
+                    values = '; '.join(_key_numbers(value))
+                    if values:
+                        numbers.append(f"- {tool_name}({args}) {key}: {values}" if key else f"- {tool_name}({args}): {values}")
+            else:
+                citations.extend(_citations(parsed))
+        citations.extend(match.group(0).strip() for match in _CITATION.finditer(raw))
+        findings = [_MARKUP.sub('', match.group(2)) for match in map(_FINDING.match, raw.splitlines()) if match]
+        if not findings:
+            findings = [line for line in raw.splitlines() if line.strip()]
+
+        sections = [header]
+        numbers = _fill(numbers, int(budget * KEY_NUMBERS_SHARE))
+        citations = _fill((f"- {citation}" for citation in citations), int(budget * CITATIONS_SHARE))
+        # Findings get what's left after the other sections and the three section titles
+        used = sum(estimate_tokens(line) + 1 for line in numbers + citations) + 3 * estimate_tokens("Key numbers:")
+        findings = _fill((f"- {finding}" for finding in findings), budget - used)
+        for title, lines in (('Key numbers', numbers), ('Findings', findings), ('Citations', citations)):
+            if lines:
+                sections += [f"{title}:"] + lines
+        return '\n'.join(sections)
+
+    def context_for(self, task_name: str, prompt: str, outputs: List[Tuple[str, str]]) -> str:
+        """Context for ``task_name`` from the ``(name, raw)`` outputs it depends on; records its prompt size."""
+        entries = [(name, self.store(name, raw)) for name, raw in outputs]
+        context = '\n\n'.join(entry['digest'] for _, entry in entries)
+        full_context = sum(entry['output_tokens'] for _, entry in entries)
+        with self._lock:
+            self._prompts[task_name] = {
+                'dependencies': [name for name, _ in entries],
+                'task_prompt_tokens': estimate_tokens(prompt),
+                'context_tokens': estimate_tokens(context),
+                'context_tokens_full': full_context,
+            }
+        self.write_metrics()
+        return context
+
+    def fetch(self, task_name: str, offset: int = 0, max_tokens: int = DEFAULT_FETCH_TOKENS) -> str:
+        """Up to ``max_tokens`` of a stored task output, starting ``offset`` tokens in."""
+        with self._lock:
+            entry = self._outputs.get(task_name)
+            available = sorted(self._outputs)
+        if entry is None:
+            return (f"Error fetching task output: no stored output for '{task_name}'. "
+                    f"Available: {', '.join(available) or 'none'}")
+        text = Path(entry['path']).read_text(encoding='utf-8')
+        start = max(offset, 0) * CHARS_PER_TOKEN
+        end = start + max_tokens * CHARS_PER_TOKEN
+        chunk = text[start:end]
+        if end < len(text):
+            chunk += (f"\n\n[tokens {offset:,}-{offset + max_tokens:,} of {entry['output_tokens']:,}; "
+                      f"call again with offset={offset + max_tokens} for more]")
+        return chunk
+
+    def metrics(self) -> dict:
+        """Per-task output and digest sizes, and prompt sizes with digests versus full outputs."""
+        with self._lock:
+            tasks = {}
+            for name in list(self._outputs) + [name for name in self._prompts if name not in self._outputs]:
+                tasks[name] = {**{key: value for key, value in self._outputs.get(name, {}).items() if key != 'digest'},
+                               **self._prompts.get(name, {})}
+            for row in tasks.values():
+                if 'task_prompt_tokens' in row:
+                    row['prompt_tokens'] = row['task_prompt_tokens'] + row['context_tokens']
+                    row['prompt_tokens_full'] = row['task_prompt_tokens'] + row['context_tokens_full']
+            return {'run_dir': str(self.run_dir) if self.run_dir else None,
+                    'digest_tokens': self.max_tokens, 'tasks': tasks}
+
+    def write_metrics(self) -> Optional[Path]:
+        if self.run_dir is None:
+            return None
+        path = self.run_dir / "metrics.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.metrics(), indent=2), encoding='utf-8')
+        return path
+
+
+class FetchTaskOutputInput(BaseModel):
+    """Input schema for FetchTaskOutput tool."""
+    task_name: str = Field(..., description="Name of the earlier task whose full output to read")
+    offset: int = Field(default=0, description="Token offset to start reading from (for long outputs)")
+    max_tokens: int = Field(default=DEFAULT_FETCH_TOKENS, description="Maximum number of tokens to return")
+
+class FetchTaskOutputTool(BaseTool):
+    name: str = "fetch_task_output"
+    description: str = ("Read the full output of an earlier task in this run. Task context only carries a digest "
+                        "(key numbers, findings, citations); use this when you need the complete text.")
+    args_schema: Type[BaseModel] = FetchTaskOutputInput
+
+    def _run(self, task_name: str, offset: int = 0, max_tokens: int = DEFAULT_FETCH_TOKENS) -> str:
+        try:
+            return get_task_context_store().fetch(task_name, offset, max_tokens)
+        except Exception as e:
+            return f"Error fetching task output: {str(e)}"
+
+
+# Global task context store instance
+_task_context_store = None
+
+def get_task_context_store() -> TaskContextStore:
+    """Get the global task context store instance."""
+    global _task_context_store
+    if _task_context_store is None:
+        _task_context_store = TaskContextStore()
+    return _task_context_store
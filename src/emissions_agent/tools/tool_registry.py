@@ -2,17 +2,39 @@
 Singleton tool registry to avoid recreating tool instances.
 """
 
+import importlib
+import threading
 from typing import Dict, Any
-from .data_tools import (
-    LoadEmissionsDataTool, 
-    LoadKnowledgeBaseTool, 
-    AnalyzeEmissionsTool, 
-    CompareEmissionsTool, 
-    GetDataInfoTool,
-    CreateVectorCollectionsTool
-)
-from .vector_tools import UpsertTool, QueryTool, SimilaritySearchTool, RetrieveTopKWithSpansTool
-from .reporting_tools import WriteMDTool, WriteFileTool, SaveQuestionReportTool
+
+from .replay_cache import get_replay_cache
+from .tool_trace import get_tool_tracer
+
+# Tool name -> (module, class); modules are imported and tools constructed on first use
+TOOL_CLASSES = {
+    # Data tools
+    'load_emissions_data': ('data_tools', 'LoadEmissionsDataTool'),
+    'load_knowledge_base': ('data_tools', 'LoadKnowledgeBaseTool'),
+    'analyze_emissions': ('data_tools', 'AnalyzeEmissionsTool'),
+    'compare_emissions': ('data_tools', 'CompareEmissionsTool'),
+    'get_data_info': ('data_tools', 'GetDataInfoTool'),
+    'create_vector_collections': ('data_tools', 'CreateVectorCollectionsTool'),
+    'sql_query': ('data_tools', 'SQLQueryTool'),
+    
+    # Vector tools
+    'upsert': ('vector_tools', 'UpsertTool'),
+    'query': ('vector_tools', 'QueryTool'),
+    'similarity_search': ('vector_tools', 'SimilaritySearchTool'),
+    'retrieve_topk_with_spans': ('vector_tools', 'RetrieveTopKWithSpansTool'),
+    'batch_query': ('vector_tools', 'BatchQueryTool'),
+    
+    # Reporting tools
+    'write_md': ('reporting_tools', 'WriteMDTool'),
+    'write_file': ('reporting_tools', 'WriteFileTool'),
+    'save_question_report': ('reporting_tools', 'SaveQuestionReportTool'),
+    
+    # Task context tools
+    'fetch_task_output': ('task_context', 'FetchTaskOutputTool'),
+}
 
 class ToolRegistry:
     """Singleton registry for tool instances."""
@@ -27,63 +49,60 @@ class ToolRegistry:
         return cls._instance
     
     def _initialize_tools(self):
-        """Initialize all tool instances once."""
-        self._tools = {
-            # Data tools
-            'load_emissions_data': LoadEmissionsDataTool(),
-            'load_knowledge_base': LoadKnowledgeBaseTool(),
-            'analyze_emissions': AnalyzeEmissionsTool(),
-            'compare_emissions': CompareEmissionsTool(),
-            'get_data_info': GetDataInfoTool(),
-            'create_vector_collections': CreateVectorCollectionsTool(),
-            
-            # Vector tools
-            'upsert': UpsertTool(),
-            'query': QueryTool(),
-            'similarity_search': SimilaritySearchTool(),
-            'retrieve_topk_with_spans': RetrieveTopKWithSpansTool(),
-            
-            # Reporting tools
-            'write_md': WriteMDTool(),
-            'write_file': WriteFileTool(),
-            'save_question_report': SaveQuestionReportTool(),
-        }
+        """Set up the tool cache; each tool is constructed by its first ``get_tool``."""
+        self._tools = {}
+        self._lock = threading.Lock()
     
     def get_tool(self, tool_name: str):
         """Get a tool instance by name."""
-        return self._tools.get(tool_name)
+        tool = self._tools.get(tool_name)
+        if tool is None and tool_name in TOOL_CLASSES:
+            with self._lock:
+                tool = self._tools.get(tool_name)
+                if tool is None:
+                    module_name, class_name = TOOL_CLASSES[tool_name]
+                    module = importlib.import_module(f".{module_name}", __package__)
+                    tool = getattr(module, class_name)()
+                    # Serve recorded results when replaying, then time every call
+                    # and record its payload size in the run's trace
+                    run = get_replay_cache().wrap_tool(tool_name, tool._run)
+                    object.__setattr__(tool, '_run', get_tool_tracer().wrap(tool_name, run))
+                    self._tools[tool_name] = tool
+        return tool
     
     def get_tools(self, tool_names: list) -> list:
         """Get multiple tool instances by names."""
-        return [self._tools[name] for name in tool_names if name in self._tools]
+        return [self.get_tool(name) for name in tool_names if name in TOOL_CLASSES]
     
     def get_data_tools(self) -> list:
         """Get all data-related tools."""
-        return [
-            self._tools['load_emissions_data'],
-            self._tools['load_knowledge_base'],
-            self._tools['analyze_emissions'],
-            self._tools['compare_emissions'],
-            self._tools['get_data_info'],
-            self._tools['create_vector_collections'],
-        ]
+        return self.get_tools([
+            'load_emissions_data',
+            'load_knowledge_base',
+            'analyze_emissions',
+            'compare_emissions',
+            'get_data_info',
+            'create_vector_collections',
+            'sql_query',
+        ])
     
     def get_vector_tools(self) -> list:
         """Get all vector-related tools."""
-        return [
-            self._tools['upsert'],
-            self._tools['query'],
-            self._tools['similarity_search'],
-            self._tools['retrieve_topk_with_spans'],
-        ]
+        return self.get_tools([
+            'upsert',
+            'query',
+            'similarity_search',
+            'retrieve_topk_with_spans',
+            'batch_query',
+        ])
     
     def get_reporting_tools(self) -> list:
         """Get all reporting-related tools."""
-        return [
-            self._tools['write_md'],
-            self._tools['write_file'],
-            self._tools['save_question_report'],
-        ]
+        return self.get_tools([
+            'write_md',
+            'write_file',
+            'save_question_report',
+        ])
 
 # Global registry instance
 def get_tool_registry() -> ToolRegistry:
@@ -0,0 +1,187 @@
+"""
+Per-call instrumentation of the registry's tools.
+
+``ToolRegistry`` wraps every tool's ``_run`` with ``ToolTracer.wrap``, which
+times the call and measures its input and output size. Caches used during a
+call report hits with ``record_cache_hit``. While a run is started each call
+is appended as one JSON line to the run's trace file; ``summarize_trace``
+turns a trace into per-tool hot spots for ``main.py profile``.
+"""
+
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .chunking import estimate_tokens
+
+DEFAULT_TRACE_DIR = Path("outputs") / "traces"
+# Characters of an error message kept in the trace
+ERROR_PREVIEW_CHARS = 200
+
+
+def _size(value) -> int:
+    return len(json.dumps(value, default=str).encode('utf-8'))
+
+
+class ToolTracer:
+    """Times tool calls and writes them to a JSONL trace for the current run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._file = None
+        self._active = False
+        self.run_id: Optional[str] = None
+        self.trace_path: Optional[Path] = None
+
+    def start_run(self, name: str, trace_dir: Path = DEFAULT_TRACE_DIR) -> Path:
+        """Write calls to ``<trace_dir>/<name>_<timestamp>.jsonl``, created on the first call."""
+        self.end_run()
+        with self._lock:
+            self.run_id = uuid.uuid4().hex[:12]
+            self.trace_path = Path(trace_dir) / f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self.run_id}.jsonl"
+            self._active = True
+        return self.trace_path
+
+    def end_run(self):
+        with self._lock:
+            self._active = False
+            if self._file is not None:
+                self._file.close()
+            self._file = None
+
+    @contextmanager
+    def label(self, value: str):
+        """Tag the calls made by this thread inside the block (e.g. with the question number)."""
+        previous = getattr(self._local, 'label', None)
+        self._local.label = value
+        try:
+            yield
+        finally:
+            self._local.label = previous
+
+    def record_cache_hit(self, cache: str, count: int = 1):
+        """Count cache hits against the tool call running on this thread, if any."""
+        calls = getattr(self._local, 'calls', None)
+        if calls:
+            hits = calls[-1]['cache_hits']
+            hits[cache] = hits.get(cache, 0) + count
+
+    def wrap(self, tool_name: str, run: Callable) -> Callable:
+        """Instrument a tool's ``_run``."""
+        @wraps(run)
+        def traced(*args, **kwargs):
+            call = {'cache_hits': {}}
+            calls = self._local.__dict__.setdefault('calls', [])
+            calls.append(call)
+            started = time.perf_counter()
+            result, error = None, None
+            try:
+                result = run(*args, **kwargs)
+                # Tools report failures as "Error ..." strings rather than raising
+                if isinstance(result, str) and result.startswith("Error"):
+                    error = result
+                return result
+            except Exception as e:
+                error = f"{type(e).__name__}: {str(e)}"
+                raise
+            finally:
+                calls.pop()
+                output = '' if result is None else str(result)
+                self._write({
+                    'run_id': self.run_id,
+                    'ts': round(time.time(), 3),
+                    'tool': tool_name,
+                    'label': getattr(self._local, 'label', None),
+                    'wall_ms': round((time.perf_counter() - started) * 1000, 3),
+                    'input_bytes': _size([args, kwargs]),
+                    'output_bytes': len(output.encode('utf-8')),
+                    'output_tokens': estimate_tokens(output),
+                    'cache_hits': call['cache_hits'],
+                    'error': error[:ERROR_PREVIEW_CHARS] if error else None,
+                })
+        return traced
+
+    def _write(self, record: dict):
+        with self._lock:
+            if not self._active:
+                return
+            if self._file is None:
+                self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.trace_path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(record, default=str) + '\n')
+            self._file.flush()
+
+
+def read_trace(paths: Iterable[Path]) -> List[dict]:
+    """Load the call records of one or more trace files."""
+    records = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    return records
+
+
+def summarize_trace(records: List[dict]) -> dict:
+    """Per-tool calls, latency, payload, cache hits and errors, hottest first."""
+    by_tool: Dict[str, List[dict]] = {}
+    for record in records:
+        by_tool.setdefault(record['tool'], []).append(record)
+    total_ms = sum(record['wall_ms'] for record in records) or 1.0
+
+    tools = []
+    for tool, calls in by_tool.items():
+        latencies = sorted(call['wall_ms'] for call in calls)
+        tools.append({
+            'tool': tool,
+            'calls': len(calls),
+            'errors': sum(1 for call in calls if call['error']),
+            'total_ms': round(sum(latencies), 1),
+            'share': round(sum(latencies) / total_ms, 4),
+            'mean_ms': round(sum(latencies) / len(latencies), 1),
+            'p95_ms': round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 1),
+            'max_ms': round(latencies[-1], 1),
+            'output_bytes': sum(call['output_bytes'] for call in calls),
+            'output_tokens': sum(call['output_tokens'] for call in calls),
+            'cache_hits': sum(sum(call['cache_hits'].values()) for call in calls),
+        })
+    tools.sort(key=lambda row: row['total_ms'], reverse=True)
+
+    labels: Dict[str, dict] = {}
+    for record in records:
+        label = labels.setdefault(record['label'] or 'unlabeled', {'calls': 0, 'total_ms': 0.0, 'output_tokens': 0})
+        label['calls'] += 1
+        label['total_ms'] += record['wall_ms']
+        label['output_tokens'] += record['output_tokens']
+    for label in labels.values():
+        label['total_ms'] = round(label['total_ms'], 1)
+
+    return {
+        'calls': len(records),
+        'total_tool_ms': round(sum(record['wall_ms'] for record in records), 1),
+        'output_tokens': sum(record['output_tokens'] for record in records),
+        'tools': tools,
+        'labels': labels,
+    }
+
+
+# Global tool tracer instance
+_tool_tracer = None
+
+def get_tool_tracer() -> ToolTracer:
+    """Get the global tool tracer instance."""
+    global _tool_tracer
+    if _tool_tracer is None:
+        _tool_tracer = ToolTracer()
+    return _tool_tracer
+
+
+def record_cache_hit(cache: str, count: int = 1):
+    """Count cache hits against the tool call running on this thread, if any."""
+    get_tool_tracer().record_cache_hit(cache, count)
@@ -2,93 +2,409 @@
 Vector database manager using ChromaDB for document storage and retrieval.
 """
 
-import chromadb
-from chromadb.config import Settings
 import json
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, List, Dict, Any, Optional
 from pathlib import Path
 import hashlib
+from .query_cache import QueryCache
+from .lexical_index import LexicalIndex, reciprocal_rank_fusion, term_spans
+from .embedding_store import DEFAULT_STORE_PATH, EmbeddingStore, embedding_model_name
+
+DEFAULT_UPSERT_BATCH_SIZE = 256
+# Candidates taken from each of the vector and keyword rankings before fusion
+HYBRID_CANDIDATES = 20
 
 class VectorManager:
     """Manages ChromaDB collections for document storage and retrieval."""
     
-    def __init__(self, persist_directory: str = "./chroma_db"):
-        """Initialize ChromaDB client with persistence."""
-        self.client = chromadb.PersistentClient(
-            path=persist_directory,
-            settings=Settings(anonymized_telemetry=False)
-        )
+    def __init__(self, persist_directory: str = "./chroma_db", embedding_function=None,
+                 embedding_store_path: Optional[str] = DEFAULT_STORE_PATH):
+        """Set up a ChromaDB manager with persistence; the client is created on first use.
+        
+        Embeddings are looked up in the persistent embedding store at
+        ``embedding_store_path`` before being computed; pass None to disable it.
+        """
+        self.persist_directory = persist_directory
+        self._client = None
+        self._client_lock = threading.Lock()
+        if embedding_function is None:
+            from chromadb.utils import embedding_functions
+            embedding_function = embedding_functions.DefaultEmbeddingFunction()
+        self.embedding_function = embedding_function
+        self.embedding_model = embedding_model_name(self.embedding_function)
+        self.embedding_store = EmbeddingStore(embedding_store_path) if embedding_store_path else None
         self.collections = {}
+        self._collections_lock = threading.Lock()
+        # Bumped on every write so cached query results never outlive the data they came from
+        self.collection_versions: Dict[str, int] = {}
+        self.query_cache = QueryCache()
+        # BM25 indexes kept in step with each collection's writes, built on first use
+        self.lexical_indexes: Dict[str, LexicalIndex] = {}
+        self._lexical_lock = threading.Lock()
+    
+    @property
+    def client(self):
+        """The persistent ChromaDB client, opened on first access."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import chromadb
+                    from chromadb.config import Settings
+                    self._client = chromadb.PersistentClient(
+                        path=self.persist_directory,
+                        settings=Settings(anonymized_telemetry=False)
+                    )
+        return self._client
+    
+    def get_collection_version(self, collection_name: str) -> int:
+        """Current in-process version of a collection."""
+        return self.collection_versions.get(collection_name, 0)
+    
+    def _mark_modified(self, collection_name: str):
+        """Bump a collection's version and drop its cached query results."""
+        self.collection_versions[collection_name] = self.get_collection_version(collection_name) + 1
+        self.query_cache.invalidate(collection_name)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Query cache hit/miss statistics."""
+        return self.query_cache.stats()
+    
+    def embed_texts(self, texts: List[str]) -> List[Any]:
+        """Embed texts, reusing vectors from the embedding store where possible."""
+        if self.embedding_store is None:
+            return list(self.embedding_function(texts))
+        return self.embedding_store.embed(self.embedding_model, texts, self.embedding_function)
     
     def get_or_create_collection(self, collection_name: str):
         """Get existing collection or create new one."""
-        if collection_name not in self.collections:
+        with self._collections_lock:
+            if collection_name not in self.collections:
+                try:
+                    self.collections[collection_name] = self.client.get_collection(
+                        collection_name, embedding_function=self.embedding_function
+                    )
+                except:
+                    self.collections[collection_name] = self.client.create_collection(
+                        collection_name, embedding_function=self.embedding_function
+                    )
+            return self.collections[collection_name]
+    
+    def has_collection(self, collection_name: str) -> bool:
+        """Whether a collection exists, without creating it."""
+        with self._collections_lock:
+            if collection_name in self.collections:
+                return True
             try:
-                self.collections[collection_name] = self.client.get_collection(collection_name)
-            except:
-                self.collections[collection_name] = self.client.create_collection(collection_name)
-        return self.collections[collection_name]
+                self.collections[collection_name] = self.client.get_collection(
+                    collection_name, embedding_function=self.embedding_function
+                )
+            except Exception:
+                return False
+            return True
     
-    def upsert_documents(self, collection_name: str, documents: List[Dict[str, Any]]) -> str:
+    def get_lexical_index(self, collection_name: str, page_size: int = 5000) -> LexicalIndex:
+        """The collection's BM25 index, built from its stored documents the first time."""
+        with self._lexical_lock:
+            index = self.lexical_indexes.get(collection_name)
+            if index is not None:
+                return index
+            collection = self.get_or_create_collection(collection_name)
+            index = LexicalIndex()
+            offset = 0
+            while True:
+                page = collection.get(include=['documents'], limit=page_size, offset=offset)
+                index.add_many((doc_id, text) for doc_id, text in zip(page['ids'], page['documents']) if text)
+                if len(page['ids']) < page_size:
+                    break
+                offset += page_size
+            self.lexical_indexes[collection_name] = index
+            return index
+    
+    def upsert_documents(self, collection_name: str, documents: Iterable[Dict[str, Any]],
+                         batch_size: int = DEFAULT_UPSERT_BATCH_SIZE) -> str:
         """Insert or update documents in a collection."""
+        stats = self.upsert_stream(collection_name, documents, batch_size=batch_size)
+        return (f"Upserted {stats['documents']} documents to collection '{collection_name}' "
+                f"in {len(stats['batches'])} batches ({stats['docs_per_second']} docs/s)")
+    
+    def upsert_stream(self, collection_name: str, documents: Iterable[Dict[str, Any]],
+                      batch_size: int = DEFAULT_UPSERT_BATCH_SIZE,
+                      on_batch: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Upsert an iterable of documents in bounded batches.
+        
+        Only one batch is embedded and one written at any time: the next batch is
+        embedded while the previous one is written to ChromaDB on a background
+        thread, so memory stays flat regardless of corpus size. ``on_batch`` is
+        called with each batch's throughput stats as it completes.
+        """
         collection = self.get_or_create_collection(collection_name)
+        batch_size = max(1, min(batch_size, self.client.get_max_batch_size()))
         
-        ids = []
-        texts = []
-        metadatas = []
-        
-        for doc in documents:
-            # Generate unique ID if not provided
-            doc_id = doc.get('id', hashlib.md5(doc['text'].encode()).hexdigest())
-            ids.append(doc_id)
-            texts.append(doc['text'])
-            metadatas.append(doc.get('metadata', {}))
-        
-        collection.upsert(
-            ids=ids,
-            documents=texts,
-            metadatas=metadatas
-        )
+        def batches():
+            iterator = iter(documents)
+            while True:
+                batch = list(islice(iterator, batch_size))
+                if not batch:
+                    return
+                yield batch
+        
+        def write(batch_number: int, ids, texts, metadatas, embeddings, embed_seconds: float) -> Dict[str, Any]:
+            start = time.perf_counter()
+            collection.upsert(ids=ids, documents=texts, metadatas=metadatas, embeddings=embeddings)
+            index = self.lexical_indexes.get(collection_name)
+            if index is not None:
+                index.add_many(zip(ids, texts))
+            self._mark_modified(collection_name)
+            write_seconds = time.perf_counter() - start
+            batch_stats = {
+                'batch': batch_number,
+                'documents': len(ids),
+                'embed_seconds': round(embed_seconds, 4),
+                'write_seconds': round(write_seconds, 4),
+                'docs_per_second': round(len(ids) / max(embed_seconds + write_seconds, 1e-9), 1),
+            }
+            if on_batch:
+                on_batch(batch_stats)
+            return batch_stats
         
-        return f"Upserted {len(documents)} documents to collection '{collection_name}'"
+        stats = {'documents': 0, 'batches': []}
+        start = time.perf_counter()
+        pending = None
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            for batch_number, batch in enumerate(batches(), 1):
+                ids = []
+                texts = []
+                metadatas = []
+                for doc in batch:
+                    # Generate unique ID if not provided
+                    ids.append(doc.get('id', hashlib.md5(doc['text'].encode()).hexdigest()))
+                    texts.append(doc['text'])
+                    metadatas.append(doc.get('metadata') or None)
+                
+                embed_start = time.perf_counter()
+                embeddings = self.embed_texts(texts)
+                embed_seconds = time.perf_counter() - embed_start
+                
+                # Wait for the previous write before queueing this one
+                if pending is not None:
+                    stats['batches'].append(pending.result())
+                pending = writer.submit(write, batch_number, ids, texts, metadatas, embeddings, embed_seconds)
+                stats['documents'] += len(ids)
+            if pending is not None:
+                stats['batches'].append(pending.result())
+        
+        elapsed = time.perf_counter() - start
+        stats['seconds'] = round(elapsed, 4)
+        stats['docs_per_second'] = round(stats['documents'] / max(elapsed, 1e-9), 1)
+        return stats
+    
+    def delete_collection(self, collection_name: str):
+        """Drop a collection and forget its cached handle."""
+        self.collections.pop(collection_name, None)
+        self.lexical_indexes.pop(collection_name, None)
+        self._mark_modified(collection_name)
+        try:
+            self.client.delete_collection(collection_name)
+        except Exception:
+            pass
     
-    def query_collection(self, collection_name: str, query_text: str, n_results: int = 5) -> List[Dict[str, Any]]:
-        """Query a collection with text."""
+    def get_managed_metadata(self, collection_name: str, page_size: int = 5000) -> Dict[str, Dict[str, Any]]:
+        """Map document id to metadata for every content-hashed document in a collection."""
         collection = self.get_or_create_collection(collection_name)
+        managed = {}
+        offset = 0
+        while True:
+            page = collection.get(include=['metadatas'], limit=page_size, offset=offset)
+            for doc_id, metadata in zip(page['ids'], page['metadatas']):
+                if metadata and 'content_hash' in metadata:
+                    managed[doc_id] = metadata
+            if len(page['ids']) < page_size:
+                break
+            offset += page_size
+        return managed
+    
+    def sync_documents(self, collection_name: str, documents: Iterable[Dict[str, Any]],
+                       batch_size: int = DEFAULT_UPSERT_BATCH_SIZE) -> str:
+        """Bring a collection in line with ``documents`` touching only what changed.
+        
+        Documents carry a ``content_hash`` in their metadata. New or changed texts are
+        streamed through ``upsert_stream`` (and re-embedded), documents whose text is
+        unchanged but whose metadata moved (e.g. a new page number) only get a
+        metadata update, and managed ids that are no longer present are deleted.
+        """
+        collection = self.get_or_create_collection(collection_name)
+        existing = self.get_managed_metadata(collection_name)
+        
+        current_ids = set()
+        moved = []
+        
+        def changed_documents():
+            for doc in documents:
+                current_ids.add(doc['id'])
+                metadata = doc.get('metadata', {})
+                stored = existing.get(doc['id'])
+                if stored is None or stored.get('content_hash') != metadata.get('content_hash'):
+                    yield doc
+                elif stored != metadata:
+                    moved.append(doc)
+        
+        stats = self.upsert_stream(collection_name, changed_documents(), batch_size=batch_size)
+        for start in range(0, len(moved), batch_size):
+            batch = moved[start:start + batch_size]
+            collection.update(ids=[doc['id'] for doc in batch], metadatas=[doc['metadata'] for doc in batch])
+        removed = [doc_id for doc_id in existing if doc_id not in current_ids]
+        for start in range(0, len(removed), batch_size):
+            collection.delete(ids=removed[start:start + batch_size])
+        index = self.lexical_indexes.get(collection_name)
+        if index is not None:
+            for doc_id in removed:
+                index.remove(doc_id)
+        if moved or removed:
+            self._mark_modified(collection_name)
+        
+        unchanged = len(current_ids) - stats['documents'] - len(moved)
+        upserted = f"{stats['documents']} upserted"
+        if stats['batches']:
+            upserted += f" in {len(stats['batches'])} batches ({stats['docs_per_second']} docs/s)"
+        return (f"Synced collection '{collection_name}': {upserted}, "
+                f"{len(moved)} metadata updated, {len(removed)} deleted, {unchanged} unchanged")
+    
+    def query_collection(self, collection_name: str, query_text: str, n_results: int = 5,
+                         use_cache: bool = True) -> List[Dict[str, Any]]:
+        """Query a collection with text.
+        
+        Results are served from the query cache when the same (or a near-duplicate)
+        query was already run against the current version of the collection.
+        """
+        collection = self.get_or_create_collection(collection_name)
+        version = self.get_collection_version(collection_name)
+        
+        if use_cache:
+            cached = self.query_cache.get(collection_name, version, query_text, n_results)
+            if cached is not None:
+                return cached
+        
+        query_embedding = self.embed_texts([query_text])[0]
+        if use_cache:
+            cached = self.query_cache.get_similar(collection_name, version, n_results, query_embedding, query_text)
+            if cached is not None:
+                return cached
         
         results = collection.query(
-            query_texts=[query_text],
+            query_embeddings=[query_embedding],
             n_results=n_results
         )
+        formatted_results = self._format_results(results, 0)
+        
+        if use_cache:
+            self.query_cache.put(collection_name, version, query_text, n_results, query_embedding, formatted_results)
+        return formatted_results
+    
+    def batch_query(self, queries: List[str], collection_names: List[str], n_results: int = 5,
+                    use_cache: bool = True) -> List[Dict[str, Any]]:
+        """Run several queries against one or more collections.
+        
+        Queries not already in the query cache are embedded together and sent as
+        a single vectorized query per collection. Results are grouped by query:
+        ``[{'query': ..., 'results': {collection_name: [...]}}, ...]``.
+        """
+        grouped = [{'query': query, 'results': {}} for query in queries]
+        if not queries:
+            return grouped
+        
+        embeddings = None
+        for collection_name in collection_names:
+            collection = self.get_or_create_collection(collection_name)
+            version = self.get_collection_version(collection_name)
+            
+            pending = []
+            for i, query in enumerate(queries):
+                cached = self.query_cache.get(collection_name, version, query, n_results) if use_cache else None
+                if cached is not None:
+                    grouped[i]['results'][collection_name] = cached
+                else:
+                    pending.append(i)
+            if not pending:
+                continue
+            
+            if embeddings is None:
+                embeddings = self.embed_texts(list(queries))
+            
+            remaining = []
+            for i in pending:
+                cached = None
+                if use_cache:
+                    cached = self.query_cache.get_similar(collection_name, version, n_results, embeddings[i], queries[i])
+                if cached is not None:
+                    grouped[i]['results'][collection_name] = cached
+                else:
+                    remaining.append(i)
+            if not remaining:
+                continue
+            
+            results = collection.query(
+                query_embeddings=[embeddings[i] for i in remaining],
+                n_results=n_results
+            )
+            for position, i in enumerate(remaining):
+                formatted_results = self._format_results(results, position)
+                grouped[i]['results'][collection_name] = formatted_results
+                if use_cache:
+                    self.query_cache.put(collection_name, version, queries[i], n_results, embeddings[i], formatted_results)
         
-        # Format results
+        return grouped
+    
+    def _format_results(self, results: Dict[str, Any], position: int) -> List[Dict[str, Any]]:
+        """Flatten one query's slice of a ChromaDB query response."""
         formatted_results = []
-        for i in range(len(results['documents'][0])):
+        for i in range(len(results['documents'][position])):
             formatted_results.append({
-                'id': results['ids'][0][i],
-                'text': results['documents'][0][i],
-                'metadata': results['metadatas'][0][i],
-                'distance': results['distances'][0][i] if 'distances' in results else None
+                'id': results['ids'][position][i],
+                'text': results['documents'][position][i],
+                'metadata': results['metadatas'][position][i],
+                'distance': results['distances'][position][i] if results.get('distances') else None
             })
-        
         return formatted_results
     
     def similarity_search(self, collection_name: str, query_text: str, top_k: int = 5) -> List[Dict[str, Any]]:
-        """Perform similarity search in a collection."""
-        return self.query_collection(collection_name, query_text, top_k)
+        """Perform hybrid (vector + BM25 keyword) search in a collection."""
+        return self.hybrid_search(collection_name, query_text, top_k)
+    
+    def hybrid_search(self, collection_name: str, query_text: str, top_k: int = 5,
+                      candidates: int = HYBRID_CANDIDATES) -> List[Dict[str, Any]]:
+        """Fuse the vector and BM25 rankings of a collection with reciprocal-rank fusion.
+        
+        Each result carries its fused ``score``; ``distance`` is None for documents
+        found only by keyword.
+        """
+        candidates = max(candidates, top_k)
+        vector_results = self.query_collection(collection_name, query_text, candidates)
+        keyword_results = self.get_lexical_index(collection_name).search(query_text, candidates)
+        
+        by_id = {result['id']: result for result in vector_results}
+        fused = reciprocal_rank_fusion([list(by_id), [doc_id for doc_id, _ in keyword_results]])[:top_k]
+        
+        missing = [doc_id for doc_id, _ in fused if doc_id not in by_id]
+        if missing:
+            fetched = self.get_or_create_collection(collection_name).get(ids=missing, include=['documents', 'metadatas'])
+            for doc_id, text, metadata in zip(fetched['ids'], fetched['documents'], fetched['metadatas']):
+                by_id[doc_id] = {'id': doc_id, 'text': text, 'metadata': metadata, 'distance': None}
+        
+        results = []
+        for doc_id, score in fused:
+            if doc_id in by_id:
+                results.append({**by_id[doc_id], 'score': round(score, 6)})
+        return results
     
     def retrieve_with_spans(self, collection_name: str, query_text: str, top_k: int = 5) -> List[Dict[str, Any]]:
-        """Retrieve documents with highlighted spans for citation."""
+        """Retrieve documents with the offsets of the query terms in their text."""
         results = self.similarity_search(collection_name, query_text, top_k)
-        
-        # Add span highlighting (simple keyword highlighting for now)
         for result in results:
-            text = result['text']
-            # Simple span highlighting - in a real implementation, you'd use more sophisticated NLP
-            highlighted_text = text.replace(query_text, f"**{query_text}**")
-            result['highlighted_text'] = highlighted_text
-            result['spans'] = [{'start': text.find(query_text), 'end': text.find(query_text) + len(query_text)}]
-        
+            result['spans'] = term_spans(result['text'], query_text)
         return results
 
 # Global vector manager instance
@@ -1,9 +1,13 @@
 from crewai.tools import BaseTool
-from typing import Type
+from typing import List, Type
 from pydantic import BaseModel, Field
 import json
 from pathlib import Path
 from .vector_manager import get_vector_manager
+from .compact_results import DEFAULT_MAX_TOKENS, compact_results
+
+def _compact_json(value) -> str:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
 
 class UpsertInput(BaseModel):
     """Input schema for Upsert tool."""
@@ -28,17 +32,18 @@ class QueryInput(BaseModel):
     """Input schema for Query tool."""
     collection_name: str = Field(..., description="Name of the vector collection")
     query_text: str = Field(..., description="Text to search for")
+    max_tokens: int = Field(default=DEFAULT_MAX_TOKENS, description="Approximate token budget for the returned snippets")
 
 class QueryTool(BaseTool):
     name: str = "query"
-    description: str = "Query vector store with text"
+    description: str = "Query vector store with text; returns cited snippets of the best-matching passages"
     args_schema: Type[BaseModel] = QueryInput
 
-    def _run(self, collection_name: str, query_text: str) -> str:
+    def _run(self, collection_name: str, query_text: str, max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
         try:
             vector_manager = get_vector_manager()
-            results = vector_manager.query_collection(collection_name, query_text)
-            return json.dumps(results, indent=2)
+            results = vector_manager.query_collection(collection_name, query_text, n_results=3)
+            return _compact_json(compact_results(results, query_text, max_tokens))
         except Exception as e:
             return f"Error querying collection: {str(e)}"
 
@@ -46,18 +51,19 @@ class SimilaritySearchInput(BaseModel):
     """Input schema for SimilaritySearch tool."""
     collection_name: str = Field(..., description="Name of the vector collection")
     query_text: str = Field(..., description="Text to search for")
-    top_k: int = Field(default=5, description="Number of results to return")
+    top_k: int = Field(default=3, description="Number of results to return")
+    max_tokens: int = Field(default=DEFAULT_MAX_TOKENS, description="Approximate token budget for the returned snippets")
 
 class SimilaritySearchTool(BaseTool):
     name: str = "similarity_search"
-    description: str = "Perform similarity search in vector store"
+    description: str = "Hybrid keyword (BM25) and semantic search in vector store, good for exact terms like 'market-based' or 'Category 6'; returns cited snippets within a token budget"
     args_schema: Type[BaseModel] = SimilaritySearchInput
 
-    def _run(self, collection_name: str, query_text: str, top_k: int = 5) -> str:
+    def _run(self, collection_name: str, query_text: str, top_k: int = 3, max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
         try:
             vector_manager = get_vector_manager()
             results = vector_manager.similarity_search(collection_name, query_text, top_k)
-            return json.dumps(results, indent=2)
+            return _compact_json(compact_results(results, query_text, max_tokens))
         except Exception as e:
             return f"Error performing similarity search: {str(e)}"
 
@@ -65,17 +71,50 @@ class RetrieveTopKWithSpansInput(BaseModel):
     """Input schema for RetrieveTopKWithSpans tool."""
     collection_name: str = Field(..., description="Name of the vector collection")
     query_text: str = Field(..., description="Text to search for")
-    top_k: int = Field(default=5, description="Number of results to return")
+    top_k: int = Field(default=3, description="Number of results to return")
+    max_tokens: int = Field(default=DEFAULT_MAX_TOKENS, description="Approximate token budget for the returned snippets")
 
 class RetrieveTopKWithSpansTool(BaseTool):
     name: str = "retrieve_topk_with_spans"
-    description: str = "Retrieve top K documents with text spans for citation"
+    description: str = "Retrieve top K documents (hybrid keyword and semantic search) as cited snippets with character offsets of the snippet and matched query terms"
     args_schema: Type[BaseModel] = RetrieveTopKWithSpansInput
 
-    def _run(self, collection_name: str, query_text: str, top_k: int = 5) -> str:
+    def _run(self, collection_name: str, query_text: str, top_k: int = 3, max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
         try:
             vector_manager = get_vector_manager()
             results = vector_manager.retrieve_with_spans(collection_name, query_text, top_k)
-            return json.dumps(results, indent=2)
+            return _compact_json(compact_results(results, query_text, max_tokens, include_spans=True))
         except Exception as e:
             return f"Error retrieving documents with spans: {str(e)}"
+
+
+class BatchQueryInput(BaseModel):
+    """Input schema for BatchQuery tool."""
+    queries: List[str] = Field(..., description="List of query texts to search for")
+    collection_names: List[str] = Field(default=["ghg_protocol"], description="Vector collections to search")
+    top_k: int = Field(default=3, description="Number of results to return per query and collection")
+    max_tokens: int = Field(default=DEFAULT_MAX_TOKENS, description="Approximate token budget for the snippets of each query")
+
+class BatchQueryTool(BaseTool):
+    name: str = "batch_query"
+    description: str = "Query one or more vector collections with several questions at once; results are grouped by query"
+    args_schema: Type[BaseModel] = BatchQueryInput
+
+    def _run(self, queries: List[str], collection_names: List[str] = ["ghg_protocol"], top_k: int = 3,
+             max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
+        try:
+            vector_manager = get_vector_manager()
+            grouped = vector_manager.batch_query(queries, collection_names, top_k)
+            compact = []
+            for group in grouped:
+                collections = group['results']
+                # Split each query's budget between the collections searched
+                budget = max_tokens // max(1, len(collections))
+                compact.append({
+                    'query': group['query'],
+                    'results': {name: compact_results(results, group['query'], budget)
+                                for name, results in collections.items()},
+                })
+            return _compact_json(compact)
+        except Exception as e:
+            return f"Error running batch query: {str(e)}"
@@ -0,0 +1,162 @@
+"""
+Process-level record of which emissions data, documents and vector collections are loaded.
+
+The load tools record what they loaded, from which source files (size and
+mtime) and into which in-memory objects, bumping a version per part. The
+state is warm for a data directory while every part is still loaded, its
+sources are unchanged and the collections were synced from the currently
+loaded documents, so a crew can skip its ingestion task
+(see ``EmissionsAgent.warm_crew``).
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+# Parts in load order: collections are built from the loaded documents
+PARTS = ('emissions', 'knowledge', 'collections')
+
+
+def source_fingerprint(paths: Iterable[Path]) -> Dict[str, tuple]:
+    """``{path: (size, mtime_ns)}`` for the given files that exist."""
+    fingerprint = {}
+    for path in paths:
+        if path.exists():
+            stat = path.stat()
+            fingerprint[str(path)] = (stat.st_size, stat.st_mtime_ns)
+    return fingerprint
+
+
+def _same_objects(current: Dict[str, Any], recorded: Dict[str, Any]) -> bool:
+    """Whether both maps hold the very same objects under the same names."""
+    return current.keys() == recorded.keys() and all(
+        current[name] is recorded[name] for name in recorded
+    )
+
+
+class WarmState:
+    """Tracks what each load tool last loaded and checks it is still current."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.versions: Dict[str, int] = {part: 0 for part in PARTS}
+        self._records: Dict[str, dict] = {}
+
+    def record(self, part: str, data_directory: Optional[Path], sources: Dict[str, tuple],
+               objects: Dict[str, Any], **details) -> int:
+        """Record a completed load of ``part`` and return its new version.
+
+        ``objects`` maps each loaded name to the object now holding it, so a
+        later replacement or removal makes the part stale. The record keeps
+        them referenced, so a replacement can never reuse a recorded id.
+        """
+        with self._lock:
+            self.versions[part] += 1
+            self._records[part] = {
+                'version': self.versions[part],
+                'data_directory': str(data_directory) if data_directory is not None else None,
+                'sources': dict(sources),
+                'objects': dict(objects),
+                'loaded_at': time.time(),
+                **details,
+            }
+            return self.versions[part]
+
+    def invalidate(self, part: Optional[str] = None):
+        """Forget one part (or everything) so the next check reloads it."""
+        with self._lock:
+            for name in [part] if part else PARTS:
+                self._records.pop(name, None)
+
+    def _stale_reason(self, part: str, data_dir: Path, loaded: Dict[str, Dict[str, Any]]) -> Optional[str]:
+        from .data_tools import EMISSIONS_FILES, KNOWLEDGE_FILES
+
+        record = self._records.get(part)
+        if record is None:
+            return "not loaded"
+        if part == 'collections':
+            knowledge = self._records.get('knowledge')
+            if knowledge is None or record['knowledge_version'] != knowledge['version']:
+                return "built from other documents"
+        elif record['data_directory'] != str(data_dir):
+            return f"loaded from {record['data_directory']}"
+        else:
+            filenames = EMISSIONS_FILES if part == 'emissions' else KNOWLEDGE_FILES
+            if source_fingerprint(data_dir / filename for filename in filenames) != record['sources']:
+                return "source files changed"
+        if not _same_objects(loaded[part], record['objects']):
+            return "replaced since loading"
+        return None
+
+    def stale_parts(self, data_directory: str = "./data") -> Dict[str, str]:
+        """Parts that need loading for ``data_directory``, with the reason for each."""
+        from .data_tools import loaded_objects, resolve_data_directory
+
+        data_dir = resolve_data_directory(data_directory)
+        loaded = loaded_objects()
+        with self._lock:
+            reasons = {part: self._stale_reason(part, data_dir, loaded) for part in PARTS}
+        return {part: reason for part, reason in reasons.items() if reason is not None}
+
+    def is_warm(self, data_directory: str = "./data") -> bool:
+        """Whether everything is loaded from ``data_directory`` and still current."""
+        return not self.stale_parts(data_directory)
+
+    def ensure_warm(self, data_directory: str = "./data", parts: Iterable[str] = PARTS) -> List[str]:
+        """Load only the stale ``parts`` by calling the load tools directly.
+
+        Returns the tool results, empty when the state was already warm.
+        """
+        from .tool_registry import get_tool_registry
+
+        registry = get_tool_registry()
+        loads = {
+            'emissions': lambda: registry.get_tool('load_emissions_data')._run(data_directory=data_directory),
+            'knowledge': lambda: registry.get_tool('load_knowledge_base')._run(data_directory=data_directory),
+            'collections': lambda: registry.get_tool('create_vector_collections')._run(),
+        }
+        results = []
+        with self._lock:
+            for part in [part for part in PARTS if part in parts]:
+                # Re-check each time: reloading documents makes the collections stale
+                if part in self.stale_parts(data_directory):
+                    results.append(loads[part]())
+        return results
+
+    def status(self, data_directory: str = "./data") -> dict:
+        """Version, load time and staleness of each part."""
+        stale = self.stale_parts(data_directory)
+        with self._lock:
+            return {
+                part: {
+                    'version': self.versions[part],
+                    'loaded_at': self._records[part]['loaded_at'] if part in self._records else None,
+                    'warm': part not in stale,
+                    **({'stale': stale[part]} if part in stale else {}),
+                }
+                for part in PARTS
+            }
+
+
+def ingest_shared_data(data_directory: str = "./data") -> dict:
+    """Load whatever part of the emissions data, knowledge base and vector collections is not already warm.
+
+    Returns ``{'stale': {part: reason}, 'results': [tool result, ...]}``, both
+    empty when everything was already loaded and up to date.
+    """
+    warm_state = get_warm_state()
+    stale = warm_state.stale_parts(data_directory)
+    results = warm_state.ensure_warm(data_directory) if stale else []
+    return {'stale': stale, 'results': results}
+
+
+# Global warm state instance
+_warm_state = None
+
+def get_warm_state() -> WarmState:
+    """Get the global warm state instance."""
+    global _warm_state
+    if _warm_state is None:
+        _warm_state = WarmState()
+    return _warm_state